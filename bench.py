@@ -0,0 +1,261 @@
+"""Microbenchmarks for the standings, matchup and bracket formatters
+
+    python bench.py --sizes 10,100,1000,10000 --leagues 40 --output bench_results.json
+    python bench.py --compare bench_results.json   # ratio against an earlier run
+    python bench.py --startup                      # import cost of each cli.py subcommand
+
+Each benchmark reports min/median/mean wall time over --repeat runs and the
+peak traced allocation of one extra run. --startup instead starts a fresh
+interpreter per run with -X importtime and reports how long the imports
+behind each subcommand take.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from typing import Dict, Any, Callable
+
+import play
+import results
+import playoffs
+from leagues import League
+from snapshot import LeagueSnapshot
+from standings import rank_leagues
+from odds import SeasonModel, simulate, build_model
+from synthetic import make_league, make_leagues, make_players, make_rosters
+from players import PlayerIndex, pack_player, write_index
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'mean_s': statistics.mean(times),
+        'peak_bytes': peak,
+        'repeat': repeat,
+    }
+
+def synthetic_model(num_teams: int, weeks_played: int, total_weeks: int, seed: int = 0) -> SeasonModel:
+    """A synthetic league part-way through its season, for the odds benchmark"""
+    data = make_league(num_teams, weeks=total_weeks, seed=seed)
+    played = {w: data['matchups'][w] for w in range(1, weeks_played + 1)}
+    samples = {}
+    for matchups in played.values():
+        for matchup in matchups:
+            samples.setdefault(matchup['roster_id'], []).append(matchup['points'])
+
+    # Records as of weeks_played, rebuilt from the played weeks only
+    rosters = make_rosters(random.Random(seed), data['users'], played)
+    remaining = [data['matchups'][w] for w in range(weeks_played + 1, total_weeks + 1)]
+    return build_model(rosters, samples, remaining)
+
+def formatter_benchmarks(num_teams: int, weeks: int):
+    """Yield (name, callable) for every formatter against one league of num_teams"""
+    data = make_league(num_teams, weeks=weeks, divisions=2)
+    week = max(data['matchups'])
+    matchups = data['matchups'][week]
+    nicknames = data['nicknames']
+    snapshot = LeagueSnapshot(data['rosters'], data['users'], nicknames, matchups)
+    divisions = results.get_division_standings(snapshot)
+    div1, div2 = divisions[1], divisions[2]
+
+    yield 'snapshot', lambda: LeagueSnapshot(data['rosters'], data['users'], nicknames, matchups)
+    yield 'get_league_standings', lambda: results.get_league_standings(snapshot, has_divisions=True)
+    yield 'get_division_standings', lambda: results.get_division_standings(snapshot)
+    yield 'format_matchups_table', lambda: results.format_matchups_table(snapshot)
+    yield 'get_lowest_scorers', lambda: results.get_lowest_scorers(snapshot)
+    yield 'format_league_one_with_divisions', lambda: results.format_league_one_with_divisions(data['name'], div1, div2, snapshot)
+    yield 'play.format_three_column_winners_bracket', lambda: play.format_three_column_winners_bracket(data['winners_bracket'], nicknames)
+    yield 'playoffs.format_visual_bracket', lambda: playoffs.format_visual_bracket(data['winners_bracket'], snapshot)
+
+def pipeline_benchmarks(num_leagues: int, num_teams: int, weeks: int):
+    """Compute-and-render for many leagues, for one week and for a full season"""
+    datasets = make_leagues(num_leagues, num_teams, weeks)
+    leagues = [League(d['league_id'], d['name'], bool(d['divisions']), d['nicknames']) for d in datasets]
+    week = weeks
+
+    def render_week():
+        for league, d in zip(leagues, datasets):
+            results.render_league_results(league, d['rosters'], d['users'], d['matchups'][week])
+            playoffs.format_single_bracket(
+                d['winners_bracket'],
+                LeagueSnapshot(d['rosters'], d['users'], league.nicknames, d['matchups'][week])
+            )
+
+    def render_season():
+        for league, d in zip(leagues, datasets):
+            for season_week in d['matchups']:
+                snapshot = LeagueSnapshot(d['rosters'], d['users'], league.nicknames, d['matchups'][season_week])
+                results.format_matchups_table(snapshot)
+                results.get_lowest_scorers(snapshot)
+
+    rosters_by_league = [d['rosters'] for d in datasets]
+    history_by_league = [[d['matchups'][w] for w in sorted(d['matchups'])] for d in datasets]
+
+    def batch_standings():
+        rank_leagues(rosters_by_league, ('wins', 'head_to_head', 'points_for', 'points_against'), history_by_league)
+
+    yield f'pipeline_week[{num_leagues}x{num_teams}]', render_week
+    yield f'batch_standings_h2h[{num_leagues}x{num_teams}]', batch_standings
+
+    # Four weeks left to play, as in a typical mid-November results post
+    model = synthetic_model(num_teams, weeks - 4, weeks)
+    yield f'odds_simulation[{num_teams}x100k]', lambda: simulate(model, 100000, seed=0, workers=1)
+    yield f'pipeline_season[{num_leagues}x{num_teams}x{weeks}w]', render_season
+
+def player_index_benchmarks(lookups: int):
+    """Building the player index from a /players/nfl dump, and name lookups against it"""
+    players = make_players()
+    path = os.path.join(tempfile.mkdtemp(prefix='bench-players-'), 'players.idx')
+    write_index([pack_player(player_id, player) for player_id, player in players.items()], path)
+    index = PlayerIndex(path)
+    player_ids = list(players)[::max(1, len(players) // lookups)][:lookups]
+
+    yield f'player_index_build[{len(players)}]', lambda: write_index([pack_player(k, v) for k, v in players.items()], path)
+    yield f'player_lookups[{len(player_ids)}]', lambda: [index.name(player_id) for player_id in player_ids]
+
+def parse_importtime(stderr: str):
+    """(module, self seconds, cumulative seconds, depth) per line of -X importtime output"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6, depth))
+    return entries
+
+def measure_startup(command: str, repeat: int) -> Dict[str, Any]:
+    """Import cost of one cli.py subcommand ('cli' alone for the dispatcher) in fresh interpreters"""
+    code = 'import cli' if command == 'cli' else f'import cli; cli.load_command({command!r})'
+    walls, imports = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                 capture_output=True, text=True, cwd=REPO_DIR, check=True)
+        walls.append(time.perf_counter() - start)
+        entries = parse_importtime(process.stderr)
+        imports.append(sum(cumulative for _, _, cumulative, depth in entries if depth == 0))
+
+    slowest = sorted(entries, key=lambda entry: -entry[1])[:5]
+    return {
+        'import_s': statistics.median(imports),
+        'wall_s': statistics.median(walls),
+        'modules': len(entries),
+        'slowest_self_s': {name: round(self_s, 6) for name, self_s, _, _ in slowest},
+        'repeat': repeat,
+    }
+
+def startup_benchmarks(repeat: int) -> Dict[str, Any]:
+    from cli import COMMANDS
+
+    report = {}
+    for command in ['cli'] + list(COMMANDS):
+        report[command] = measure_startup(command, repeat)
+        print_startup(command, report[command])
+    return report
+
+def print_startup(command: str, result: Dict[str, Any], baseline: Dict[str, Any] = None):
+    line = (f"{'startup[' + command + ']':<60} import {result['import_s'] * 1000:8.1f} ms   "
+            f"wall {result['wall_s'] * 1000:8.1f} ms   {result['modules']:4d} modules")
+    if baseline:
+        line += f"   x{result['import_s'] / baseline['import_s']:.2f} vs baseline"
+    print(line)
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run(args) -> Dict[str, Any]:
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'benchmarks': {},
+    }
+
+    if args.startup:
+        report['startup'] = startup_benchmarks(args.repeat)
+        return report
+
+    for size in args.sizes:
+        for name, func in formatter_benchmarks(size, args.weeks):
+            key = f'{name}[{size}]'
+            report['benchmarks'][key] = measure(func, args.repeat)
+            print_result(key, report['benchmarks'][key])
+
+    for name, func in pipeline_benchmarks(args.leagues, args.teams, args.weeks):
+        report['benchmarks'][name] = measure(func, args.repeat)
+        print_result(name, report['benchmarks'][name])
+
+    for name, func in player_index_benchmarks(300):
+        report['benchmarks'][name] = measure(func, args.repeat)
+        print_result(name, report['benchmarks'][name])
+
+    return report
+
+def print_result(name: str, result: Dict[str, Any], baseline: Dict[str, Any] = None):
+    line = f"{name:<60} median {result['median_s'] * 1000:10.3f} ms   peak {result['peak_bytes'] / 1024:10.1f} KiB"
+    if baseline:
+        line += f"   x{result['median_s'] / baseline['median_s']:.2f} vs baseline"
+    print(line)
+
+def compare(report: Dict[str, Any], baseline_path: str):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit', 'unknown')}):")
+    for name, result in report['benchmarks'].items():
+        if name in baseline.get('benchmarks', {}):
+            print_result(name, result, baseline['benchmarks'][name])
+    for command, result in report.get('startup', {}).items():
+        if command in baseline.get('startup', {}):
+            print_startup(command, result, baseline['startup'][command])
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=lambda s: [int(x) for x in s.split(',')], default=[10, 100, 1000, 10000],
+                        help='Comma-separated teams-per-league sizes for the formatter benchmarks')
+    parser.add_argument('--leagues', type=int, default=40, help='Leagues in the pipeline benchmark')
+    parser.add_argument('--teams', type=int, default=12, help='Teams per league in the pipeline benchmark')
+    parser.add_argument('--weeks', type=int, default=14, help='Weeks of matchups per league')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default='bench_results.json', help='Where to save the JSON report')
+    parser.add_argument('--compare', help='Earlier JSON report to compare against')
+    parser.add_argument('--startup', action='store_true', help='Measure cli.py subcommand import time instead')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {args.output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    sys.exit(main())
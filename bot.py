@@ -1,41 +1,63 @@
 import os
-from datetime import datetime, timezone
 import asyncio
-import time  # For sleep
-
-async def run_script(script_name):
-    print(f"Attempting to run the script: {script_name}...")
-    command = f"python {script_name}"
-    proc = await asyncio.create_subprocess_shell(command)
-    await proc.wait()
-    print(f"Script {script_name} has completed execution.")
-
-def is_within_time_window():
-    # Get the current time in UTC
-    now = datetime.now(timezone.utc)
-    print(f"Current UTC time: {now.strftime('%Y-%m-%d %H:%M:%S')}")
-
-    # Check if it's Tuesday and between 8:00 AM and 8:03 AM UTC
-    if now.weekday() == 1 and now.hour == 8 and 0 <= now.minute < 3:
-        print("Within the time window (Tuesday 8:00 AM - 8:03 AM UTC).")
-        return True
-    else:
-        print("Outside the time window.")
-        return False
-
-async def main():
-    if is_within_time_window():
-        print("Conditions met. Running the script.")
-        await run_script('results.py')
-
-        # Wait for 6 minutes to ensure the script doesn't run again within the window
-        print("Waiting for 5 minutes to ensure the time window has passed.")
-        time.sleep(300)  # Wait for 6 minutes
-        print("5 minutes passed, resuming.")
-    else:
-        print("Outside the time window. Script will not run.")
-
-    print("Exiting bot.")
-
-# Run the main function using asyncio
-asyncio.run(main())
\ No newline at end of file
+import discord
+from scheduler import Scheduler
+from results import post_results
+from playoffs import post_playoffs
+from play import post_brackets
+from live import LiveScoreboard
+from logconfig import setup_logging
+
+DISCORD_BOT_TOKEN = os.getenv('DISCORD_BOT_TOKEN')
+
+# Cron schedules in UTC; set a schedule to an empty string to disable the job.
+# Results go out on Tuesday at 8:00 AM UTC once the week's games are final
+JOB_SCHEDULES = {
+    'results': os.getenv('RESULTS_SCHEDULE', '0 8 * * 2'),
+    'playoffs': os.getenv('PLAYOFFS_SCHEDULE', ''),
+    'brackets': os.getenv('BRACKETS_SCHEDULE', ''),
+}
+
+# Set LIVE_MODE=1 to keep a live scores message per league updated during games
+LIVE_MODE = os.getenv('LIVE_MODE', '') not in ('', '0', 'false')
+
+JOBS = {
+    'results': post_results,
+    'playoffs': post_playoffs,
+    'brackets': post_brackets,
+}
+
+def create_bot() -> discord.Client:
+    """One persistent client: log in once and run every job on the same connection"""
+    intents = discord.Intents.default()
+    client = discord.Client(intents=intents)
+    scheduler = Scheduler()
+    # Background tasks started by on_ready, by name
+    tasks = {}
+
+    for name, schedule in JOB_SCHEDULES.items():
+        if schedule:
+            scheduler.add_job(name, schedule, lambda job=JOBS[name]: job(client))
+
+    @client.event
+    async def on_ready():
+        print(f"Logged in as {client.user}")
+
+        # on_ready fires again after every reconnect; only start the scheduler once
+        if 'scheduler' not in tasks:
+            print(f"Starting scheduler with jobs: {', '.join(scheduler.jobs) or 'none'}")
+            tasks['scheduler'] = asyncio.create_task(scheduler.run_forever())
+
+        if LIVE_MODE and 'live' not in tasks:
+            print("Starting live scoring")
+            tasks['live'] = asyncio.create_task(LiveScoreboard(client).run_forever())
+
+    return client
+
+def main():
+    setup_logging()
+    # Keep discord.py's records on our queue instead of its own stream handler
+    create_bot().run(DISCORD_BOT_TOKEN, log_handler=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from typing import Dict, Any, List, Optional, Callable
+
+from render import bracket_entry, bracket_emojis, join_columns
+
+# Sleeper's placement ('p') for the deciding match of each finishing spot
+PLACEMENT_LABELS = {1: "Final", 3: "3rd place", 5: "5th place", 7: "7th place"}
+
+
+class BracketGraph:
+    """One Sleeper bracket indexed by match ID, with feeder links resolved
+
+    Matches in later rounds name their teams either directly (t1/t2) or by
+    reference to an earlier match (t1_from/t2_from = {'w': m} for its winner
+    or {'l': m} for its loser). Every lookup is a dict access, so resolving
+    a side is constant-cost however deep the bracket is.
+    """
+
+    def __init__(self, matches: Optional[List[Dict[str, Any]]]):
+        self.matches = sorted(matches or [], key=lambda m: (m.get('r', 0), m.get('m', 0)))
+        self.matches_by_id = {match['m']: match for match in self.matches if match.get('m') is not None}
+
+        # round -> matches in match order
+        self.rounds: Dict[int, List[Dict[str, Any]]] = {}
+        for match in self.matches:
+            self.rounds.setdefault(match.get('r', 1), []).append(match)
+
+    def __len__(self):
+        return len(self.matches)
+
+    def team(self, match: Dict[str, Any], side: str) -> Optional[int]:
+        """Roster ID playing on side 't1' or 't2', or None while it's undecided"""
+        if match.get(side):
+            return match[side]
+
+        ref = match.get(f'{side}_from') or {}
+        if 'w' in ref:
+            return self.matches_by_id.get(ref['w'], {}).get('w')
+        if 'l' in ref:
+            return self.matches_by_id.get(ref['l'], {}).get('l')
+        return None
+
+    def feeder_label(self, match: Dict[str, Any], side: str) -> str:
+        """Where an undecided side comes from, e.g. 'W M3' or 'L M1'"""
+        ref = match.get(f'{side}_from') or {}
+        if 'w' in ref:
+            return f"W M{ref['w']}"
+        if 'l' in ref:
+            return f"L M{ref['l']}"
+        return "TBD"
+
+    def winner(self, match: Dict[str, Any]) -> Optional[int]:
+        return match.get('w')
+
+def round_title(graph: BracketGraph, round_num: int) -> str:
+    last_round = max(graph.rounds)
+    if round_num == last_round:
+        return "Finals"
+    if round_num == last_round - 1:
+        return "Semifinals"
+    return f"Round {round_num}"
+
+def render_bracket(graph: BracketGraph, name_for: Callable[[int], str],
+                   score_for: Callable[[int], Any], width: int = 35) -> str:
+    """The bracket as one column per round, in the layout play.py posts
+
+    name_for maps a roster ID to its label and score_for to its current
+    points (or 'TBD'). Decided matches mark the recorded winner without
+    scores, since score_for only knows this week's points and earlier
+    rounds were played in earlier weeks; undecided ones lead with whoever
+    is ahead.
+    """
+    if not graph.matches:
+        return "No matches available"
+
+    columns = []
+    for round_num, matches in sorted(graph.rounds.items()):
+        entries = []
+        for match in matches:
+            t1, t2 = graph.team(match, 't1'), graph.team(match, 't2')
+            name1 = name_for(t1) if t1 else graph.feeder_label(match, 't1')
+            name2 = name_for(t2) if t2 else graph.feeder_label(match, 't2')
+
+            winner = graph.winner(match)
+            if winner and winner in (t1, t2):
+                emojis = ("🏆", "❌") if winner == t1 else ("❌", "🏆")
+                s1 = s2 = ''
+            else:
+                s1 = score_for(t1) if t1 else 'TBD'
+                s2 = score_for(t2) if t2 else 'TBD'
+                emojis = bracket_emojis(name1, name2, s1, s2)
+
+            label = PLACEMENT_LABELS.get(match.get('p'))
+            header = f"M{match.get('m')}" + (f" · {label}" if label else "")
+            entries.append(f"{header}\n" + bracket_entry(name1, s1, name2, s2, emojis, score_format='.2f'))
+        # Round title, then the matches separated by blank lines
+        columns.append(f"{round_title(graph, round_num)}\n" + "\n".join(entries) + "\n")
+
+    return join_columns(columns, width).rstrip("\n")
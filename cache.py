@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import hashlib
+import datetime
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from nfl import in_game_window, last_rollover
+
+CACHE_DIR = os.getenv('SLEEPER_CACHE_DIR', '.sleeper_cache')
+MAX_CACHE_BYTES = int(os.getenv('SLEEPER_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# Time-to-live per endpoint as (normal, during NFL game windows). Stale
+# entries are still kept and revalidated with ETag/If-Modified-Since
+ENDPOINT_TTLS = {
+    'league': (DAY, DAY),
+    'users': (DAY, DAY),
+    'rosters': (HOUR, 5 * MINUTE),
+    'winners_bracket': (HOUR, 5 * MINUTE),
+    'losers_bracket': (HOUR, 5 * MINUTE),
+    'matchups': (HOUR, MINUTE),
+}
+DEFAULT_TTL = (5 * MINUTE, MINUTE)
+
+def endpoint_name(url: str) -> str:
+    """Map a Sleeper URL to its endpoint, e.g. .../matchups/12 -> 'matchups'"""
+    parts = [p for p in url.split('?')[0].rstrip('/').split('/') if p]
+    while parts and parts[-1].isdigit():
+        parts.pop()
+    return parts[-1] if parts else ''
+
+def league_id_from_url(url: str) -> Optional[str]:
+    """The league a Sleeper URL belongs to, e.g. .../league/123/rosters -> '123'"""
+    parts = [p for p in url.split('?')[0].split('/') if p]
+    for i, part in enumerate(parts[:-1]):
+        if part == 'league':
+            return parts[i + 1]
+    return None
+
+def ttl_for(url: str, now: Optional[float] = None) -> int:
+    if endpoint_name(url) == 'nfl':
+        # /state/nfl only moves when the week rolls over, so an entry stays
+        # fresh until then: its TTL is the time since the last rollover
+        now = time.time() if now is None else now
+        return now - last_rollover(datetime.datetime.fromtimestamp(now, datetime.timezone.utc)).timestamp()
+
+    normal, live = ENDPOINT_TTLS.get(endpoint_name(url), DEFAULT_TTL)
+    if live == normal:
+        return normal
+    when = None if now is None else datetime.datetime.fromtimestamp(now, datetime.timezone.utc)
+    return live if in_game_window(when) else normal
+
+
+class ResponseCache:
+    """On-disk Sleeper response cache keyed by URL with size-bounded LRU eviction"""
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = path or CACHE_DIR
+        self.max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+        self.index_path = os.path.join(self.path, 'index.json')
+        # key -> {'url', 'size', 'stored_at', 'etag', 'last_modified'},
+        # ordered from least to most recently used
+        self.index = OrderedDict()
+        self.total_bytes = 0
+        self._dirty = False
+        self._load_index()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.path, f'{key}.json')
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.error(f"Ignoring unreadable cache index {self.index_path}: {str(e)}")
+            return
+
+        for key, meta in sorted(entries.items(), key=lambda item: item[1].get('last_access', 0)):
+            if os.path.exists(self._entry_path(key)):
+                self.index[key] = meta
+                self.total_bytes += meta.get('size', 0)
+
+    def _write_file(self, path: str, payload: Any) -> int:
+        os.makedirs(self.path, exist_ok=True)
+        data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return len(data)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for url (metadata plus 'data') or None"""
+        key = self._key(url)
+        meta = self.index.get(key)
+        if meta is None:
+            return None
+
+        try:
+            with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            self._remove(key)
+            return None
+
+        self.index.move_to_end(key)
+        meta['last_access'] = time.time()
+        self._dirty = True
+        return dict(meta, data=data)
+
+    def is_fresh(self, entry: Dict[str, Any], now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return now - entry['stored_at'] < ttl_for(entry['url'], now)
+
+    @staticmethod
+    def revalidation_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url: str, data: Any, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        key = self._key(url)
+        try:
+            size = self._write_file(self._entry_path(key), data)
+        except OSError as e:
+            logging.error(f"Error writing cache entry for {url}: {str(e)}")
+            return
+
+        old = self.index.pop(key, None)
+        if old:
+            self.total_bytes -= old.get('size', 0)
+
+        now = time.time()
+        self.index[key] = {
+            'url': url,
+            'size': size,
+            'stored_at': now,
+            'last_access': now,
+            'etag': etag,
+            'last_modified': last_modified
+        }
+        self.total_bytes += size
+        self._dirty = True
+        self._evict()
+
+    def touch(self, url: str):
+        """Mark a cached entry as fresh again after a 304 Not Modified"""
+        meta = self.index.get(self._key(url))
+        if meta:
+            meta['stored_at'] = time.time()
+            self._dirty = True
+
+    def _remove(self, key: str):
+        meta = self.index.pop(key, None)
+        if meta:
+            self.total_bytes -= meta.get('size', 0)
+            self._dirty = True
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        # Drop least recently used entries until we're back under the size bound,
+        # always keeping the entry that was just written
+        while self.total_bytes > self.max_bytes and len(self.index) > 1:
+            key = next(iter(self.index))
+            logging.info(f"Evicting cached response for {self.index[key]['url']}")
+            self._remove(key)
+
+    def flush(self):
+        """Persist the index; entries themselves are written on put()"""
+        if not self._dirty:
+            return
+        try:
+            self._write_file(self.index_path, dict(self.index))
+            self._dirty = False
+        except OSError as e:
+            logging.error(f"Error writing cache index {self.index_path}: {str(e)}")
@@ -0,0 +1,57 @@
+import os
+import json
+import logging
+from urllib.parse import urlsplit
+from typing import Dict, Any, Optional
+
+# Set SLEEPER_RECORD to a file path to capture every Sleeper response a run receives
+SLEEPER_RECORD = os.getenv('SLEEPER_RECORD')
+
+
+def cassette_key(url: str) -> str:
+    """Cassettes are keyed by path so they replay against any host"""
+    parts = urlsplit(url)
+    return f'{parts.path}?{parts.query}' if parts.query else parts.path
+
+
+class Cassette:
+    """Recorded Sleeper responses, saved as JSON keyed by request path"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: str) -> 'Cassette':
+        cassette = cls(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            cassette.entries = json.load(f).get('entries', {})
+        return cassette
+
+    @classmethod
+    def from_env(cls) -> Optional['Cassette']:
+        """A recording cassette if SLEEPER_RECORD is set, appending to any existing file"""
+        if not SLEEPER_RECORD:
+            return None
+        try:
+            return cls.load(SLEEPER_RECORD)
+        except FileNotFoundError:
+            return cls(SLEEPER_RECORD)
+
+    def record(self, url: str, status: int, body: Any):
+        self.entries[cassette_key(url)] = {'status': status, 'body': body}
+        self._dirty = True
+
+    def lookup(self, path: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(path)
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': self.entries}, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        logging.info(f"Saved {len(self.entries)} recorded responses to {self.path}")
@@ -0,0 +1,149 @@
+import os
+import json
+import hashlib
+import logging
+import datetime
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Callable
+
+POST_STATE = os.getenv('POST_STATE', 'post_state.json')
+
+# 'full' reposts a changed league in full, 'diff' sends a compact "what changed"
+# summary for leagues that were posted before. Unchanged leagues are always skipped
+# unless FORCE_POST is set.
+POST_MODE = os.getenv('POST_MODE', 'full')
+FORCE_POST = os.getenv('FORCE_POST', '') not in ('', '0', 'false')
+
+BRACKET_KEYS = ('r', 'm', 't1', 't2', 'w', 'l', 't1_from', 't2_from', 'p')
+
+def normalize_bracket(bracket: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    if bracket is None:
+        return None
+    matches = [{k: match.get(k) for k in BRACKET_KEYS if match.get(k) is not None} for match in bracket]
+    return sorted(matches, key=lambda m: (m.get('r', 0), m.get('m', 0)))
+
+def normalize_matchups(matchups: Optional[List[Dict[str, Any]]]) -> Optional[List[List[Any]]]:
+    if matchups is None:
+        return None
+    rows = [[m.get('matchup_id'), m.get('roster_id'), round(float(m.get('points') or 0), 2)] for m in matchups]
+    # Teams without a game (playoff byes, eliminated teams) have a None matchup_id
+    return sorted(rows, key=lambda row: (row[0] or 0, row[1] or 0))
+
+def normalize_standings(rosters: Optional[List[Dict[str, Any]]]) -> Optional[List[List[Any]]]:
+    if rosters is None:
+        return None
+    keys = ('wins', 'losses', 'ties', 'fpts', 'fpts_decimal', 'fpts_against', 'fpts_against_decimal')
+    return sorted([r['roster_id']] + [r.get('settings', {}).get(k, 0) for k in keys] for r in rosters)
+
+def state_hash(state: Dict[str, Any]) -> str:
+    canonical = json.dumps(state, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def describe_changes(old: Dict[str, Any], new: Dict[str, Any], name_for: Callable[[Any], str] = str) -> List[str]:
+    """Compact human-readable lines for what moved between two normalized states"""
+    lines = []
+
+    for key in ('winners_bracket', 'losers_bracket'):
+        old_matches = {m['m']: m for m in old.get(key) or []}
+        label = 'Championship' if key == 'winners_bracket' else 'Consolation'
+        for match in new.get(key) or []:
+            before = old_matches.get(match['m'], {})
+            if match.get('w') and match.get('w') != before.get('w'):
+                lines.append(f"{label} R{match.get('r')} M{match['m']}: {name_for(match['w'])} advances")
+            for side in ('t1', 't2'):
+                if match.get(side) and match.get(side) != before.get(side):
+                    lines.append(f"{label} R{match.get('r')} M{match['m']}: {name_for(match[side])} is in")
+
+    old_points = {row[1]: row[2] for row in old.get('matchups') or []}
+    for _, roster_id, points in new.get('matchups') or []:
+        if old_points.get(roster_id) != points:
+            lines.append(f"{name_for(roster_id)}: {old_points.get(roster_id, 0):.2f} → {points:.2f}")
+
+    old_standings = {row[0]: row[1:] for row in old.get('standings') or []}
+    for row in new.get('standings') or []:
+        if old_standings.get(row[0]) != row[1:]:
+            lines.append(f"{name_for(row[0])}: now {row[1]}-{row[2]}")
+
+    return lines
+
+
+try:
+    import fcntl
+except ImportError:  # Windows; jobs there run one at a time
+    fcntl = None
+
+
+class ChangeStore:
+    """Persists the last posted state hash per job and league
+
+    Jobs overlap (in the bot, and one-shot runs alongside it), so save()
+    only writes back the entries this store recorded, merged into whatever
+    is on disk by then, under a lock on the state file.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or POST_STATE
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+        # Keys recorded by this store, the only ones save() writes
+        self.recorded = set()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.error(f"Ignoring unreadable post state {self.path}: {str(e)}")
+            return {}
+
+    @contextmanager
+    def _locked(self):
+        with open(f'{self.path}.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _key(job: str, league_id: str) -> str:
+        return f'{job}:{league_id}'
+
+    def previous(self, job: str, league_id: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(self._key(job, league_id))
+        return entry['state'] if entry else None
+
+    def has_changed(self, job: str, league_id: str, state: Dict[str, Any]) -> bool:
+        if FORCE_POST:
+            return True
+        entry = self.entries.get(self._key(job, league_id))
+        return entry is None or entry['hash'] != state_hash(state)
+
+    def record(self, job: str, league_id: str, state: Dict[str, Any]):
+        """Remember a state once it has actually been posted"""
+        key = self._key(job, league_id)
+        self.entries[key] = {
+            'hash': state_hash(state),
+            'state': state,
+            'posted_at': datetime.datetime.now(datetime.timezone.utc).isoformat()
+        }
+        self.recorded.add(key)
+
+    def save(self):
+        """Merge this store's records into the file, keeping other jobs' newer ones"""
+        if not self.recorded:
+            return
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        try:
+            with self._locked():
+                entries = self._load()
+                entries.update({key: self.entries[key] for key in self.recorded})
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f)
+                os.replace(tmp_path, self.path)
+            self.entries.update(entries)
+        except OSError as e:
+            logging.error(f"Error writing post state {self.path}: {str(e)}")
@@ -0,0 +1,62 @@
+"""Single entry point for the bot, its one-off jobs and tools
+
+    python cli.py bot                       # stay logged in and run the cron schedule
+    python cli.py results [--week 12]       # post one job now and exit
+    python cli.py playoffs | brackets
+    python cli.py matchups [--league ID]    # print matchups, post nothing
+    python cli.py live                      # keep live scores updated
+    python cli.py season backfill           # tool subcommands take their own arguments
+    python cli.py odds --sims 200000
+
+This module imports nothing beyond the standard library. A subcommand
+imports its own modules only once it runs, so `matchups` never loads
+discord.py and `--help` loads nothing at all (see bench.py --startup).
+"""
+import sys
+import argparse
+import importlib
+
+# name -> (help, module providing main(), whether main takes --week, whether it takes its own argv)
+COMMANDS = {
+    'bot': ("Run the bot: scheduled jobs, plus live scores with LIVE_MODE=1", 'bot', False, False),
+    'results': ("Post this week's standings and matchup results", 'results', True, False),
+    'playoffs': ("Post the playoff brackets as embeds", 'playoffs', True, False),
+    'brackets': ("Post the playoff brackets as text", 'play', True, False),
+    'matchups': ("Print a week's matchups without posting", 'match', False, True),
+    'live': ("Keep a live scores message per league updated", 'live', False, False),
+    'season': ("Season store tools: backfill, standings, history", 'season', False, True),
+    'odds': ("Print simulated playoff odds", 'odds', False, True),
+}
+
+def load_command(name: str):
+    """Import the module behind a subcommand"""
+    return importlib.import_module(COMMANDS[name][1])
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name, (help_text, _, takes_week, takes_argv) in COMMANDS.items():
+        command = sub.add_parser(name, help=help_text, add_help=not takes_argv)
+        if takes_week:
+            command.add_argument('--week', type=int, help='Week to post (default: the current week)')
+    # Anything the tool subcommands don't recognise, --help included, goes to
+    # the tool's own parser (argparse.REMAINDER would still reject a leading option)
+    args, extra = parser.parse_known_args(argv)
+    if extra and not COMMANDS[args.command][3]:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.args = extra
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    _, _, takes_week, takes_argv = COMMANDS[args.command]
+    module = load_command(args.command)
+
+    if takes_argv:
+        return module.main(args.args)
+    if takes_week:
+        return module.main(week=args.week)
+    return module.main()
+
+if __name__ == "__main__":
+    sys.exit(main())
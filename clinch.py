@@ -0,0 +1,216 @@
+"""Exact clinch and elimination flags for the regular season
+
+A flag is only set when it holds in every possible outcome of the remaining
+games. Each week's results are enumerated as a bitmask (bit g set means the
+home team of game g wins), with three things keeping the search small:
+
+- dominance: when testing whether a team has clinched, it loses all its
+  remaining games (winning never hurts it); when testing elimination it
+  wins them all;
+- bounds: a branch stops as soon as it either proves the result or can
+  no longer reach it;
+- memoization of (week, wins) states already explored.
+
+Points for can't be known in advance, so a tie on wins is only treated as
+decided when the team that would lose the tiebreak has no games left to
+score in and is already behind on points. Seeding is by record alone, as
+in the odds simulator; division-winner seeding isn't modelled, so leagues
+with divisions get no tags.
+
+Flags are only computed from a complete schedule: if a remaining week
+failed to fetch, a game is missing a side, or a week has more than
+CLINCH_MAX_GAMES games to enumerate, no team is tagged rather than risk
+a wrong one.
+"""
+import os
+import logging
+import numpy as np
+from typing import Dict, Any, List, Optional, Sequence
+
+from standings import StandingsTable
+
+# Tag teams in the posted standings; off by default since it fetches every
+# remaining week's matchups for every league on each results run
+CLINCH_TAGS = os.getenv('CLINCH_TAGS', '0') not in ('', '0', 'false')
+
+# Each week enumerates 2^games outcomes; bigger leagues get no tags
+CLINCH_MAX_GAMES = int(os.getenv('CLINCH_MAX_GAMES', 10))
+
+CLINCHED_BYE = 'y'
+CLINCHED_PLAYOFFS = 'x'
+ELIMINATED = 'e'
+
+
+class ClinchCalculator:
+    """Clinch/elimination checks for one league's remaining schedule
+
+    schedule is one list of (home, away) team indices per remaining week.
+    """
+
+    def __init__(self, wins: Sequence[int], points_for: Sequence[float], schedule: List[List[tuple]],
+                 playoff_teams: int, byes: int = 0):
+        self.wins = np.asarray(wins, dtype=np.int64)
+        self.points_for = np.asarray(points_for, dtype=np.float64)
+        self.schedule = [list(week) for week in schedule if week]
+        self.teams = len(self.wins)
+        self.playoff_teams = min(playoff_teams, self.teams)
+        self.byes = byes
+
+        self.games_left = np.zeros(self.teams, dtype=np.int64)
+        for week in self.schedule:
+            for home, away in week:
+                self.games_left[home] += 1
+                self.games_left[away] += 1
+
+    def _weeks_without(self, team: int, team_wins: bool):
+        """Fix the team's own games and return (wins, weekly win deltas by bitmask)"""
+        wins = self.wins.copy()
+        weeks = []
+        for week in self.schedule:
+            games = []
+            for home, away in week:
+                if team in (home, away):
+                    winner = team if team_wins else (away if home == team else home)
+                    wins[winner] += 1
+                else:
+                    games.append((home, away))
+            if not games:
+                continue
+
+            # deltas[mask] is every team's extra wins when games go the way the mask says
+            masks = np.arange(1 << len(games))
+            deltas = np.zeros((len(masks), self.teams), dtype=np.int64)
+            for g, (home, away) in enumerate(games):
+                home_wins = (masks >> g) & 1
+                deltas[:, home] += home_wins
+                deltas[:, away] += 1 - home_wins
+            weeks.append(deltas)
+        return wins, weeks
+
+    def _remaining_after(self, weeks: List[np.ndarray]) -> List[np.ndarray]:
+        """Max extra wins per team from each week onward"""
+        remaining = [np.zeros(self.teams, dtype=np.int64)]
+        for deltas in reversed(weeks):
+            remaining.append(remaining[-1] + deltas.max(axis=0))
+        return remaining[::-1]
+
+    def can_finish_below(self, team: int, places: int) -> bool:
+        """True if some outcome leaves `places` or more teams ahead of the team"""
+        wins, weeks = self._weeks_without(team, team_wins=False)
+        remaining = self._remaining_after(weeks)
+        others = np.arange(self.teams) != team
+
+        # The team's points only go up, so it wins a tie on wins only against
+        # a team that is done scoring and already behind on points
+        wins_tie = others & (self.games_left == 0) & (self.points_for < self.points_for[team])
+        target = wins[team]
+        seen = set()
+
+        def ahead(state):
+            return np.sum(others & ((state > target) | ((state == target) & ~wins_tie)), axis=-1)
+
+        def search(week: int, state: np.ndarray) -> bool:
+            if ahead(state) >= places:
+                return True
+            # Even winning out, not enough teams can pass the team from here
+            best = state + remaining[week]
+            if week == len(weeks) or ahead(best) < places:
+                return False
+            key = (week, state.tobytes())
+            if key in seen:
+                return False
+            seen.add(key)
+
+            candidates = np.unique(state + weeks[week], axis=0)
+            counts = ahead(candidates)
+            if np.any(counts >= places):
+                return True
+            # Try the outcomes that put the most teams ahead first
+            candidates = candidates[np.argsort(-counts, kind='stable')]
+            return any(search(week + 1, candidate) for candidate in candidates)
+
+        return search(0, wins)
+
+    def can_finish_within(self, team: int, places: int) -> bool:
+        """True if some outcome leaves fewer than `places` teams ahead of the team"""
+        wins, weeks = self._weeks_without(team, team_wins=True)
+        remaining = self._remaining_after(weeks)
+        others = np.arange(self.teams) != team
+
+        # Ties go the team's way unless it is done scoring and already behind on points
+        loses_tie = others & (self.games_left[team] == 0) & (self.points_for > self.points_for[team])
+        target = wins[team]
+        seen = set()
+
+        def ahead(state):
+            return np.sum(others & ((state > target) | ((state == target) & loses_tie)), axis=-1)
+
+        def search(week: int, state: np.ndarray) -> bool:
+            # Wins only go up, so anyone ahead now stays ahead
+            if ahead(state) >= places:
+                return False
+            if week == len(weeks):
+                return True
+            key = (week, state.tobytes())
+            if key in seen:
+                return False
+            seen.add(key)
+
+            candidates = np.unique(state + weeks[week], axis=0)
+            # Try the outcomes that put the fewest teams ahead first
+            candidates = candidates[np.argsort(ahead(candidates), kind='stable')]
+            return any(search(week + 1, candidate) for candidate in candidates)
+
+        # Everyone else winning out still can't catch enough of the field
+        if ahead(wins + remaining[0]) < places:
+            return True
+        return search(0, wins)
+
+    def status(self, team: int) -> Optional[str]:
+        if self.byes and not self.can_finish_below(team, self.byes):
+            return CLINCHED_BYE
+        if not self.can_finish_below(team, self.playoff_teams):
+            return CLINCHED_PLAYOFFS
+        if not self.can_finish_within(team, self.playoff_teams):
+            return ELIMINATED
+        return None
+
+def bye_count(playoff_teams: int) -> int:
+    """Byes in a bracket padded to a power of two, e.g. 6 teams -> 2"""
+    return (1 << (playoff_teams - 1).bit_length()) - playoff_teams
+
+def clinch_flags(rosters: List[Dict[str, Any]], remaining_weeks: List[Optional[List[Dict[str, Any]]]],
+                 playoff_teams: int) -> Dict[int, str]:
+    """roster_id -> 'y' / 'x' / 'e' for every team whose fate is already certain
+
+    Returns no flags when the remaining schedule is incomplete or too big to enumerate.
+    """
+    table = StandingsTable([rosters])
+    roster_ids = table.roster_id.tolist()
+    index = {roster_id: i for i, roster_id in enumerate(roster_ids)}
+
+    schedule = []
+    for offset, matchups in enumerate(remaining_weeks, start=1):
+        # A missing week would look like a week without games and flip tags
+        if matchups is None:
+            logging.warning(f"Remaining week {offset} unavailable, not computing clinch flags")
+            return {}
+        pairs = {}
+        for matchup in matchups:
+            if matchup.get('matchup_id') and matchup.get('roster_id') in index:
+                pairs.setdefault(matchup['matchup_id'], []).append(index[matchup['roster_id']])
+        if any(len(pair) != 2 for pair in pairs.values()):
+            logging.warning(f"Remaining week {offset} has an incomplete matchup, not computing clinch flags")
+            return {}
+        if len(pairs) > CLINCH_MAX_GAMES:
+            logging.warning(f"Remaining week {offset} has {len(pairs)} games, over CLINCH_MAX_GAMES; not computing clinch flags")
+            return {}
+        schedule.append([tuple(pair) for pair in pairs.values()])
+
+    calculator = ClinchCalculator(table.wins, table.points_for, schedule, playoff_teams, bye_count(playoff_teams))
+    flags = {}
+    for i, roster_id in enumerate(roster_ids):
+        flag = calculator.status(i)
+        if flag:
+            flags[roster_id] = flag
+    return flags
@@ -0,0 +1,91 @@
+"""Process pool for the CPU-heavy part of each job
+
+Fetching is I/O and stays on the event loop; ranking, clinch checks, odds
+simulations and text layouts run in worker processes so a big batch of
+leagues neither stalls the loop (live edits, Discord heartbeats) nor sits
+on one core. Jobs hand the pool a top-level function plus plain data
+(League objects and Sleeper's JSON lists), which pickle cheaply; metrics
+recorded in a worker come back with the result and count towards the
+caller's run.
+
+COMPUTE_WORKERS sets the pool size. It defaults to 0, which runs everything
+inline on the loop: a one-shot cli.py run renders a handful of small
+tables, and starting a forkserver and its workers would cost more than the
+work itself. Set it for the long-running bot, or when a single job covers
+enough leagues (or odds simulations) to keep several cores busy.
+
+Workers are started from a forkserver rather than forked from the bot,
+which has the logging listener and aiohttp threads running; what they log
+is sent back through logconfig's worker queue.
+"""
+import os
+import asyncio
+import logging
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+import metrics
+from logconfig import worker_log_queue, setup_worker_logging
+
+COMPUTE_WORKERS = int(os.getenv('COMPUTE_WORKERS', 0))
+
+
+class ComputePool:
+    """A lazily started ProcessPoolExecutor shared by every job in the process"""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = COMPUTE_WORKERS if workers is None else workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Started on first use so importing a job module never spawns processes
+        if self.executor is None:
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=setup_worker_logging,
+                initargs=(worker_log_queue(context), logging.getLogger().getEffectiveLevel())
+            )
+        return self.executor
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) in a worker and await its result
+
+        func must be a module-level function and its arguments picklable.
+        """
+        call = functools.partial(func, *args, **kwargs)
+        if self.workers <= 0:
+            return call()
+
+        loop = asyncio.get_running_loop()
+        try:
+            result, recorded = await loop.run_in_executor(self._get_executor(), _run_measured, call)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool next time
+            # and finish this call inline rather than dropping the league
+            logging.error(f"Compute pool broke while running {func.__name__}, retrying inline")
+            self.executor = None
+            return call()
+
+        # Timings recorded in the worker count towards the caller's run
+        metrics.current().merge(recorded)
+        return result
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+def _run_measured(call: Callable[[], Any]):
+    """Run call in a worker and return its result with the metrics it recorded"""
+    registry = metrics.current()
+    registry.drain()  # Forked workers start with a copy of the parent's numbers
+    result = call()
+    return result, registry.drain()
+
+# Shared by every job in the process
+compute_pool = ComputePool()
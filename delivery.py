@@ -0,0 +1,172 @@
+import time
+import asyncio
+import logging
+import metrics
+from typing import List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import discord
+
+# Discord limits per message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+MAX_CONTENT_CHARS = 2000
+
+MAX_RETRIES = 3
+BASE_BACKOFF = 0.5
+
+
+class DeliveryResult:
+    """Outcome of sending one Discord message"""
+
+    def __init__(self, embeds: int = 0, chars: int = 0):
+        self.embeds = embeds
+        self.chars = chars
+        self.message: Optional['discord.Message'] = None
+        self.error: Optional[Exception] = None
+        self.attempts = 0
+        self.seconds = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.message is not None
+
+    def __repr__(self):
+        status = 'ok' if self.ok else f'failed: {self.error}'
+        return f"DeliveryResult(embeds={self.embeds}, chars={self.chars}, attempts={self.attempts}, {status})"
+
+
+def pack_embeds(embeds: List['discord.Embed']) -> List[List['discord.Embed']]:
+    """Greedily pack embeds into as few messages as Discord's limits allow"""
+    batches = []
+    batch, batch_chars = [], 0
+    for embed in embeds:
+        size = len(embed)
+        if batch and (len(batch) >= MAX_EMBEDS_PER_MESSAGE or batch_chars + size > MAX_EMBED_CHARS_PER_MESSAGE):
+            batches.append(batch)
+            batch, batch_chars = [], 0
+        batch.append(embed)
+        batch_chars += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+def pack_text(chunks: List[str]) -> List[str]:
+    """Join text chunks into as few messages as the content limit allows"""
+    messages = []
+    current = ""
+    for chunk in chunks:
+        candidate = f"{current}\n{chunk}" if current else chunk
+        if current and len(candidate) > MAX_CONTENT_CHARS:
+            messages.append(current)
+            current = chunk
+        else:
+            current = candidate
+    if current:
+        messages.append(current)
+    return messages
+
+def get_retry_after(error: 'discord.HTTPException') -> Optional[float]:
+    """Seconds Discord asked us to wait, from the error or its rate-limit headers"""
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after is not None:
+        return float(retry_after)
+
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    for header in ('X-RateLimit-Reset-After', 'Retry-After'):
+        if headers.get(header):
+            try:
+                return float(headers[header])
+            except ValueError:
+                pass
+    return None
+
+async def send_with_retry(channel, result: DeliveryResult, **kwargs) -> DeliveryResult:
+    """Send one message, retrying only on rate limits and Discord server errors"""
+    await call_with_retry(channel.send, result, **kwargs)
+    record_delivery('send', getattr(channel, 'id', None), result)
+    return result
+
+async def edit_with_retry(message, result: DeliveryResult, **kwargs) -> DeliveryResult:
+    """Edit an existing message in place, with the same retry policy as sends"""
+    await call_with_retry(message.edit, result, **kwargs)
+    record_delivery('edit', getattr(getattr(message, 'channel', None), 'id', None), result)
+    return result
+
+def record_delivery(op: str, channel_id, result: DeliveryResult):
+    """Count one send or edit, its retries and size, and time it under the send stage"""
+    outcome = 'ok' if result.ok else 'failed'
+    metrics.inc('discord_messages_total', op=op, channel=channel_id, outcome=outcome)
+    metrics.inc('discord_bytes_total', result.chars, op=op, channel=channel_id)
+    if result.attempts > 1:
+        metrics.inc('discord_retries_total', result.attempts - 1, op=op, channel=channel_id)
+    metrics.observe('stage_seconds', result.seconds, stage='send', step=op, channel=channel_id)
+
+async def call_with_retry(call, result: DeliveryResult, **kwargs) -> DeliveryResult:
+    start = time.perf_counter()
+    try:
+        return await _call_with_retry(call, result, **kwargs)
+    finally:
+        result.seconds = time.perf_counter() - start
+
+async def _call_with_retry(call, result: DeliveryResult, **kwargs) -> DeliveryResult:
+    # Loaded here so importing the packing helpers doesn't pull in discord.py
+    import discord
+    from webhook import WebhookError
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        result.attempts = attempt
+        try:
+            result.message = await call(**kwargs)
+            result.error = None
+            return result
+        except (discord.HTTPException, WebhookError) as e:
+            result.error = e
+            status = getattr(e, 'status', None)
+            retry_after = get_retry_after(e)
+
+            if status != 429 and not (status and status >= 500) and retry_after is None:
+                break  # Client errors won't succeed on retry
+            if attempt == MAX_RETRIES:
+                break
+
+            delay = retry_after if retry_after is not None else BASE_BACKOFF * 2 ** (attempt - 1)
+            logging.warning(f"Discord send failed with status {status}, retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    logging.error(f"Failed to deliver message after {result.attempts} attempts: {str(result.error)}")
+    return result
+
+async def deliver_embeds(channel, embeds: List['discord.Embed'], content: Optional[str] = None) -> List[DeliveryResult]:
+    """Send embeds packed into as few messages as possible; content goes on the first"""
+    results = []
+    for index, batch in enumerate(pack_embeds(embeds)):
+        kwargs = {'embeds': batch}
+        if index == 0 and content:
+            kwargs['content'] = content
+        result = DeliveryResult(embeds=len(batch), chars=sum(len(embed) for embed in batch))
+        results.append(await send_with_retry(channel, result, **kwargs))
+
+    if not embeds and content:
+        results.append(await send_with_retry(channel, DeliveryResult(chars=len(content)), content=content))
+
+    log_outcome(channel, results)
+    return results
+
+async def deliver_text(channel, chunks: List[str]) -> List[DeliveryResult]:
+    """Send text chunks packed into as few messages as possible"""
+    results = []
+    for message in pack_text(chunks):
+        result = DeliveryResult(chars=len(message))
+        results.append(await send_with_retry(channel, result, content=message))
+
+    log_outcome(channel, results)
+    return results
+
+def log_outcome(channel, results: List[DeliveryResult]):
+    sent = sum(1 for result in results if result.ok)
+    logging.info(f"Delivered {sent}/{len(results)} messages to channel {getattr(channel, 'id', channel)}")
+    for result in results:
+        if not result.ok:
+            logging.error(f"Undelivered message: {result}")
@@ -0,0 +1,294 @@
+"""Local stand-in for the Sleeper API, plus fake Discord and webhook sinks
+
+    python fakeserver.py --cassette run.json              # replay a recorded run
+    python fakeserver.py --leagues 300 --latency-ms 40    # synthesize 300 leagues
+
+Point the bots at it with SLEEPER_BASE_URL=http://127.0.0.1:8080/v1.
+"""
+import math
+import time
+import random
+import asyncio
+import argparse
+import logging
+from aiohttp import web
+from typing import Dict, Any, List, Optional
+
+from cassette import Cassette, cassette_key
+from synthetic import make_league, make_players, REGULAR_SEASON_WEEKS
+from logconfig import setup_logging
+
+
+class SyntheticSleeper:
+    """Serves N synthetic leagues, generated lazily on first request"""
+
+    def __init__(self, num_leagues: int, num_teams: int = 12, weeks: int = REGULAR_SEASON_WEEKS, seed: int = 0):
+        self.num_leagues = num_leagues
+        self.num_teams = num_teams
+        self.weeks = weeks
+        self.seed = seed
+        self.leagues: Dict[str, Dict[str, Any]] = {}
+        self.players: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def league_ids(self) -> List[str]:
+        return [f'9{i:08d}' for i in range(self.num_leagues)]
+
+    def league(self, league_id: str) -> Optional[Dict[str, Any]]:
+        if league_id not in self.leagues:
+            if not (league_id.startswith('9') and league_id[1:].isdigit()):
+                return None
+            index = int(league_id[1:])
+            if index >= self.num_leagues:
+                return None
+            divisions = 2 if index % 2 == 0 else 0
+            self.leagues[league_id] = make_league(self.num_teams, self.weeks, divisions, self.seed, index)
+        return self.leagues[league_id]
+
+    def lookup(self, path: str) -> Optional[Any]:
+        parts = [p for p in path.split('/') if p]
+        if parts[:3] == ['v1', 'state', 'nfl']:
+            return {'season': '2024', 'season_type': 'regular', 'week': self.weeks, 'leg': self.weeks,
+                    'display_week': self.weeks}
+        if parts[:3] == ['v1', 'players', 'nfl']:
+            if self.players is None:
+                self.players = make_players(self.seed)
+            return self.players
+        if len(parts) < 3 or parts[:2] != ['v1', 'league']:
+            return None
+
+        league = self.league(parts[2])
+        if league is None:
+            return None
+        if len(parts) == 3:
+            return {'league_id': league['league_id'], 'name': league['name'], 'total_rosters': self.num_teams}
+
+        endpoint = parts[3]
+        if endpoint == 'matchups' and len(parts) == 5:
+            return league['matchups'].get(int(parts[4]), [])
+        if endpoint in ('users', 'rosters', 'winners_bracket', 'losers_bracket'):
+            return league[endpoint]
+        return None
+
+
+class FakeSleeperServer:
+    """aiohttp app replaying a cassette or synthetic leagues with injected latency and errors"""
+
+    def __init__(self, source, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0,
+                 rate_limit_rate: float = 0, seed: int = 0):
+        self.source = source
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.runner: Optional[web.AppRunner] = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        delay = self.latency_ms + self.rng.uniform(0, self.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            self.errors += 1
+            return web.Response(status=429, headers={'Retry-After': '0.1'})
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.errors += 1
+            return web.Response(status=503)
+
+        key = cassette_key(str(request.url))
+        if isinstance(self.source, Cassette):
+            entry = self.source.lookup(key)
+            if entry is None:
+                return web.Response(status=404)
+            return web.json_response(entry['body'], status=entry['status'])
+
+        body = self.source.lookup(key)
+        if body is None:
+            return web.Response(status=404)
+        return web.json_response(body)
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start serving and return the base URL to use as SLEEPER_BASE_URL"""
+        self.runner = web.AppRunner(self.app(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        bound_port = self.runner.addresses[0][1]
+        return f'http://{host}:{bound_port}/v1'
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+
+class FakeMessage:
+    def __init__(self, channel, message_id: int, content=None, embeds=None):
+        self.channel = channel
+        self.id = message_id
+        self.content = content
+        self.embeds = embeds or []
+        self.pinned = False
+
+    async def pin(self):
+        self.pinned = True
+
+    async def edit(self, content=None, embed=None, embeds=None):
+        self.channel.edits += 1
+        if content is not None:
+            self.content = content
+        if embed is not None:
+            self.embeds = [embed]
+        if embeds is not None:
+            self.embeds = embeds
+        return self
+
+
+class FakeChannel:
+    """Discord channel stand-in that records what would have been posted"""
+
+    def __init__(self, channel_id: int, latency_ms: float = 0):
+        self.id = channel_id
+        self.latency_ms = latency_ms
+        self.messages: List[FakeMessage] = []
+        self.edits = 0
+        self.send_times: List[float] = []
+
+    async def send(self, content=None, embed=None, embeds=None, **kwargs):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        message = FakeMessage(self, len(self.messages) + 1, content, [embed] if embed else embeds)
+        self.messages.append(message)
+        self.send_times.append(time.perf_counter())
+        return message
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        return self.messages[message_id - 1]
+
+
+class FakeDiscordClient:
+    """Just enough of discord.Client for the post_* jobs"""
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency_ms = latency_ms
+        self.channels: Dict[int, FakeChannel] = {}
+        self.user = 'fake-bot'
+
+    def get_channel(self, channel_id: int) -> FakeChannel:
+        if channel_id not in self.channels:
+            self.channels[channel_id] = FakeChannel(channel_id, self.latency_ms)
+        return self.channels[channel_id]
+
+    def sent_messages(self) -> int:
+        return sum(len(channel.messages) for channel in self.channels.values())
+
+
+class FakeWebhookServer:
+    """Discord webhook stand-in with the per-webhook rate limit headers
+
+    Each webhook allows `bucket` posts per `reset_ms` window; posting into an
+    empty bucket gets a 429 with retry_after, as Discord does.
+    """
+
+    def __init__(self, latency_ms: float = 0, bucket: int = 5, reset_ms: float = 100):
+        self.latency_ms = latency_ms
+        self.bucket = bucket
+        self.reset_ms = reset_ms
+        self.messages: Dict[str, List[Dict[str, Any]]] = {}
+        self.rate_limited = 0
+        # webhook id -> (window start, posts in window)
+        self.windows: Dict[str, List[float]] = {}
+        self.runner: Optional[web.AppRunner] = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/api/webhooks/{webhook_id}/{token}', self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        webhook_id = request.match_info['webhook_id']
+        now = time.monotonic()
+        window = self.windows.setdefault(webhook_id, [now, 0])
+        if now - window[0] >= self.reset_ms / 1000:
+            window[:] = [now, 0]
+        # Rounded up to the millisecond, so waiting it out always lands in the next window
+        reset_after = math.ceil(max(0.0, window[0] + self.reset_ms / 1000 - now) * 1000) / 1000
+
+        if window[1] >= self.bucket:
+            self.rate_limited += 1
+            return web.json_response({'message': 'You are being rate limited.', 'retry_after': reset_after, 'global': False},
+                                     status=429, headers={'Retry-After': f'{reset_after:.3f}'})
+
+        window[1] += 1
+        messages = self.messages.setdefault(webhook_id, [])
+        message = dict(await request.json(), id=str(len(messages) + 1))
+        messages.append(message)
+        return web.json_response(message, headers={
+            'X-RateLimit-Limit': str(self.bucket),
+            'X-RateLimit-Remaining': str(self.bucket - window[1]),
+            'X-RateLimit-Reset-After': f'{reset_after:.3f}',
+        })
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start serving and return the URL prefix for webhook URLs"""
+        self.runner = web.AppRunner(self.app(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        bound_port = self.runner.addresses[0][1]
+        return f'http://{host}:{bound_port}/api/webhooks'
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def sent_messages(self) -> int:
+        return sum(len(messages) for messages in self.messages.values())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cassette', help='Replay this recorded cassette instead of synthetic leagues')
+    parser.add_argument('--leagues', type=int, default=40, help='Synthetic leagues to serve')
+    parser.add_argument('--teams', type=int, default=12, help='Teams per synthetic league')
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of requests answered with 503')
+    parser.add_argument('--rate-limit-rate', type=float, default=0, help='Fraction of requests answered with 429')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    return parser.parse_args(argv)
+
+def make_source(args):
+    if args.cassette:
+        return Cassette.load(args.cassette)
+    return SyntheticSleeper(args.leagues, args.teams)
+
+async def serve(args):
+    server = FakeSleeperServer(make_source(args), args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate)
+    base_url = await server.start(args.host, args.port)
+    logging.info(f"Fake Sleeper API listening on {base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+if __name__ == "__main__":
+    setup_logging(logging.INFO, log_file=None)
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,100 @@
+import os
+import json
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Sequence
+from standings import DEFAULT_TIEBREAKERS, TIEBREAKERS
+
+LEAGUES_CONFIG = os.getenv('LEAGUES_CONFIG', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'leagues.json'))
+DEFAULT_CONCURRENCY = 8
+
+
+class League:
+    """One Sleeper league from the registry"""
+
+    def __init__(self, league_id: str, name: str, divisions: bool = False,
+                 nicknames: Optional[Dict[str, str]] = None, channel_id: Optional[int] = None,
+                 tiebreakers: Optional[Sequence[str]] = None, webhook_url: Optional[str] = None):
+        self.league_id = league_id
+        self.name = name
+        self.divisions = divisions
+        self.nicknames = nicknames or {}
+        self.channel_id = channel_id
+        # Standings ranking keys in priority order, e.g. wins, head_to_head, points_for
+        self.tiebreakers = tuple(tiebreakers or DEFAULT_TIEBREAKERS)
+        # Post through this channel webhook instead of the logged-in bot
+        self.webhook_url = webhook_url
+
+    @property
+    def destination(self):
+        """Where posts go: the webhook URL if there is one, else the channel ID"""
+        return self.webhook_url or self.channel_id
+
+    def __repr__(self):
+        return f"League({self.league_id!r}, {self.name!r})"
+
+    @classmethod
+    def from_config(cls, entry: Dict[str, Any]) -> 'League':
+        # IDs may be given inline or read from an environment variable
+        league_id = entry.get('id') or os.getenv(entry.get('id_env', ''))
+        if not league_id:
+            raise ValueError(f"No league ID configured for {entry.get('name', entry)}")
+
+        channel_id = entry.get('channel_id') or os.getenv(entry.get('channel_id_env', 'CHANNEL_ID'))
+        webhook_url = entry.get('webhook_url') or os.getenv(entry.get('webhook_url_env', ''))
+
+        tiebreakers = entry.get('tiebreakers')
+        for name in tiebreakers or []:
+            if name not in TIEBREAKERS:
+                raise ValueError(f"Unknown tiebreaker {name!r} for {entry.get('name', league_id)}")
+
+        return cls(
+            league_id=str(league_id),
+            name=entry.get('name', str(league_id)),
+            divisions=bool(entry.get('divisions', False)),
+            nicknames=entry.get('nicknames', {}),
+            channel_id=int(channel_id) if channel_id else None,
+            tiebreakers=tiebreakers,
+            webhook_url=webhook_url or None
+        )
+
+
+def load_config(path: str = LEAGUES_CONFIG) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_leagues(path: str = LEAGUES_CONFIG) -> List[League]:
+    """Load the league registry from the config file"""
+    return [League.from_config(entry) for entry in load_config(path).get('leagues', [])]
+
+def get_concurrency(path: str = LEAGUES_CONFIG) -> int:
+    """Max leagues processed at once; LEAGUE_CONCURRENCY overrides the config file"""
+    value = os.getenv('LEAGUE_CONCURRENCY')
+    if value is None:
+        value = load_config(path).get('concurrency', DEFAULT_CONCURRENCY)
+    return max(1, int(value))
+
+def group_by_channel(items, get_league=lambda item: item):
+    """Group items by their league's destination (webhook or channel), keeping config order"""
+    channels = {}
+    for item in items:
+        channels.setdefault(get_league(item).destination, []).append(item)
+    return channels
+
+async def process_leagues(leagues: List[League], worker: Callable[[League], Awaitable[Any]],
+                          concurrency: Optional[int] = None) -> List[Any]:
+    """Run worker for every league concurrently, at most `concurrency` at a time
+
+    Results come back in league order; a league whose worker raised gets None.
+    """
+    semaphore = asyncio.Semaphore(concurrency or get_concurrency())
+
+    async def run(league):
+        async with semaphore:
+            try:
+                return await worker(league)
+            except Exception as e:
+                logging.error(f"Error processing league {league.name}: {str(e)}")
+                return None
+
+    return await asyncio.gather(*(run(league) for league in leagues))
@@ -0,0 +1,256 @@
+"""Live scoring: one message per league, edited in place as scores change
+
+    python live.py              # poll until stopped
+    LIVE_MODE=1 python bot.py   # run alongside the scheduled jobs
+
+Matchups are polled quickly during NFL game windows and slowly otherwise.
+Only matchups whose points moved are re-rendered, and a league's message is
+only edited when at least one of them did.
+
+Live boards are edited and pinned through the bot, so leagues that only
+post through a webhook are left out.
+"""
+import os
+import json
+import asyncio
+import logging
+import datetime
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+
+from nfl import in_game_window, resolve_week
+from sleeper import SleeperAPI
+from snapshot import LeagueSnapshot
+from ratelimit import PRIORITY_LIVE
+from leagues import load_leagues, process_leagues
+from delivery import DeliveryResult, send_with_retry, edit_with_retry
+from render import TextBuffer, matchup_row, MATCHUPS_TABLE_HEADER
+from logconfig import setup_logging
+
+if TYPE_CHECKING:
+    import discord
+
+DISCORD_BOT_TOKEN = os.getenv('DISCORD_BOT_TOKEN')
+
+# league_id -> {'channel_id', 'message_id', 'week'} so restarts keep editing the same message
+LIVE_STATE = os.getenv('LIVE_STATE', 'live_state.json')
+
+# Seconds between polls inside and outside NFL game windows
+LIVE_FAST_INTERVAL = int(os.getenv('LIVE_FAST_INTERVAL', 60))
+LIVE_IDLE_INTERVAL = int(os.getenv('LIVE_IDLE_INTERVAL', 30 * 60))
+
+def poll_interval(now=None) -> int:
+    return LIVE_FAST_INTERVAL if in_game_window(now) else LIVE_IDLE_INTERVAL
+
+
+class LeagueBoard:
+    """One league's live matchups table and the message it is shown in"""
+
+    def __init__(self, league, message_id: Optional[int] = None):
+        self.league = league
+        self.message_id = message_id
+        self.message = None
+        self.snapshot: Optional[LeagueSnapshot] = None
+        # matchup_id -> ((roster_id, points), ...) as last rendered
+        self.scores: Dict[Any, tuple] = {}
+        # matchup_id -> rendered table row
+        self.rows: Dict[Any, str] = {}
+
+    def update(self, matchups: List[Dict[str, Any]]) -> List[Any]:
+        """Re-render the matchups whose points changed and return their IDs"""
+        pairs = {}
+        for matchup in matchups:
+            matchup_id = matchup.get('matchup_id')
+            if matchup_id:
+                pairs.setdefault(matchup_id, []).append(matchup)
+
+        changed = []
+        for matchup_id, pair in pairs.items():
+            if len(pair) != 2:
+                continue
+            scores = tuple((m.get('roster_id'), m.get('points') or 0) for m in pair)
+            if self.scores.get(matchup_id) == scores:
+                continue
+            self.scores[matchup_id] = scores
+            self.rows[matchup_id] = matchup_row(pair[0], pair[1], self.snapshot)
+            changed.append(matchup_id)
+
+        return changed
+
+    def knows_rosters(self, matchups: List[Dict[str, Any]]) -> bool:
+        return all(m.get('roster_id') in self.snapshot.rosters_by_id for m in matchups)
+
+    def embed(self, week: int) -> 'discord.Embed':
+        # discord.py is slow to import, so only load it when actually posting
+        import discord
+
+        # Unchanged matchups reuse their row from the last render
+        buffer = TextBuffer()
+        buffer.write("```", MATCHUPS_TABLE_HEADER, *(self.rows[matchup_id] for matchup_id in sorted(self.rows)), "```")
+        embed = discord.Embed(
+            title=f"{self.league.name} - Live Scores Week {week}",
+            description=buffer.getvalue(),
+            color=0x587ac7
+        )
+        embed.set_footer(text="Sleeper Bot • Updated")
+        embed.timestamp = datetime.datetime.now(datetime.timezone.utc)
+        return embed
+
+
+class LiveScoreboard:
+    """Polls every league's matchups and keeps one message per league up to date"""
+
+    def __init__(self, client, leagues=None, week: Optional[int] = None, state_path: Optional[str] = None):
+        self.client = client
+        leagues = load_leagues() if leagues is None else leagues
+        # A webhook message can't be pinned, so only leagues with a bot channel get a board
+        self.leagues = [league for league in leagues if league.channel_id]
+        for league in leagues:
+            if not league.channel_id:
+                logging.info(f"{league.name} has no channel ID, leaving it out of live scoring")
+        self.fixed_week = week
+        self.week = week
+        self.state_path = state_path or LIVE_STATE
+        self.state: Dict[str, Dict[str, Any]] = self.load_state()
+        self.boards: Dict[str, LeagueBoard] = {}
+
+    def load_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.error(f"Ignoring unreadable live state {self.state_path}: {str(e)}")
+            return {}
+
+    def save_state(self):
+        tmp_path = f'{self.state_path}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logging.error(f"Error writing live state {self.state_path}: {str(e)}")
+
+    def board(self, league) -> LeagueBoard:
+        if league.league_id not in self.boards:
+            # Reuse last run's message, unless it was for another week or channel
+            saved = self.state.get(league.league_id, {})
+            message_id = None
+            if saved.get('week') == self.week and saved.get('channel_id') == league.channel_id:
+                message_id = saved.get('message_id')
+            self.boards[league.league_id] = LeagueBoard(league, message_id)
+        return self.boards[league.league_id]
+
+    async def poll_once(self, sleeper: SleeperAPI) -> int:
+        """Poll every league once and return how many messages were edited or posted"""
+        week = self.fixed_week or await resolve_week(sleeper)
+        if week is None:
+            logging.warning("Could not determine the NFL week, skipping live poll")
+            return 0
+        if week != self.week:
+            # A new week gets a fresh message per league
+            self.week = week
+            self.boards = {}
+
+        updated = await process_leagues(self.leagues, lambda league: self.poll_league(sleeper, league))
+        count = sum(1 for result in updated if result)
+        if count:
+            self.save_state()
+        return count
+
+    async def poll_league(self, sleeper: SleeperAPI, league) -> bool:
+        board = self.board(league)
+        matchups = await sleeper.get_matchups(league.league_id, self.week, priority=PRIORITY_LIVE)
+        if matchups is None:
+            return False
+
+        # Names only change when rosters do; reload them if a roster shows up we haven't seen
+        if board.snapshot is None or not board.knows_rosters(matchups):
+            rosters, users = await asyncio.gather(
+                sleeper.get_rosters(league.league_id),
+                sleeper.get_users(league.league_id)
+            )
+            board.snapshot = LeagueSnapshot(rosters, users, league.nicknames)
+            board.scores = {}
+
+        changed = board.update(matchups)
+        if not changed and board.message is not None:
+            return False
+
+        logging.info(f"{league.name}: {len(changed)} matchup(s) changed")
+        shown = await self.show(board)
+        if not shown:
+            # Forget these scores so the next poll tries the update again
+            for matchup_id in changed:
+                board.scores.pop(matchup_id, None)
+        return shown
+
+    async def show(self, board: LeagueBoard) -> bool:
+        """Edit the league's message, posting (and pinning) a new one if there isn't one"""
+        import discord
+
+        league = board.league
+        channel = self.client.get_channel(league.channel_id)
+        if channel is None:
+            logging.error(f"Channel with ID {league.channel_id} not found")
+            return False
+
+        if board.message is None and board.message_id:
+            try:
+                board.message = await channel.fetch_message(board.message_id)
+            except (discord.NotFound, discord.Forbidden):
+                logging.warning(f"Live message for {league.name} is gone, posting a new one")
+                board.message_id = None
+            except discord.HTTPException as e:
+                logging.error(f"Error fetching live message for {league.name}: {str(e)}")
+                return False
+
+        embed = board.embed(self.week)
+        if board.message is not None:
+            result = await edit_with_retry(board.message, DeliveryResult(embeds=1, chars=len(embed)), embed=embed)
+            return result.ok
+
+        result = await send_with_retry(channel, DeliveryResult(embeds=1, chars=len(embed)), embed=embed)
+        if not result.ok:
+            return False
+
+        board.message = result.message
+        board.message_id = result.message.id
+        self.state[league.league_id] = {'channel_id': league.channel_id, 'message_id': board.message_id, 'week': self.week}
+        try:
+            await board.message.pin()
+        except discord.HTTPException as e:
+            logging.warning(f"Could not pin the live message for {league.name}: {str(e)}")
+        return True
+
+    async def run_forever(self):
+        async with SleeperAPI() as sleeper:
+            while True:
+                try:
+                    await self.poll_once(sleeper)
+                    sleeper.cache.flush()
+                except Exception as e:
+                    logging.error(f"Live poll failed: {str(e)}")
+                await asyncio.sleep(poll_interval())
+
+def main():
+    import discord
+
+    setup_logging()
+    intents = discord.Intents.default()
+    client = discord.Client(intents=intents)
+    scoreboard = LiveScoreboard(client)
+    tasks = []
+
+    @client.event
+    async def on_ready():
+        print(f"Logged in as {client.user}")
+        # on_ready fires again after every reconnect; only start polling once
+        if not tasks:
+            tasks.append(asyncio.create_task(scoreboard.run_forever()))
+
+    client.run(DISCORD_BOT_TOKEN, log_handler=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""End-to-end load test of the results/playoffs/brackets jobs, fully offline
+
+    python loadtest.py --leagues 300 --latency-ms 40 --error-rate 0.02
+    python loadtest.py --cassette run.json --job playoffs
+
+Starts the fake Sleeper server in-process, points SleeperAPI at it with an
+empty cache, runs each job against a fake Discord client and prints a JSON
+summary of wall time, Sleeper requests and Discord messages per job. With
+--webhooks the one-shot jobs post to a fake webhook endpoint instead, with
+no client at all.
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+import tempfile
+
+import cache
+import changes
+import compute
+import metrics
+import season
+import sleeper
+import ratelimit
+from leagues import League
+from cassette import Cassette
+from logconfig import setup_logging
+from fakeserver import FakeSleeperServer, FakeDiscordClient, FakeWebhookServer, SyntheticSleeper
+from synthetic import make_nicknames, make_users
+
+JOBS = ('results', 'playoffs', 'brackets', 'live')
+
+def make_leagues(league_ids, num_teams: int, channels: int):
+    leagues = []
+    for index, league_id in enumerate(league_ids):
+        leagues.append(League(
+            league_id,
+            f'Load League {index}',
+            divisions=index % 2 == 0,
+            nicknames=make_nicknames(make_users(num_teams, index)),
+            channel_id=index % channels + 1
+        ))
+    return leagues
+
+def cassette_league_ids(cassette: Cassette):
+    ids = []
+    for path in cassette.entries:
+        parts = [p for p in path.split('/') if p]
+        if len(parts) >= 3 and parts[1] == 'league' and parts[2] not in ids:
+            ids.append(parts[2])
+    return ids
+
+async def run_job(name, client, leagues, week, webhooks=False):
+    # Live scores edit messages in place, which needs the bot; the rest can post through webhooks
+    if webhooks and name != 'live':
+        client = None
+
+    # Imported here so the job modules pick up the patched Sleeper settings
+    if name == 'results':
+        from results import post_results
+        await post_results(client, leagues, week)
+    elif name == 'playoffs':
+        from playoffs import post_playoffs
+        await post_playoffs(client, leagues, week)
+    elif name == 'brackets':
+        from play import post_brackets
+        await post_brackets(client, leagues, week)
+    else:
+        # Two polls: the first posts every board, the second should edit nothing
+        from live import LiveScoreboard
+        scoreboard = LiveScoreboard(client, leagues, week, state_path=f'{cache.CACHE_DIR}/live_state.json')
+        async with sleeper.SleeperAPI() as api:
+            for _ in range(2):
+                await scoreboard.poll_once(api)
+
+def run_stages(name):
+    """Per-stage totals from the job's exported run summary, if it wrote one"""
+    try:
+        with open(f'{metrics.METRICS_DIR}/{name}.json', 'r', encoding='utf-8') as f:
+            return json.load(f)['stages']
+    except (OSError, ValueError, KeyError):
+        return None
+
+async def main_async(args):
+    if args.cassette:
+        source = Cassette.load(args.cassette)
+        league_ids = cassette_league_ids(source)
+    else:
+        source = SyntheticSleeper(args.leagues, args.teams, args.week)
+        league_ids = source.league_ids()
+
+    server = FakeSleeperServer(source, args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate)
+    sleeper.BASE_URL = await server.start()
+    if args.rate_per_minute:
+        ratelimit.sleeper_limiter.rate = args.rate_per_minute / 60
+
+    compute.compute_pool.workers = args.compute_workers
+
+    leagues = make_leagues(league_ids, args.teams, args.channels)
+    summary = {'leagues': len(leagues), 'compute_workers': args.compute_workers, 'jobs': {}}
+
+    webhook_server = None
+    if args.webhooks:
+        webhook_server = FakeWebhookServer(args.discord_latency_ms)
+        webhook_base = await webhook_server.start()
+        for league in leagues:
+            league.webhook_url = f'{webhook_base}/{league.channel_id}/loadtest-token'
+
+    try:
+        for name in args.job:
+            # Every job starts cold so it exercises the full fetch path
+            cache.CACHE_DIR = tempfile.mkdtemp(prefix='sleeper-loadtest-')
+            changes.POST_STATE = f'{cache.CACHE_DIR}/post_state.json'
+            season.SEASON_DB = f'{cache.CACHE_DIR}/season.sqlite3'
+            metrics.METRICS_DIR = cache.CACHE_DIR
+            client = FakeDiscordClient(args.discord_latency_ms)
+            requests_before, errors_before = server.requests, server.errors
+            webhook_before = webhook_server.sent_messages() if webhook_server else 0
+
+            start = time.perf_counter()
+            await run_job(name, client, leagues, args.week, args.webhooks)
+            elapsed = time.perf_counter() - start
+            webhook_messages = webhook_server.sent_messages() - webhook_before if webhook_server else 0
+
+            summary['jobs'][name] = {
+                'wall_seconds': round(elapsed, 3),
+                'sleeper_requests': server.requests - requests_before,
+                'injected_errors': server.errors - errors_before,
+                'discord_messages': client.sent_messages() + webhook_messages,
+                'discord_edits': sum(channel.edits for channel in client.channels.values()),
+                'leagues_per_second': round(len(leagues) / elapsed, 1) if elapsed else None,
+                'stages': run_stages(name),
+            }
+            logging.info(f"{name}: {summary['jobs'][name]}")
+    finally:
+        await server.stop()
+        if webhook_server:
+            summary['webhook_rate_limited'] = webhook_server.rate_limited
+            await webhook_server.stop()
+        compute.compute_pool.shutdown()
+
+    summary['rate_limiter'] = ratelimit.sleeper_limiter.metrics()
+    return summary
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--job', action='append', choices=JOBS, help='Job to run (repeatable, default all)')
+    parser.add_argument('--cassette', help='Replay this recorded cassette instead of synthetic leagues')
+    parser.add_argument('--leagues', type=int, default=100)
+    parser.add_argument('--teams', type=int, default=12)
+    parser.add_argument('--week', type=int, default=14)
+    parser.add_argument('--channels', type=int, default=4, help='Spread leagues over this many fake channels')
+    parser.add_argument('--latency-ms', type=float, default=30)
+    parser.add_argument('--jitter-ms', type=float, default=20)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0)
+    parser.add_argument('--discord-latency-ms', type=float, default=50)
+    parser.add_argument('--webhooks', action='store_true', help='Post through a fake webhook endpoint instead of a client')
+    parser.add_argument('--compute-workers', type=int, default=compute.COMPUTE_WORKERS,
+                        help='Compute pool processes (0 renders inline on the event loop)')
+    parser.add_argument('--rate-per-minute', type=float, help='Override the Sleeper rate limit for the test')
+    parser.add_argument('--output', help='Also write the JSON summary here')
+    args = parser.parse_args(argv)
+    args.job = args.job or list(JOBS)
+    return args
+
+def main(argv=None):
+    setup_logging(logging.WARNING, log_file=None)
+    args = parse_args(argv)
+    summary = asyncio.run(main_async(args))
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Logging for every entry point, written off the event loop
+
+setup_logging() puts a single QueueHandler on the root logger. Records
+are queued in memory and a QueueListener thread formats and writes them,
+so a slow disk never blocks the Discord heartbeat or in-flight fetches:
+
+- the log file (LOG_FILE) gets one JSON object per line and is rotated by
+  size (LOG_MAX_BYTES, keeping LOG_BACKUPS old files);
+- the console gets the usual human-readable lines.
+
+Per-request fetch lines on the 'sleeper.fetch' logger are sampled: only one
+in LOG_FETCH_SAMPLE of their INFO/DEBUG records is kept. Warnings and errors
+are never dropped. Nothing is configured at import; entry points call
+setup_logging() once, and calling it again does nothing.
+
+Compute pool workers log into a multiprocessing queue (worker_log_queue)
+whose records are replayed into this process's logging, so they reach the
+same file and console.
+"""
+import os
+import json
+import queue
+import atexit
+import logging
+import datetime
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+LOG_FILE = os.getenv('LOG_FILE', 'sleeper_playoff_bot.log')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_BACKUPS = int(os.getenv('LOG_BACKUPS', 5))
+LOG_FETCH_SAMPLE = int(os.getenv('LOG_FETCH_SAMPLE', 20))
+
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Loggers whose routine records are sampled
+SAMPLED_LOGGERS = ('sleeper.fetch',)
+
+# LogRecord attributes that aren't extra= fields
+STANDARD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener: Optional[QueueListener] = None
+_worker_queue = None
+_worker_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any extra= fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in STANDARD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """Keep one in `every` routine records from the sampled loggers"""
+
+    def __init__(self, every: int, loggers=SAMPLED_LOGGERS):
+        super().__init__()
+        self.every = max(1, every)
+        self.loggers = tuple(loggers)
+        self.seen = 0
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not record.name.startswith(self.loggers):
+            return True
+        with self.lock:
+            self.seen += 1
+            return (self.seen - 1) % self.every == 0
+
+
+class PreparedQueueHandler(QueueHandler):
+    """QueueHandler that keeps the exception for the listener's formatters
+
+    The stock prepare() folds the traceback into the message text, which
+    would leave the JSON log with no separate exception field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            # The listener only needs the text; dropping the traceback frees its frames
+            record.exc_info = None
+        return record
+
+
+class ForwardHandler(logging.Handler):
+    """Hands records from worker processes to this process's loggers"""
+
+    def emit(self, record: logging.LogRecord):
+        logging.getLogger(record.name).handle(record)
+
+
+def setup_logging(level=None, log_file: Optional[str] = LOG_FILE, console: bool = True):
+    """Route every log record through a background writer
+
+    log_file=None logs to the console only, for command-line tools.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    handlers = []
+    if log_file:
+        file_handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT, DATE_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = PreparedQueueHandler(log_queue)
+    queue_handler.addFilter(SampleFilter(LOG_FETCH_SAMPLE))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level if level is not None else LOG_LEVEL)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(stop_logging)
+
+def worker_log_queue(context):
+    """A queue for pool workers to log into, replayed into this process's logging"""
+    global _worker_queue, _worker_listener
+    if _worker_queue is None:
+        _worker_queue = context.Queue()
+        _worker_listener = QueueListener(_worker_queue, ForwardHandler())
+        _worker_listener.start()
+    return _worker_queue
+
+def setup_worker_logging(log_queue, level):
+    """Process pool initializer: send everything this worker logs to the parent"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    # Sampling happens once, in the parent
+    root.addHandler(PreparedQueueHandler(log_queue))
+    root.setLevel(level)
+
+def stop_logging():
+    global _listener, _worker_listener
+    # Workers' records go through the main queue, so drain theirs first
+    if _worker_listener is not None:
+        _worker_listener.stop()
+        _worker_listener = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,24 +1,57 @@
-import requests
+"""Print matchups to the terminal without posting anything
 
-def get_matchups(league_id, week):
-    url = f"https://api.sleeper.app/v1/league/{league_id}/matchups/{week}"
+    python match.py                                  # every configured league, this week
+    python match.py --league 1132420390292287488 --week 15
+"""
+import sys
+import asyncio
+import logging
+import argparse
+from sleeper import SleeperAPI
+from snapshot import LeagueSnapshot
+from leagues import League, load_leagues
+from render import TextBuffer, write_matchups_table
+from nfl import resolve_week
+from logconfig import setup_logging
 
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an HTTPError if the response status is 4xx or 5xx
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"An error occurred: {e}")
-        return None
+async def get_matchups(league_id, week):
+    async with SleeperAPI() as sleeper:
+        return await sleeper.get_matchups(league_id, week)
 
-if __name__ == "__main__":
-    league_id = "1132420390292287488"
-    week = 15
+async def print_matchups(leagues, week=None):
+    async with SleeperAPI() as sleeper:
+        week = week or await resolve_week(sleeper)
+        if week is None:
+            print("Could not determine the NFL week.")
+            return
+
+        for league in leagues:
+            rosters, users, matchups = await asyncio.gather(
+                sleeper.get_rosters(league.league_id),
+                sleeper.get_users(league.league_id),
+                sleeper.get_matchups(league.league_id, week)
+            )
+            print(f"\n{league.name} - Week {week}")
+            if not matchups:
+                print("Failed to fetch matchups.")
+                continue
+
+            snapshot = LeagueSnapshot(rosters, users, league.nicknames, matchups)
+            buffer = TextBuffer()
+            write_matchups_table(buffer, snapshot.matchup_pairs(), snapshot)
+            print(buffer.getvalue().strip('`'))
 
-    matchups = get_matchups(league_id, week)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--league', help='A league ID instead of the configured leagues')
+    parser.add_argument('--week', type=int, help='Week to show (default: the current week)')
+    return parser.parse_args(argv)
 
-    if matchups:
-        print("Matchups:")
-        print(matchups)
-    else:
-        print("Failed to fetch matchups.")
\ No newline at end of file
+def main(argv=None):
+    setup_logging(logging.WARNING, log_file=None)
+    args = parse_args(argv)
+    leagues = [League(args.league, args.league)] if args.league else load_leagues()
+    asyncio.run(print_matchups(leagues, args.week))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""Per-run timings and counters, exported as a Prometheus textfile and JSON
+
+Every job run (results, playoffs, brackets) gets its own registry, held in
+a context variable so concurrent jobs on the bot's event loop don't mix
+their numbers. Instrumented code records into whichever run is current:
+
+- fetch:   every SleeperAPI.fetch_data call, by endpoint and league, with
+           cache hits, revalidations, retries and bytes received
+- compute: standings ranking, clinch checks and odds, by league
+- render:  text layouts (standings, matchups, brackets), by league
+- send:    every Discord send/edit, by channel, with retries and bytes
+
+Work done in compute pool processes is recorded there and merged back into
+the caller's run. When a run finishes, METRICS_DIR gets <job>.prom (for
+node_exporter's textfile collector) and <job>.json (a run summary).
+"""
+import os
+import json
+import time
+import logging
+import datetime
+import functools
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+# Where finished runs are written; set METRICS_DIR to an empty string to turn off
+METRICS_DIR = os.getenv('METRICS_DIR', '.metrics')
+
+METRIC_PREFIX = 'playoffsbot_'
+
+# Latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _key(name: str, labels: Dict[str, Any]) -> tuple:
+    return (name, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None)))
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels, extra=()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+class Registry:
+    """Counters and latency histograms for one run, keyed by name and labels"""
+
+    def __init__(self, job: Optional[str] = None):
+        self.job = job
+        self.started_at = time.time()
+        self.duration: Optional[float] = None
+        self.counters: Dict[tuple, float] = {}
+        # key -> [per-bucket counts..., +Inf count, sum, max]
+        self.histograms: Dict[tuple, list] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0, 0.0]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                histogram[i] += 1
+                break
+        else:
+            histogram[len(LATENCY_BUCKETS)] += 1
+        histogram[-2] += value
+        histogram[-1] = max(histogram[-1], value)
+
+    def drain(self) -> Dict[str, Any]:
+        """Hand over everything recorded so far (picklable) and start empty"""
+        data = {'counters': self.counters, 'histograms': self.histograms}
+        self.counters, self.histograms = {}, {}
+        return data
+
+    def merge(self, data: Dict[str, Any]):
+        """Add another registry's drained data, e.g. from a compute pool worker"""
+        for key, value in data['counters'].items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, theirs in data['histograms'].items():
+            ours = self.histograms.get(key)
+            if ours is None:
+                self.histograms[key] = list(theirs)
+                continue
+            for i in range(len(ours) - 1):
+                ours[i] += theirs[i]
+            ours[-1] = max(ours[-1], theirs[-1])
+
+    def to_prometheus(self) -> str:
+        """The run in Prometheus text exposition format, every series labelled with the job
+
+        The label is bot_job, since Prometheus sets job itself on every scrape.
+        """
+        job = (('bot_job', self.job or ''),)
+        lines = []
+
+        names = sorted({name for name, _ in self.counters})
+        for name in names:
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} counter")
+            for (key_name, labels), value in sorted(self.counters.items()):
+                if key_name == name:
+                    lines.append(f"{METRIC_PREFIX}{name}{_format_labels(job + labels)} {value:g}")
+
+        names = sorted({name for name, _ in self.histograms})
+        for name in names:
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} histogram")
+            for (key_name, labels), histogram in sorted(self.histograms.items()):
+                if key_name != name:
+                    continue
+                cumulative = 0
+                bounds = [f'{bound:g}' for bound in LATENCY_BUCKETS] + ['+Inf']
+                for bound, count in zip(bounds, histogram):
+                    cumulative += count
+                    lines.append(f"{METRIC_PREFIX}{name}_bucket{_format_labels(job + labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{METRIC_PREFIX}{name}_sum{_format_labels(job + labels)} {histogram[-2]:.6f}")
+                lines.append(f"{METRIC_PREFIX}{name}_count{_format_labels(job + labels)} {cumulative}")
+
+        if self.duration is not None:
+            lines.append(f"# TYPE {METRIC_PREFIX}run_duration_seconds gauge")
+            lines.append(f"{METRIC_PREFIX}run_duration_seconds{_format_labels(job)} {self.duration:.3f}")
+            lines.append(f"# TYPE {METRIC_PREFIX}run_timestamp_seconds gauge")
+            lines.append(f"{METRIC_PREFIX}run_timestamp_seconds{_format_labels(job)} {self.started_at + self.duration:.0f}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals per stage and counter, plus the same broken down per league and channel"""
+        stages: Dict[str, Dict[str, float]] = {}
+        breakdowns: Dict[str, Dict[str, Dict[str, Any]]] = {'league': {}, 'channel': {}}
+
+        for (name, labels), histogram in self.histograms.items():
+            labels = dict(labels)
+            stage = labels.get('stage', name)
+            count = sum(histogram[:-2])
+            totals = stages.setdefault(stage, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            totals['count'] += count
+            totals['seconds'] = round(totals['seconds'] + histogram[-2], 6)
+            totals['max_seconds'] = round(max(totals['max_seconds'], histogram[-1]), 6)
+            for label, breakdown in breakdowns.items():
+                if label in labels:
+                    entry = breakdown.setdefault(labels[label], {'seconds': {}, 'counters': {}})
+                    entry['seconds'][stage] = round(entry['seconds'].get(stage, 0) + histogram[-2], 6)
+
+        counters: Dict[str, float] = {}
+        for (name, labels), value in self.counters.items():
+            labels = dict(labels)
+            counters[name] = counters.get(name, 0) + value
+            for label, breakdown in breakdowns.items():
+                if label in labels:
+                    entry = breakdown.setdefault(labels[label], {'seconds': {}, 'counters': {}})
+                    entry['counters'][name] = entry['counters'].get(name, 0) + value
+
+        return {
+            'job': self.job,
+            'started_at': datetime.datetime.fromtimestamp(self.started_at, datetime.timezone.utc).isoformat(),
+            'duration_seconds': None if self.duration is None else round(self.duration, 3),
+            'stages': stages,
+            'counters': counters,
+            'leagues': breakdowns['league'],
+            'channels': breakdowns['channel'],
+        }
+
+    def export(self, directory: Optional[str] = None):
+        """Write <job>.prom and <job>.json atomically into the metrics directory"""
+        directory = METRICS_DIR if directory is None else directory
+        if not directory or not self.job:
+            return
+        try:
+            os.makedirs(directory, exist_ok=True)
+            for path, text in (
+                (os.path.join(directory, f'{self.job}.prom'), self.to_prometheus()),
+                (os.path.join(directory, f'{self.job}.json'), json.dumps(self.summary(), indent=2)),
+            ):
+                tmp_path = f'{path}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logging.error(f"Error writing metrics for {self.job}: {str(e)}")
+
+# The run being recorded; outside a run (and in pool workers) this process-wide one
+_default = Registry()
+_current: contextvars.ContextVar = contextvars.ContextVar('metrics_run', default=None)
+
+def current() -> Registry:
+    return _current.get() or _default
+
+def inc(name: str, value: float = 1, **labels):
+    current().inc(name, value, **labels)
+
+def observe(name: str, value: float, **labels):
+    current().observe(name, value, **labels)
+
+@contextmanager
+def timer(stage: str, **labels):
+    """Record the block's wall time under stage_seconds{stage=...}"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe('stage_seconds', time.perf_counter() - start, stage=stage, **labels)
+
+@contextmanager
+def run(job: str):
+    """Record everything inside the block as one run of job, then export it"""
+    registry = Registry(job)
+    token = _current.set(registry)
+    start = time.perf_counter()
+    try:
+        yield registry
+    finally:
+        registry.duration = time.perf_counter() - start
+        _current.reset(token)
+        registry.export()
+
+        stages = ", ".join(f"{stage} {totals['seconds']:.2f}s" for stage, totals in sorted(registry.summary()['stages'].items()))
+        logging.info(f"{job} run took {registry.duration:.2f}s ({stages or 'nothing recorded'})")
+
+def job_run(job: str):
+    """Decorate an async job so each call is recorded and exported as a run"""
+    def decorate(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with run(job):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,158 @@
+import logging
+import datetime
+import pytz
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+
+eastern_tz = pytz.timezone('US/Eastern')
+
+# NFL game windows in US/Eastern as (weekday, start hour, end hour).
+# Monday=0 ... Sunday=6; late games spill past midnight so the following
+# morning is included too
+GAME_WINDOWS = [
+    (3, 19, 24),  # Thursday night
+    (4, 0, 2),
+    (6, 9, 24),   # Sunday (including London games)
+    (0, 0, 2),
+    (0, 19, 24),  # Monday night
+    (1, 0, 2),
+]
+
+def in_game_window(now=None):
+    """Return True while NFL games may be in progress"""
+    if now is None:
+        now = datetime.datetime.now(eastern_tz)
+    else:
+        now = now.astimezone(eastern_tz)
+
+    return any(
+        now.weekday() == weekday and start <= now.hour < end
+        for weekday, start, end in GAME_WINDOWS
+    )
+
+# Sleeper moves /state/nfl on to the next week midweek; we treat each week
+# as running from Wednesday noon US/Eastern, well after that flip and well
+# before Thursday's kickoff, so a Tuesday run still sees the week just played
+WEEK_ROLLOVER_WEEKDAY = 2
+WEEK_ROLLOVER_HOUR = 12
+REGULAR_SEASON_WEEKS = 18
+
+
+class NflState:
+    """The NFL season and week, as reported by Sleeper's /state/nfl
+
+    source is 'sleeper' for a fetched state and 'schedule' for one computed
+    from the calendar when Sleeper couldn't be reached.
+    """
+
+    def __init__(self, season: str, week: Optional[int], season_type: str = 'regular',
+                 leg: Optional[int] = None, source: str = 'sleeper'):
+        self.season = season
+        self.week = week
+        self.season_type = season_type
+        self.leg = leg
+        self.source = source
+
+    def __repr__(self):
+        return f"NflState({self.season!r}, week={self.week!r}, {self.season_type!r}, source={self.source!r})"
+
+    @classmethod
+    def from_sleeper(cls, data: Dict[str, Any]) -> 'NflState':
+        return cls(
+            season=str(data.get('season') or ''),
+            week=data.get('week'),
+            season_type=data.get('season_type') or 'off',
+            leg=data.get('leg')
+        )
+
+    @property
+    def in_season(self) -> bool:
+        """True during the regular season, when fantasy weeks are played"""
+        return self.season_type == 'regular' and bool(self.week)
+
+def last_rollover(now=None) -> datetime.datetime:
+    """The most recent start of an NFL week (Wednesday noon US/Eastern) at or before now"""
+    if now is None:
+        now = datetime.datetime.now(eastern_tz)
+    else:
+        now = now.astimezone(eastern_tz)
+
+    day = now.date() - datetime.timedelta(days=(now.weekday() - WEEK_ROLLOVER_WEEKDAY) % 7)
+    if day == now.date() and now.hour < WEEK_ROLLOVER_HOUR:
+        day -= datetime.timedelta(days=7)
+    return eastern_tz.localize(datetime.datetime.combine(day, datetime.time(WEEK_ROLLOVER_HOUR)))
+
+@lru_cache(maxsize=8)
+def week_starts(season: int) -> List[datetime.datetime]:
+    """Start of every regular-season week, plus the end of the last one
+
+    Week 1 kicks off the Thursday after Labor Day (the first Monday in
+    September), so it starts on the Wednesday before.
+    """
+    september = datetime.date(season, 9, 1)
+    labor_day = september + datetime.timedelta(days=(0 - september.weekday()) % 7)
+    first = labor_day + datetime.timedelta(days=WEEK_ROLLOVER_WEEKDAY)
+    return [
+        eastern_tz.localize(datetime.datetime.combine(first + datetime.timedelta(weeks=week), datetime.time(WEEK_ROLLOVER_HOUR)))
+        for week in range(REGULAR_SEASON_WEEKS + 1)
+    ]
+
+def week_end(season: int, week: int) -> datetime.datetime:
+    """When the given week rolls over into the next one"""
+    first = week_starts(season)[0]
+    day = first.date() + datetime.timedelta(weeks=week)
+    return eastern_tz.localize(datetime.datetime.combine(day, datetime.time(WEEK_ROLLOVER_HOUR)))
+
+def week_is_final(season, week: int, now=None) -> bool:
+    """True once the week has rolled over, so its scores (and stat corrections) are settled
+
+    season may be None when the league's info couldn't be fetched; the
+    calendar's season is used then.
+    """
+    season = int(season) if season else int(scheduled_state(now).season)
+    return last_rollover(now) >= week_end(season, week)
+
+def scheduled_state(now=None) -> NflState:
+    """The NFL state computed from the calendar alone"""
+    if now is None:
+        now = datetime.datetime.now(eastern_tz)
+    else:
+        now = now.astimezone(eastern_tz)
+
+    # January and February belong to the previous year's season
+    season = now.year if now.month >= 3 else now.year - 1
+    week = bisect_right(week_starts(season), now)
+    if week == 0:
+        return NflState(str(season), None, 'pre', source='schedule')
+    if week > REGULAR_SEASON_WEEKS:
+        return NflState(str(season), None, 'post', source='schedule')
+    return NflState(str(season), week, 'regular', leg=week, source='schedule')
+
+async def nfl_state(sleeper=None) -> NflState:
+    """Sleeper's /state/nfl, falling back to the computed schedule if it can't be fetched
+
+    Sleeper's response cache keeps the state until the next week rollover,
+    so every job in a week shares one fetch.
+    """
+    if sleeper is None:
+        # sleeper imports cache, which imports this module
+        from sleeper import SleeperAPI
+        async with SleeperAPI() as api:
+            return await nfl_state(api)
+
+    data = await sleeper.get_nfl_state()
+    if data:
+        return NflState.from_sleeper(data)
+
+    state = scheduled_state()
+    logging.warning(f"Sleeper NFL state unavailable, using the computed schedule: {state}")
+    return state
+
+async def resolve_week(sleeper=None) -> Optional[int]:
+    """The current regular-season week, or None outside the regular season"""
+    state = await nfl_state(sleeper)
+    if not state.in_season:
+        logging.info(f"Not in the NFL regular season: {state}")
+        return None
+    return state.week
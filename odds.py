@@ -0,0 +1,238 @@
+"""Monte Carlo playoff, bye and championship odds
+
+    python odds.py                       # odds for every configured league
+    python odds.py --sims 200000 --workers 4
+
+bench.py times the simulator against a synthetic league.
+
+Each team's weekly score is drawn from a normal distribution fitted to its
+stored matchups. The rest of the regular season and the winners bracket
+are simulated for many seasons at once as NumPy arrays (sims x teams), so
+100k+ seasons take well under a second per league.
+"""
+import os
+import sys
+import asyncio
+import argparse
+import logging
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence
+
+from sleeper import SleeperAPI
+from season import SeasonStore, remaining_season, DEFAULT_PLAYOFF_TEAMS
+from leagues import load_leagues
+from nfl import resolve_week
+from logconfig import setup_logging
+from standings import StandingsTable
+
+ODDS_SIMULATIONS = int(os.getenv('ODDS_SIMULATIONS', 100000))
+ODDS_WORKERS = int(os.getenv('ODDS_WORKERS', 1))
+POST_ODDS = os.getenv('POST_ODDS', '') not in ('', '0', 'false')
+
+# Seasons simulated per batch, bounding memory at roughly CHUNK x weeks x teams floats
+SIMULATION_CHUNK = 25000
+# Spread used for teams without enough stored scores
+DEFAULT_SCORE_STD = 20.0
+
+def bracket_order(size: int) -> List[int]:
+    """Standard seeding order, e.g. 8 -> [1, 8, 4, 5, 2, 7, 3, 6]"""
+    order = [1]
+    while len(order) < size:
+        n = len(order) * 2
+        order = [seed for top in order for seed in (top, n + 1 - top)]
+    return order
+
+
+class SeasonModel:
+    """Everything needed to simulate one league's remaining season
+
+    Teams are indexed 0..T-1 in roster order. schedule is one (home, away)
+    pair of index arrays per remaining regular-season week.
+    """
+
+    def __init__(self, roster_ids: Sequence[int], wins, points_for, means, stds,
+                 schedule: List[tuple], playoff_teams: int = DEFAULT_PLAYOFF_TEAMS):
+        self.roster_ids = np.asarray(roster_ids, dtype=np.int64)
+        self.wins = np.asarray(wins, dtype=np.float64)
+        self.points_for = np.asarray(points_for, dtype=np.float64)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.stds = np.asarray(stds, dtype=np.float64)
+        self.schedule = [(np.asarray(home, dtype=np.int64), np.asarray(away, dtype=np.int64)) for home, away in schedule]
+        self.playoff_teams = min(playoff_teams, len(self.roster_ids))
+
+    @property
+    def size(self) -> int:
+        return len(self.roster_ids)
+
+def fit_distributions(roster_ids: Sequence[int], samples: Dict[int, List[float]],
+                      fallback_means: Optional[Sequence[float]] = None):
+    """Per-team mean and standard deviation of weekly scores
+
+    Teams with fewer than two stored scores fall back to the league-wide
+    spread (and to fallback_means, e.g. season PF per game, with none).
+    """
+    pooled = np.array([score for scores in samples.values() for score in scores], dtype=np.float64)
+    league_mean = pooled.mean() if len(pooled) else 100.0
+    league_std = pooled.std(ddof=1) if len(pooled) > 1 else DEFAULT_SCORE_STD
+
+    means, stds = np.empty(len(roster_ids)), np.empty(len(roster_ids))
+    for i, roster_id in enumerate(roster_ids):
+        scores = samples.get(roster_id) or []
+        if scores:
+            means[i] = np.mean(scores)
+        else:
+            means[i] = fallback_means[i] if fallback_means is not None else league_mean
+        stds[i] = np.std(scores, ddof=1) if len(scores) > 1 else league_std
+    return means, stds
+
+def simulate_chunk(model: SeasonModel, sims: int, seed) -> Dict[str, np.ndarray]:
+    """Simulate `sims` seasons and count playoff spots, byes and titles per team"""
+    rng = np.random.default_rng(seed)
+    teams = model.size
+
+    # Remaining regular season: one batch of draws per week across every simulation
+    wins = np.broadcast_to(model.wins, (sims, teams)).copy()
+    points_for = np.broadcast_to(model.points_for, (sims, teams)).copy()
+    for home, away in model.schedule:
+        scores = model.means + model.stds * rng.standard_normal((sims, teams))
+        home_won = scores[:, home] > scores[:, away]
+        wins[:, home] += home_won
+        wins[:, away] += ~home_won
+        points_for[:, home] += scores[:, home]
+        points_for[:, away] += scores[:, away]
+
+    # Seed by wins, then points for (points stay well below the 1e6 win weight)
+    seeds = np.argsort(-(wins * 1e6 + points_for), axis=1, kind='stable')[:, :model.playoff_teams]
+
+    # Winners bracket: pad to a power of two so the top seeds draw byes
+    bracket_size = 1 << (model.playoff_teams - 1).bit_length()
+    byes = bracket_size - model.playoff_teams
+    slots = np.full((sims, bracket_size), -1, dtype=np.int64)
+    slots[:, :model.playoff_teams] = seeds
+    alive = slots[:, np.array(bracket_order(bracket_size)) - 1]
+    while alive.shape[1] > 1:
+        a, b = alive[:, 0::2], alive[:, 1::2]
+        score_a = model.means[a] + model.stds[a] * rng.standard_normal(a.shape)
+        score_b = model.means[b] + model.stds[b] * rng.standard_normal(b.shape)
+        # -1 is an empty slot (a bye); anyone beats it
+        a_advances = (b < 0) | ((a >= 0) & (score_a > score_b))
+        alive = np.where(a_advances, a, b)
+
+    return {
+        'playoffs': np.bincount(seeds.ravel(), minlength=teams),
+        'byes': np.bincount(seeds[:, :byes].ravel(), minlength=teams),
+        'titles': np.bincount(alive[:, 0], minlength=teams),
+        'wins': wins.sum(axis=0),
+    }
+
+def simulate(model: SeasonModel, sims: int = ODDS_SIMULATIONS, seed: Optional[int] = None,
+             workers: int = ODDS_WORKERS) -> List[Dict[str, Any]]:
+    """Odds per team (in roster order) from `sims` simulated seasons
+
+    Simulations run in chunks with independent random streams; with
+    workers > 1 the chunks are spread over a process pool.
+    """
+    if sims <= 0:
+        raise ValueError(f"Need at least one simulation, got {sims}")
+    chunks = [SIMULATION_CHUNK] * (sims // SIMULATION_CHUNK)
+    if sims % SIMULATION_CHUNK:
+        chunks.append(sims % SIMULATION_CHUNK)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(simulate_chunk, [model] * len(chunks), chunks, seeds))
+    else:
+        results = [simulate_chunk(model, size, chunk_seed) for size, chunk_seed in zip(chunks, seeds)]
+
+    totals = {key: sum(result[key] for result in results) for key in results[0]}
+    return [
+        {
+            'roster_id': int(roster_id),
+            'playoffs': totals['playoffs'][i] / sims,
+            'bye': totals['byes'][i] / sims,
+            'champion': totals['titles'][i] / sims,
+            'mean_wins': totals['wins'][i] / sims,
+        }
+        for i, roster_id in enumerate(model.roster_ids)
+    ]
+
+def schedule_from_matchups(roster_ids: Sequence[int], weeks: List[Optional[List[Dict[str, Any]]]]) -> List[tuple]:
+    """(home, away) team-index arrays for every remaining week's matchups"""
+    index = {roster_id: i for i, roster_id in enumerate(roster_ids)}
+    schedule = []
+    for matchups in weeks:
+        pairs = {}
+        for matchup in matchups or []:
+            if matchup.get('matchup_id') and matchup.get('roster_id') in index:
+                pairs.setdefault(matchup['matchup_id'], []).append(index[matchup['roster_id']])
+        games = [pair for pair in pairs.values() if len(pair) == 2]
+        if games:
+            schedule.append((np.array([g[0] for g in games]), np.array([g[1] for g in games])))
+    return schedule
+
+def build_model(rosters: List[Dict[str, Any]], samples: Dict[int, List[float]],
+                remaining_weeks: List[Optional[List[Dict[str, Any]]]],
+                playoff_teams: int = DEFAULT_PLAYOFF_TEAMS) -> SeasonModel:
+    table = StandingsTable([rosters])
+    roster_ids = table.roster_id.tolist()
+
+    games = table.wins + table.losses + table.ties
+    fallback_means = np.where(games > 0, table.points_for / np.maximum(games, 1), np.nan)
+    fallback_means = np.where(np.isnan(fallback_means), np.nanmean(fallback_means) if np.any(games) else 100.0, fallback_means)
+
+    means, stds = fit_distributions(roster_ids, samples, fallback_means)
+    return SeasonModel(roster_ids, table.wins, table.points_for, means, stds,
+                       schedule_from_matchups(roster_ids, remaining_weeks), playoff_teams)
+
+def league_odds(samples: Dict[int, List[float]], rosters: List[Dict[str, Any]], remaining: Dict[str, Any],
+                sims: int = ODDS_SIMULATIONS, workers: int = ODDS_WORKERS) -> List[Dict[str, Any]]:
+    """Odds from stored scores and the remaining season from season.remaining_season"""
+    model = build_model(rosters, samples, remaining['weeks'], remaining['playoff_teams'])
+    return simulate(model, sims, workers=workers)
+
+async def odds_for_leagues(leagues, sims: int, workers: int = ODDS_WORKERS):
+    with SeasonStore() as store:
+        async with SleeperAPI() as sleeper:
+            week = await resolve_week(sleeper) or 1
+            for league in leagues:
+                if league.divisions:
+                    # Division winners' auto-bids aren't modelled yet
+                    print(f"{league.name}: odds aren't available for leagues with divisions")
+                    continue
+                rosters = await sleeper.get_rosters(league.league_id)
+                if rosters is None:
+                    print(f"{league.name}: rosters unavailable")
+                    continue
+                # Same convention as the results post: the current week counts as played
+                remaining = await remaining_season(sleeper, league, week)
+                print(f"\n{league.name}")
+                if remaining is None:
+                    print("Playoffs have started")
+                else:
+                    print_odds(league_odds(store.score_samples(league.league_id), rosters, remaining, sims, workers))
+
+def print_odds(odds: List[Dict[str, Any]], names: Optional[Dict[int, str]] = None):
+    names = names or {}
+    print(f"{'Team':<16}{'Playoffs':>9}{'Bye':>8}{'Title':>8}{'Wins':>7}")
+    for team in sorted(odds, key=lambda t: -t['playoffs']):
+        print(f"{names.get(team['roster_id'], str(team['roster_id'])):<16}"
+              f"{team['playoffs']:>9.1%}{team['bye']:>8.1%}{team['champion']:>8.1%}{team['mean_wins']:>7.1f}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sims', type=int, default=ODDS_SIMULATIONS)
+    parser.add_argument('--workers', type=int, default=ODDS_WORKERS)
+    args = parser.parse_args(argv)
+    if args.sims <= 0:
+        parser.error('--sims must be at least 1')
+    return args
+
+def main(argv=None):
+    setup_logging(logging.WARNING, log_file=None)
+    args = parse_args(argv)
+    asyncio.run(odds_for_leagues(load_leagues(), args.sims, args.workers))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,162 +1,125 @@
-import requests
-import discord
 import os
 import asyncio
-import datetime
-
-def get_nfl_week():
-    week_mapping = {
-        3: datetime.date(2024, 9, 26),
-        4: datetime.date(2024, 10, 1),
-        5: datetime.date(2024, 10, 8),
-        6: datetime.date(2024, 10, 15),
-        7: datetime.date(2024, 10, 22),
-        8: datetime.date(2024, 10, 29),
-        9: datetime.date(2024, 11, 5),
-        10: datetime.date(2024, 11, 12),
-        11: datetime.date(2024, 11, 19),
-        12: datetime.date(2024, 11, 26),
-        13: datetime.date(2024, 12, 3),
-        14: datetime.date(2024, 12, 10),
-        15: datetime.date(2024, 12, 17),
-        16: datetime.date(2024, 12, 24),
-        17: datetime.date(2024, 12, 31)
-    }
-    today = datetime.date.today()
-    current_week = None
-    for week, start_date in sorted(week_mapping.items()):
-        if today >= start_date:
-            current_week = week
-    return current_week
-
-LEAGUE_1_NAME = "C and O league 1"
-LEAGUE_2_NAME = "C&O Best League"
-
-nicknames_league_1 = {
-    'calummurray14': 'Calum',
-    'Kroftszn': 'Scot Adam',
-    'GjermundH': 'Gjermund',
-    'AshG82': 'Ash',
-    'Lottiebirch92': 'Lottie',
-    'sackmasterkatie': 'Katie',
-    'aligunn': 'Ally',
-    'Adamski11': 'Irish Adam',
-    'Fergus75': 'Fergus',
-    'CamTitans95': 'Cal'
-}
-
-nicknames_league_2 = {
-    'shelbyxmas': 'Shelby',
-    'RagingTurtle28': 'Ben',
-    'lulltula': 'Dan',
-    'vorkem': 'Mike',
-    'ThomasCullen': 'Thomas C',
-    'Doppler221': 'Doppler',
-    'MartyG93': 'Marty',
-    'Doonhamer': 'Doonhamer',
-    'Tygre': 'Tygre',
-    'brianp671': 'Brian'
-}
-
-def get_bracket(league_id, bracket_type):
-    url = f"https://api.sleeper.app/v1/league/{league_id}/{bracket_type}_bracket"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"An error occurred while fetching the {bracket_type} bracket: {e}")
-        return None
+import logging
+from sleeper import SleeperAPI
+from leagues import load_leagues, process_leagues, group_by_channel
+from delivery import deliver_text
+from webhook import Webhooks, get_channel, needs_gateway
+from render import bracket_columns
+from changes import ChangeStore, normalize_bracket
+import metrics
+from compute import compute_pool
+from nfl import resolve_week
+from logconfig import setup_logging
 
 def format_three_column_winners_bracket(matches, nicknames):
-    rounds = {1: [], 2: [], 3: []}
-    for match in matches:
-        round_num = match.get('r', 1)
-        rounds[round_num].append(match)
-
-    def format_matchup(match):
-        t1 = nicknames.get(match.get('t1_display_name', 'TBD'), 'TBD')
-        t2 = nicknames.get(match.get('t2_display_name', 'TBD'), 'TBD')
-        s1 = match.get('t1_score', 'TBD')
-        s2 = match.get('t2_score', 'TBD')
-
-        t1_emoji = "🏆" if s1 != 'TBD' and (s2 == 'TBD' or s1 > s2) else "❌" if s2 != 'TBD' else "❓"
-        t2_emoji = "🏆" if s2 != 'TBD' and (s1 == 'TBD' or s2 > s1) else "❌" if s1 != 'TBD' else "❓"
-        t1_emoji = "🙌" if t1 == 'BYE' else t1_emoji
-        t2_emoji = "🙌" if t2 == 'BYE' else t2_emoji
-
-        return f"{t1_emoji} {t1:<10} {s1:>6}\n{t2_emoji} {t2:<10} {s2:>6}\n"
-
-    column1 = "\n".join(format_matchup(m) for m in rounds[1])
-    column2 = "\n".join(format_matchup(m) for m in rounds[2])
-    column3 = "\n".join(format_matchup(m) for m in rounds[3])
-    return f"```\n{column1:<35}{column2:<35}{column3}\n```"
+    return bracket_columns(matches, nicknames, rounds=3)
 
 def format_two_column_losers_bracket(matches, nicknames):
-    rounds = {1: [], 2: []}
-    for match in matches:
-        round_num = match.get('r', 1)
-        rounds[round_num].append(match)
-
-    def format_matchup(match):
-        t1 = nicknames.get(match.get('t1_display_name', 'TBD'), 'TBD')
-        t2 = nicknames.get(match.get('t2_display_name', 'TBD'), 'TBD')
-        s1 = match.get('t1_score', 'TBD')
-        s2 = match.get('t2_score', 'TBD')
-
-        t1_emoji = "🏆" if s1 != 'TBD' and (s2 == 'TBD' or s1 > s2) else "❌" if s2 != 'TBD' else "❓"
-        t2_emoji = "🏆" if s2 != 'TBD' and (s1 == 'TBD' or s2 > s1) else "❌" if s1 != 'TBD' else "❓"
-        t1_emoji = "🙌" if t1 == 'BYE' else t1_emoji
-        t2_emoji = "🙌" if t2 == 'BYE' else t2_emoji
-
-        return f"{t1_emoji} {t1:<10} {s1:>6}\n{t2_emoji} {t2:<10} {s2:>6}\n"
+    return bracket_columns(matches, nicknames, rounds=2)
+
+def render_league_brackets(league, winners, losers):
+    """A league's title and bracket chunks; runs in a compute pool worker"""
+    with metrics.timer('render', step='brackets', league=league.league_id):
+        chunks = [f"\n**{league.name} Brackets**"]
+        if winners:
+            chunks.append(f"**Winners Bracket**\n{format_three_column_winners_bracket(winners, league.nicknames)}")
+        if losers:
+            chunks.append(f"**Losers Bracket**\n{format_two_column_losers_bracket(losers, league.nicknames)}")
+        return chunks
+
+async def fetch_brackets(sleeper, league):
+    return await asyncio.gather(
+        sleeper.get_bracket(league.league_id, "winners"),
+        sleeper.get_bracket(league.league_id, "losers")
+    )
+
+@metrics.job_run('brackets')
+async def post_brackets(client, leagues=None, week=None):
+    """Fetch every league's brackets and post them
+
+    client is the logged-in bot, or None when every league posts through a webhook.
+    """
+    leagues = load_leagues() if leagues is None else leagues
+    week = await resolve_week() if week is None else week
+    if week is None:
+        logging.error("Could not determine the NFL week, not posting brackets")
+        return
+
+    # Fetch every league's brackets in one concurrent burst before posting
+    async with SleeperAPI() as sleeper:
+        brackets = await process_leagues(leagues, lambda league: fetch_brackets(sleeper, league))
+
+    # Skip leagues whose brackets haven't moved since they were last posted
+    store = ChangeStore()
+    leagues_brackets = []
+    for league, b in zip(leagues, brackets):
+        if b is None or (b[0] is None and b[1] is None):
+            logging.error(f"Failed to fetch brackets for {league.name}")
+            continue
+        previous = store.previous('brackets', league.league_id) or {}
+        state = {'week': week, 'winners_bracket': normalize_bracket(b[0]), 'losers_bracket': normalize_bracket(b[1])}
+        # A failed fetch isn't a change; keep what we last posted for it
+        state = {key: value if value is not None else previous.get(key) for key, value in state.items()}
+        if not store.has_changed('brackets', league.league_id, state):
+            logging.info(f"No bracket changes for {league.name}, skipping")
+            continue
+        leagues_brackets.append((league, b, state))
+
+    # Lay out every league's brackets in the compute pool at once
+    rendered = await asyncio.gather(*(compute_pool.run(render_league_brackets, league, winners, losers)
+                                      for league, (winners, losers), _ in leagues_brackets))
+    leagues_brackets = [(league, chunks, state) for (league, _, state), chunks in zip(leagues_brackets, rendered)]
+
+    async with Webhooks() as webhooks:
+        for destination, channel_leagues in group_by_channel(leagues_brackets, lambda item: item[0]).items():
+            channel = get_channel(client, webhooks, destination)
+            if channel is None:
+                logging.error(f"Invalid channel ID {destination}")
+                continue
+
+            chunks = [f"🏈 **Playoff Update - Week {week}** 🏈"]
+            for league, league_chunks, _ in channel_leagues:
+                chunks.extend(league_chunks)
+
+            # Pack the header, titles and brackets into as few messages as fit
+            results = await deliver_text(channel, chunks)
+            if all(result.ok for result in results):
+                for league, _, state in channel_leagues:
+                    store.record('brackets', league.league_id, state)
+
+    store.save()
+
+async def send_brackets_to_discord(bot_token, leagues, week):
+    # discord.py is slow to import, so only load it when actually posting
+    import discord
 
-    column1 = "\n".join(format_matchup(m) for m in rounds[1])
-    column2 = "\n".join(format_matchup(m) for m in rounds[2])
-    return f"```\n{column1:<35}{column2}\n```"
-
-async def send_brackets_to_discord(bot_token, channel_id, league_1_id, league_2_id, week):
     intents = discord.Intents.default()
     client = discord.Client(intents=intents)
 
     @client.event
     async def on_ready():
-        print(f"Logged in as {client.user}")
-        channel = client.get_channel(channel_id)
-        if channel is None:
-            print("Invalid channel ID")
+        logging.info(f"Logged in as {client.user}")
+        try:
+            await post_brackets(client, leagues, week)
+        finally:
             await client.close()
-            return
-
-        await channel.send(f"🏈 **Playoff Update - Week {week}** 🏈")
-
-        # League 1
-        await channel.send(f"\n**{LEAGUE_1_NAME} Brackets**")
-        winners_1 = get_bracket(league_1_id, "winners")
-        losers_1 = get_bracket(league_1_id, "losers")
-        if winners_1:
-            await channel.send(f"**Winners Bracket**\n{format_three_column_winners_bracket(winners_1, nicknames_league_1)}")
-        if losers_1:
-            await channel.send(f"**Losers Bracket**\n{format_two_column_losers_bracket(losers_1, nicknames_league_1)}")
 
-        # League 2
-        await channel.send(f"\n**{LEAGUE_2_NAME} Brackets**")
-        winners_2 = get_bracket(league_2_id, "winners")
-        losers_2 = get_bracket(league_2_id, "losers")
-        if winners_2:
-            await channel.send(f"**Winners Bracket**\n{format_three_column_winners_bracket(winners_2, nicknames_league_2)}")
-        if losers_2:
-            await channel.send(f"**Losers Bracket**\n{format_two_column_losers_bracket(losers_2, nicknames_league_2)}")
+    # client.run() starts its own event loop, so start the client on ours
+    async with client:
+        await client.start(bot_token)
 
-        await client.close()
+def main(week=None):
+    setup_logging()
+    BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
+    leagues = load_leagues()
 
-    client.run(bot_token)
+    # With no week given, post_brackets resolves the current one from Sleeper
+    if not needs_gateway(leagues):
+        # Every league has a webhook, so skip the gateway login
+        asyncio.run(post_brackets(None, leagues, week))
+    else:
+        asyncio.run(send_brackets_to_discord(BOT_TOKEN, leagues, week))
 
 if __name__ == "__main__":
-    BOT_TOKEN = os.getenv("DISCORD_BOT_TOKEN")
-    CHANNEL_ID = int(os.getenv("CHANNEL_ID"))
-    LEAGUE_1_ID = os.getenv("LEAGUE_1_ID")
-    LEAGUE_2_ID = os.getenv("LEAGUE_2_ID")
-    WEEK = get_nfl_week()
-
-    asyncio.run(send_brackets_to_discord(BOT_TOKEN, CHANNEL_ID, LEAGUE_1_ID, LEAGUE_2_ID, WEEK))
+    main()
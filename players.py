@@ -0,0 +1,251 @@
+"""Compact on-disk index of NFL players, for names in the weekly posts
+
+Matchups only carry player IDs; the names live in Sleeper's /players/nfl
+dump, several megabytes of JSON that Sleeper asks to be fetched at most
+once a day. Instead of downloading and parsing it on every run, it is
+streamed once a day into PLAYER_INDEX:
+
+    header   magic, record count, record size
+    records  fixed-width (id, name, position, team), sorted by id
+
+The sorted fixed-width IDs are the index: a lookup binary searches the
+memory-mapped file, touching a handful of pages and allocating only the
+one record it returns. Nothing is read into memory up front, so opening
+the index costs no more than opening the file.
+"""
+import os
+import json
+import mmap
+import time
+import codecs
+import struct
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+import cache
+
+# Top scoring starters shown in the results post; 0 turns the section off
+TOP_PLAYERS = int(os.getenv('TOP_PLAYERS', 3))
+
+# Defaults to players.idx in the Sleeper cache directory
+PLAYER_INDEX = os.getenv('PLAYER_INDEX')
+PLAYER_INDEX_MAX_AGE = int(os.getenv('PLAYER_INDEX_MAX_AGE', 24 * 60 * 60))
+
+MAGIC = b'SLPIDX01'
+HEADER = struct.Struct('<8sII')
+# Player IDs are short (e.g. '4046', or 'KC' for a team defense); longer names are cut
+ID_BYTES, NAME_BYTES, POSITION_BYTES, TEAM_BYTES = 12, 28, 4, 4
+RECORD = struct.Struct(f'<{ID_BYTES}s{NAME_BYTES}s{POSITION_BYTES}s{TEAM_BYTES}s')
+
+JSON_WHITESPACE = ' \t\r\n'
+
+
+def index_path(path: Optional[str] = None) -> str:
+    return path or PLAYER_INDEX or os.path.join(cache.CACHE_DIR, 'players.idx')
+
+def _fit(text: Optional[str], size: int) -> bytes:
+    """UTF-8 encode text into at most size bytes without splitting a character"""
+    data = (text or '').encode('utf-8')[:size]
+    return data.decode('utf-8', 'ignore').encode('utf-8')
+
+def pack_player(player_id: str, player: Dict[str, Any]) -> Optional[bytes]:
+    """One fixed-width record for a /players/nfl entry, or None if its ID won't fit"""
+    key = player_id.encode('utf-8')
+    if len(key) > ID_BYTES:
+        return None
+    # Team defenses have no full_name, just e.g. first_name 'Kansas City' and last_name 'Chiefs'
+    name = player.get('full_name') or f"{player.get('first_name') or ''} {player.get('last_name') or ''}".strip()
+    return RECORD.pack(key, _fit(name, NAME_BYTES), _fit(player.get('position'), POSITION_BYTES),
+                       _fit(player.get('team'), TEAM_BYTES))
+
+def write_index(records: List[bytes], path: Optional[str] = None):
+    """Write packed records as a new index, replacing the old one atomically"""
+    path = index_path(path)
+    # Null-padded IDs sort the same way the binary search compares them
+    records.sort(key=lambda record: record[:ID_BYTES])
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(records), RECORD.size))
+        f.writelines(records)
+    os.replace(tmp_path, path)
+
+
+class PlayerStream:
+    """Incremental parser for the /players/nfl object
+
+    feed() takes raw chunks as they arrive and returns the (player_id, player)
+    pairs completed so far, so the whole dump is never held in memory.
+    """
+
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.text = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.started = False
+        self.finished = False
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, Dict[str, Any]]]:
+        self.buffer += self.text.decode(chunk)
+        players = []
+        pos = 0
+        while not self.finished:
+            item, pos = self._next(pos)
+            if item is None:
+                break
+            if isinstance(item[1], dict):
+                players.append(item)
+        # Keep only the unparsed tail for the next chunk
+        self.buffer = self.buffer[pos:]
+        return players
+
+    def close(self):
+        if not self.finished:
+            raise ValueError("Player dump ended before the closing brace")
+
+    def _skip(self, pos: int, chars: str) -> int:
+        while pos < len(self.buffer) and self.buffer[pos] in chars:
+            pos += 1
+        return pos
+
+    def _next(self, pos: int):
+        """Parse one "id": {...} pair at pos, or return (None, pos) until more arrives"""
+        buffer = self.buffer
+        start = pos
+        if not self.started:
+            pos = self._skip(pos, JSON_WHITESPACE)
+            if pos == len(buffer):
+                return None, start
+            if buffer[pos] != '{':
+                raise ValueError("Player dump is not a JSON object")
+            self.started = True
+            pos += 1
+            start = pos
+
+        pos = self._skip(pos, JSON_WHITESPACE + ',')
+        if pos == len(buffer):
+            return None, start
+        if buffer[pos] == '}':
+            self.finished = True
+            return None, pos + 1
+
+        try:
+            key, pos = self.decoder.raw_decode(buffer, pos)
+            pos = self._skip(pos, JSON_WHITESPACE)
+            if pos == len(buffer):
+                return None, start
+            if buffer[pos] != ':':
+                raise ValueError(f"Expected ':' after player {key!r}")
+            pos = self._skip(pos + 1, JSON_WHITESPACE)
+            value, pos = self.decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # The pair runs past this chunk; retry once more has arrived
+            return None, start
+        return (key, value), pos
+
+
+class PlayerIndex:
+    """Read-only, memory-mapped view of the player index"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = index_path(path)
+        with open(self.path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            self.map.close()
+            raise ValueError(f"{self.path} is not a player index")
+        magic, self.count, record_size = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or record_size != RECORD.size or HEADER.size + self.count * RECORD.size > len(self.map):
+            self.map.close()
+            raise ValueError(f"{self.path} is not a player index")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        self.map.close()
+
+    def _find(self, player_id: str) -> Optional[int]:
+        """Offset of the player's record, by binary search over the sorted IDs"""
+        key = str(player_id).encode('utf-8')
+        if len(key) > ID_BYTES:
+            return None
+        key = key.ljust(ID_BYTES, b'\0')
+
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * RECORD.size
+            probe = self.map[offset:offset + ID_BYTES]
+            if probe < key:
+                low = middle + 1
+            elif probe > key:
+                high = middle
+            else:
+                return offset
+        return None
+
+    def get(self, player_id: str) -> Optional[Dict[str, str]]:
+        offset = self._find(player_id)
+        if offset is None:
+            return None
+        fields = [field.rstrip(b'\0').decode('utf-8') for field in RECORD.unpack_from(self.map, offset)]
+        return dict(zip(('player_id', 'name', 'position', 'team'), fields))
+
+    def name(self, player_id: str, default: Optional[str] = None) -> Optional[str]:
+        player = self.get(player_id)
+        return player['name'] if player and player['name'] else default
+
+
+def is_fresh(path: Optional[str] = None, now: Optional[float] = None) -> bool:
+    try:
+        modified = os.path.getmtime(index_path(path))
+    except OSError:
+        return False
+    return (now or time.time()) - modified < PLAYER_INDEX_MAX_AGE
+
+async def refresh_player_index(sleeper, path: Optional[str] = None) -> int:
+    """Stream /players/nfl into a new index and return how many players it holds
+
+    The old index stays in place until the new one is complete.
+    """
+    stream = PlayerStream()
+    records = []
+    async for chunk in sleeper.stream_players():
+        for player_id, player in stream.feed(chunk):
+            record = pack_player(player_id, player)
+            if record is not None:
+                records.append(record)
+    stream.close()
+
+    write_index(records, path)
+    return len(records)
+
+async def load_player_index(sleeper, path: Optional[str] = None) -> Optional[PlayerIndex]:
+    """The player index, refreshed from Sleeper first if it's over a day old
+
+    If the refresh fails the previous index is used; None if there is none.
+    """
+    if not is_fresh(path):
+        try:
+            count = await refresh_player_index(sleeper, path)
+            logging.info(f"Refreshed player index with {count} players")
+        except Exception as e:
+            logging.error(f"Error refreshing player index: {str(e)}")
+
+    try:
+        return PlayerIndex(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.error(f"Error opening player index: {str(e)}")
+        return None
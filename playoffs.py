@@ -1,144 +1,41 @@
-import discord
-import aiohttp
 import os
+import asyncio
 import logging
 import datetime
 import pytz
-import asyncio
-from typing import Dict, Any
-
-# Set up logging
-logging.basicConfig(
-    filename='sleeper_playoff_bot.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-console_handler.setFormatter(formatter)
-logging.getLogger().addHandler(console_handler)
-
-# Environment variables
-try:
-    DISCORD_BOT_TOKEN = os.getenv('DISCORD_BOT_TOKEN')
-    LEAGUE_1_ID = os.getenv('LEAGUE_1_ID')
-    LEAGUE_2_ID = os.getenv('LEAGUE_2_ID')
-    CHANNEL_ID = int(os.getenv('CHANNEL_ID'))
-    
-    if not all([DISCORD_BOT_TOKEN, LEAGUE_1_ID, LEAGUE_2_ID, CHANNEL_ID]):
-        raise ValueError("Missing required environment variables")
-except Exception as e:
-    logging.error(f"Error loading environment variables: {str(e)}")
-    raise
-
-LEAGUE_1_NAME = "C and O league 1"
-LEAGUE_2_NAME = "C&O Best League"
-
-nicknames_league_1 = {
-    'calummurray14': 'Calum',
-    'Kroftszn': 'Scot Adam',
-    'GjermundH': 'Gjermund',
-    'AshG82': 'Ash',
-    'Lottiebirch92': 'Lottie',
-    'sackmasterkatie': 'Katie',
-    'aligunn': 'Ally',
-    'Adamski11': 'Irish Adam',
-    'Fergus75': 'Fergus',
-    'CamTitans95': 'Cal'
-}
-
-nicknames_league_2 = {
-    'shelbyxmas': 'Shelby',
-    'RagingTurtle28': 'Ben',
-    'lulltula': 'Dan',
-    'vorkem': 'Mike',
-    'ThomasCullen': 'Thomas C',
-    'Doppler221': 'Doppler',
-    'MartyG93': 'Marty',
-    'Doonhamer': 'Doonhamer',
-    'Tygre': 'Tygre',
-    'brianp671': 'Brian'
-}
-
-def get_nfl_week():
-    week_mapping = {
-        3: datetime.date(2024, 9, 26),
-        4: datetime.date(2024, 10, 1),
-        5: datetime.date(2024, 10, 8),
-        6: datetime.date(2024, 10, 15),
-        7: datetime.date(2024, 10, 22),
-        8: datetime.date(2024, 10, 29),
-        9: datetime.date(2024, 11, 5),
-        10: datetime.date(2024, 11, 12),
-        11: datetime.date(2024, 11, 19),
-        12: datetime.date(2024, 11, 26),
-        13: datetime.date(2024, 12, 3),
-        14: datetime.date(2024, 12, 10),
-        15: datetime.date(2024, 12, 17),
-        16: datetime.date(2024, 12, 24),
-        17: datetime.date(2024, 12, 31)
-    }
-
-    today = datetime.date.today()
-    current_week = None
-    for week, start_date in sorted(week_mapping.items()):
-        if today >= start_date:
-            current_week = week
-    return current_week
-
-class SleeperAPI:
-    @staticmethod
-    async def fetch_data(session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
-        """Fetch data from Sleeper API asynchronously"""
-        try:
-            logging.info(f"Fetching data from: {url}")
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    logging.error(f"Error fetching {url}: Status {response.status}")
-                    return None
-        except Exception as e:
-            logging.error(f"Error fetching {url}: {str(e)}")
-            return None
+from sleeper import SleeperAPI, missing_endpoints
+from snapshot import LeagueSnapshot
+from leagues import load_leagues, process_leagues, group_by_channel
+from delivery import deliver_embeds
+from webhook import Webhooks, get_channel, needs_gateway
+from season import SeasonStore
+from render import code_block
+from bracket import BracketGraph, render_bracket
+from changes import ChangeStore, POST_MODE, normalize_bracket, normalize_matchups, describe_changes
+import metrics
+from compute import compute_pool
+from logconfig import setup_logging
+from nfl import resolve_week
+from typing import TYPE_CHECKING
 
-    @staticmethod
-    async def get_league_data(session: aiohttp.ClientSession, league_id: str, week: int) -> Dict[str, Any]:
-        """Fetch all league data concurrently including weekly matchups"""
-        logging.info(f"Fetching data for league {league_id}")
-        
-        urls = {
-            'rosters': f'https://api.sleeper.app/v1/league/{league_id}/rosters',
-            'users': f'https://api.sleeper.app/v1/league/{league_id}/users',
-            'winners_bracket': f'https://api.sleeper.app/v1/league/{league_id}/winners_bracket',
-            'losers_bracket': f'https://api.sleeper.app/v1/league/{league_id}/losers_bracket',
-            'matchups': f'https://api.sleeper.app/v1/league/{league_id}/matchups/{week}'
-        }
-        
-        tasks = {
-            name: asyncio.create_task(SleeperAPI.fetch_data(session, url))
-            for name, url in urls.items()
-        }
-        
-        results = {}
-        for name, task in tasks.items():
-            try:
-                results[name] = await task
-            except Exception as e:
-                logging.error(f"Error fetching {name}: {str(e)}")
-                results[name] = None
-        
-        return results if all(results.values()) else None
-        
-def get_matchup_points(matchups, roster_id):
+if TYPE_CHECKING:
+    import discord
+
+def load_bot_token():
+    """Read the Discord bot token from the environment"""
+    try:
+        token = os.getenv('DISCORD_BOT_TOKEN')
+
+        if not token:
+            raise ValueError("Missing required environment variables")
+        return token
+    except Exception as e:
+        logging.error(f"Error loading environment variables: {str(e)}")
+        raise
+
+def get_matchup_points(snapshot, roster_id):
     """Get points for a specific roster from the weekly matchups"""
-    if not matchups:
-        return None
-        
-    matchup = next((m for m in matchups if m['roster_id'] == roster_id), None)
+    matchup = snapshot.matchups_by_roster.get(roster_id)
     if matchup:
         points = matchup.get('points', 0)
         points_decimal = matchup.get('points_decimal', 0)
@@ -146,42 +43,26 @@ def get_matchup_points(matchups, roster_id):
         return points + (points_decimal / 100) if points is not None else None
     return None
 
-def format_visual_bracket(matches, rosters, users, nicknames, matchups):
+def format_visual_bracket(matches, snapshot):
     """Create a minimal visual representation of the playoff bracket"""
     if not matches:
         return "No matches available"
-    
-    matches = sorted(matches, key=lambda x: (x.get('r', 0), x.get('m', 0)))
-    
-    def get_team_info(roster_id, from_ref=None, matches=None):
-        if from_ref:
-            if 'w' in from_ref:
-                ref_match = next((m for m in matches if m['m'] == from_ref['w']), None)
-                if ref_match and ref_match.get('w'):
-                    return get_team_info(ref_match['w'], None, matches)[0], "TBD"
-            return "TBD", "TBD"
-            
-        if not roster_id:
-            return "TBD", "TBD"
-        
-        try:
-            roster = next((r for r in rosters if r['roster_id'] == roster_id), None)
-            if roster:
-                user = next((u for u in users if u['user_id'] == roster['owner_id']), None)
-                if user:
-                    username = user.get('display_name', 'Unknown')
-                    name = nicknames.get(username, username)
-                    # Get points from matchups
-                    points = get_matchup_points(matchups, roster_id)
-                    score = f"{points:.2f}" if points is not None else "TBD"
-                    return name, score
-        except Exception as e:
-            logging.error(f"Error getting team info: {str(e)}")
-            
-        return "TBD", "TBD"
 
-def create_bracket_embed(title: str, bracket_data: str, color: int = 0x587ac7) -> discord.Embed:
+    # Index the bracket once; feeder references resolve with a dict lookup
+    graph = BracketGraph(matches)
+
+    def score_for(roster_id):
+        # Points from this week's matchups
+        points = get_matchup_points(snapshot, roster_id)
+        return points if points is not None else "TBD"
+
+    return render_bracket(graph, lambda roster_id: snapshot.team_names(roster_id)['nickname'], score_for)
+
+def create_bracket_embed(title: str, bracket_data: str, color: int = 0x587ac7) -> 'discord.Embed':
     """Create an embed for a single bracket"""
+    # discord.py is slow to import, so only load it when actually posting
+    import discord
+
     embed = discord.Embed(
         title=title,
         description=bracket_data,
@@ -189,153 +70,205 @@ def create_bracket_embed(title: str, bracket_data: str, color: int = 0x587ac7) -
     )
     return embed
 
-def format_single_bracket(bracket_data, rosters, users, nicknames, matchups, bracket_type="Championship"):
+def format_single_bracket(bracket_data, snapshot, bracket_type="Championship"):
     """Format a single bracket into a Discord message"""
-    message = []
-    message.append("```")
-    message.append(format_visual_bracket(bracket_data, rosters, users, nicknames, matchups))
-    message.append("```")
-    return "\n".join(message)
+    return code_block(format_visual_bracket(bracket_data, snapshot))
 
-def format_single_bracket(bracket_data, rosters, users, nicknames, matchups, bracket_type="Championship"):
-    """Format a single bracket into a Discord message"""
-    message = []
-    message.append("```")
-    message.append(format_visual_bracket(bracket_data, rosters, users, nicknames, matchups))
-    message.append("```")
-    return "\n".join(message)
-
-async def send_playoff_message(channel, league1_data, league2_data, current_week):
-    """Send playoff brackets as separate messages with retries"""
+def render_playoff_brackets(league, league_data):
+    """Both of a league's brackets as formatted text, or None for one that can't be shown
+
+    Runs in a compute pool worker, so it takes the league and its raw
+    Sleeper data rather than a snapshot.
+    """
+    # Index the league once for both of its brackets
+    snapshot = LeagueSnapshot(league_data['rosters'], league_data['users'], league.nicknames, league_data['matchups'])
+
+    rendered = {}
+    for key, bracket_type in (('winners_bracket', "Championship"), ('losers_bracket', "Consolation")):
+        if league_data[key] is None:
+            rendered[key] = None  # Bracket fetch failed; post the rest
+            continue
+        try:
+            with metrics.timer('render', step=key, league=league.league_id):
+                rendered[key] = format_single_bracket(league_data[key], snapshot, bracket_type)
+        except Exception as e:
+            logging.error(f"Error formatting {bracket_type} bracket for {league.name}: {str(e)}")
+            rendered[key] = None
+    return rendered
+
+async def send_playoff_message(channel, leagues_brackets, current_week, change_summaries=()):
+    """Send playoff brackets packed into as few messages as possible
+
+    leagues_brackets is a list of (league, rendered) pairs posted to this
+    channel in full, rendered coming from render_playoff_brackets;
+    change_summaries is a list of (league, lines) sent as compact "what
+    changed" embeds instead. Returns the per-message delivery results.
+    """
     try:
         dublin_tz = pytz.timezone('Europe/Dublin')
         current_time = datetime.datetime.now(dublin_tz)
         
-        # Function to create and send a single bracket embed
-        async def send_bracket_embed(title, bracket_data, bracket_type, league_data, nicknames):
+        # Function to create a single bracket embed
+        def build_bracket_embed(title, formatted_bracket):
+            if formatted_bracket is None:
+                return None  # Bracket fetch failed; post the rest
             try:
-                formatted_bracket = format_single_bracket(
-                    bracket_data,
-                    league_data['rosters'],
-                    league_data['users'],
-                    nicknames,
-                    league_data['matchups'],  # Pass matchups data
-                    bracket_type
-                )
-                
                 embed = create_bracket_embed(title, formatted_bracket)
                 embed.set_footer(
                     text=f"Fantasy Playoff Results – Week {current_week}",
                     icon_url="https://play-lh.googleusercontent.com/L5sDy5zFKKLLMndpR7wJfD3aum4w0FVL_rRK6W1t9T5-d4BYc-4A7LTXa2nGeP62TCo"
                 )
                 embed.timestamp = current_time
-                
-                # Try to send message with retries
-                max_retries = 3
-                for attempt in range(max_retries):
-                    try:
-                        await channel.send(embed=embed)
-                        return True
-                    except discord.HTTPException as e:
-                        if attempt == max_retries - 1:  # Last attempt
-                            logging.error(f"Failed to send embed after {max_retries} attempts: {str(e)}")
-                            return False
-                        await asyncio.sleep(1)  # Wait before retrying
+                return embed
             except Exception as e:
-                logging.error(f"Error creating/sending embed for {title}: {str(e)}")
-                return False
-
-        # Send initial message
-        await channel.send("🏈 Playoff Update Time! Who's making it to the ship? 🏆")
-
-        # Send League 1 brackets
-        await send_bracket_embed(
-            f"{LEAGUE_1_NAME} - Championship Bracket",
-            league1_data['winners_bracket'],
-            "Championship",
-            league1_data,
-            nicknames_league_1
-        )
-        await asyncio.sleep(1)  # Small delay between messages
-        
-        await send_bracket_embed(
-            f"{LEAGUE_1_NAME} - Consolation Bracket",
-            league1_data['losers_bracket'],
-            "Consolation",
-            league1_data,
-            nicknames_league_1
-        )
-        await asyncio.sleep(1)
-
-        # Send League 2 brackets
-        await send_bracket_embed(
-            f"{LEAGUE_2_NAME} - Championship Bracket",
-            league2_data['winners_bracket'],
-            "Championship",
-            league2_data,
-            nicknames_league_2
-        )
-        await asyncio.sleep(1)
-        
-        await send_bracket_embed(
-            f"{LEAGUE_2_NAME} - Consolation Bracket",
-            league2_data['losers_bracket'],
-            "Consolation",
-            league2_data,
-            nicknames_league_2
+                logging.error(f"Error creating embed for {title}: {str(e)}")
+                return None
+
+        embeds = []
+        for league, rendered in leagues_brackets:
+            embeds.append(build_bracket_embed(f"{league.name} - Championship Bracket", rendered['winners_bracket']))
+            embeds.append(build_bracket_embed(f"{league.name} - Consolation Bracket", rendered['losers_bracket']))
+
+        for league, lines in change_summaries:
+            summary = "\n".join(lines)
+            if len(summary) > 4000:
+                summary = summary[:4000].rsplit("\n", 1)[0] + "\n…"
+            embeds.append(create_bracket_embed(f"{league.name} - What Changed", code_block(summary)))
+
+        # Send the initial message with as many embeds as fit in each send
+        results = await deliver_embeds(
+            channel,
+            [embed for embed in embeds if embed is not None],
+            content="🏈 Playoff Update Time! Who's making it to the ship? 🏆"
         )
 
-        logging.info("Successfully sent playoff update messages")
+        if all(result.ok for result in results):
+            logging.info("Successfully sent playoff update messages")
+        return results
         
     except Exception as e:
         logging.error(f"Error sending playoff messages: {str(e)}")
         raise
 
-# Discord bot setup
-intents = discord.Intents.default()
-client = discord.Client(intents=intents)
+@metrics.job_run('playoffs')
+async def post_playoffs(client, leagues=None, week=None):
+    """Fetch every league's brackets and post them
 
-@client.event
-async def on_ready():
-    try:
-        logging.info(f'Logged in as {client.user}')
-        
-        current_week = get_nfl_week()
-        if current_week is None:
-            logging.error("Could not determine NFL week")
-            await client.close()
-            return
+    client is the logged-in bot, or None when every league posts through a webhook.
+    """
+    current_week = await resolve_week() if week is None else week
+    if current_week is None:
+        logging.error("Could not determine NFL week")
+        return
+
+    logging.info(f"Processing playoff data for Week {current_week}")
+
+    # Share one pooled Sleeper client for all requests
+    leagues = load_leagues() if leagues is None else leagues
+    async with SleeperAPI() as sleeper:
+        # Fetch every league concurrently including weekly matchups
+        results = await process_leagues(
+            leagues,
+            lambda league: sleeper.get_league_data(league.league_id, current_week)
+        )
+
+    leagues_data = []
+    for league, league_data in zip(leagues, results):
+        # Render whatever we have; only skip a league with no brackets at all
+        if not league_data or (league_data['winners_bracket'] is None and league_data['losers_bracket'] is None):
+            logging.error(f"Failed to fetch league data for {league.name}")
+            continue
+        missing = missing_endpoints(league_data)
+        if missing:
+            logging.warning(f"Posting {league.name} without {', '.join(missing)}")
+        leagues_data.append((league, league_data))
 
-        logging.info(f"Processing playoff data for Week {current_week}")
+    # Keep a history of how each bracket progressed
+    with SeasonStore() as season:
+        for league, league_data in leagues_data:
+            season.ingest_brackets(league.league_id, league_data['winners_bracket'], league_data['losers_bracket'])
 
-        # Create aiohttp session for all requests
-        async with aiohttp.ClientSession() as session:
-            # Fetch league data concurrently including weekly matchups
-            league1_data = await SleeperAPI.get_league_data(session, LEAGUE_1_ID, current_week)
-            league2_data = await SleeperAPI.get_league_data(session, LEAGUE_2_ID, current_week)
+    # Only post leagues whose brackets or scores moved since the last post
+    store = ChangeStore()
+    pending = []
+    for league, league_data in leagues_data:
+        previous = store.previous('playoffs', league.league_id) or {}
+        state = {
+            'week': current_week,
+            'winners_bracket': normalize_bracket(league_data['winners_bracket']),
+            'losers_bracket': normalize_bracket(league_data['losers_bracket']),
+            'matchups': normalize_matchups(league_data['matchups'])
+        }
+        # A failed endpoint isn't a change; keep what we last posted for it
+        state = {key: value if value is not None else previous.get(key) for key, value in state.items()}
+
+        if not store.has_changed('playoffs', league.league_id, state):
+            logging.info(f"No changes for {league.name} since the last post, skipping")
+            continue
+        pending.append((league, league_data, state, previous))
 
-            if not league1_data or not league2_data:
-                logging.error("Failed to fetch league data")
-                await client.close()
-                return
+    # Lay out every full post in the compute pool at once, one league per task
+    full_posts = [(league, league_data) for league, league_data, _, previous in pending
+                  if not (POST_MODE == 'diff' and previous)]
+    rendered = await asyncio.gather(*(compute_pool.run(render_playoff_brackets, league, league_data)
+                                      for league, league_data in full_posts))
+    brackets_by_league = {league.league_id: brackets for (league, _), brackets in zip(full_posts, rendered)}
 
-            # Send message
-            channel = client.get_channel(CHANNEL_ID)
+    # Send brackets with current week's matchup data to each league's channel or webhook
+    async with Webhooks() as webhooks:
+        for destination, channel_items in group_by_channel(pending, lambda item: item[0]).items():
+            channel = get_channel(client, webhooks, destination)
             if channel is None:
-                logging.error(f"Channel with ID {CHANNEL_ID} not found")
-                await client.close()
-                return
+                logging.error(f"Channel with ID {destination} not found")
+                continue
 
-            # Send brackets with current week's matchup data
-            await send_playoff_message(channel, league1_data, league2_data, current_week)
+            full, summaries = [], []
+            for league, league_data, state, previous in channel_items:
+                if POST_MODE == 'diff' and previous:
+                    snapshot = LeagueSnapshot(league_data['rosters'], league_data['users'], league.nicknames)
+                    lines = describe_changes(previous, state, lambda roster_id: snapshot.team_names(roster_id)['nickname'])
+                    summaries.append((league, lines or ["Bracket updated"]))
+                else:
+                    full.append((league, brackets_by_league[league.league_id]))
 
-    except Exception as e:
-        logging.error(f"Error in on_ready: {str(e)}")
-    finally:
-        await client.close()
+            results = await send_playoff_message(channel, full, current_week, summaries)
+            if all(result.ok for result in results):
+                for league, _, state, _ in channel_items:
+                    store.record('playoffs', league.league_id, state)
+
+    store.save()
+
+def main(week=None):
+    setup_logging()
+
+    # With a webhook for every league there's nothing to log in for
+    if not needs_gateway(load_leagues()):
+        asyncio.run(post_playoffs(None, week=week))
+        return
+
+    import discord
+
+    token = load_bot_token()
+
+    # Discord bot setup
+    intents = discord.Intents.default()
+    client = discord.Client(intents=intents)
+
+    @client.event
+    async def on_ready():
+        try:
+            logging.info(f'Logged in as {client.user}')
+            await post_playoffs(client, week=week)
+        except Exception as e:
+            logging.error(f"Error in on_ready: {str(e)}")
+        finally:
+            await client.close()
 
-if __name__ == "__main__":
     try:
-        client.run(DISCORD_BOT_TOKEN)
+        # Logging is already routed through setup_logging's queue
+        client.run(token, log_handler=None)
     except Exception as e:
-        logging.error(f"Failed to start bot: {str(e)}")
\ No newline at end of file
+        logging.error(f"Failed to start bot: {str(e)}")
+
+if __name__ == "__main__":
+    main()
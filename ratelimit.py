@@ -0,0 +1,103 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import logging
+from typing import Dict, Any, Optional
+
+# Sleeper blocks clients above ~1000 calls per minute; stay comfortably below it
+SLEEPER_RATE_PER_MINUTE = float(os.getenv('SLEEPER_RATE_PER_MINUTE', 900))
+SLEEPER_BURST = int(os.getenv('SLEEPER_BURST', 20))
+
+# Lower numbers are served first
+PRIORITY_LIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKFILL = 2
+
+
+class TokenBucket:
+    """Async token-bucket limiter with prioritised waiters
+
+    Tokens refill continuously at `rate` per second up to `burst`. When the
+    bucket is empty callers queue up and are released in priority order
+    (then arrival order) as tokens become available.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._waiters = []
+        self._counter = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.acquired = 0
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL):
+        """Wait until a token is available for this priority, then take it"""
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            self.acquired += 1
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+
+        if self._dispatcher is None or self._dispatcher.done() or self._dispatcher.get_loop() is not loop:
+            self._dispatcher = loop.create_task(self._dispatch())
+
+        started = time.monotonic()
+        await future
+        self.total_wait += time.monotonic() - started
+
+    async def _dispatch(self):
+        while self._waiters:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                continue
+
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue  # Waiter was cancelled
+            self.tokens -= 1
+            self.acquired += 1
+            future.set_result(None)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'rate_per_second': self.rate,
+            'burst': self.burst,
+            'tokens': round(self.tokens, 2),
+            'queue_depth': self.queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'acquired': self.acquired,
+            'queued': self.queued,
+            'total_wait_seconds': round(self.total_wait, 3),
+        }
+
+    def log_metrics(self, name: str = 'rate limiter'):
+        logging.info(f"{name}: {self.metrics()}")
+
+
+# Shared by every SleeperAPI instance in the process
+sleeper_limiter = TokenBucket(SLEEPER_RATE_PER_MINUTE / 60, SLEEPER_BURST)
@@ -0,0 +1,158 @@
+"""Text layouts shared by every Discord post
+
+Layouts write into one TextBuffer (a list of parts joined once at the end)
+instead of growing a string with +=, so rendering is linear in the output
+size. Padded names and emoji are cached, since the same teams are rendered
+over and over across leagues, weeks and live updates.
+"""
+from functools import lru_cache
+from itertools import zip_longest
+from typing import List, Callable, Dict, Any, Iterable
+
+MATCHUPS_TABLE_HEADER = (
+    "Team 1       T1 Pts  ⚔️   T2 Pts   Team 2  \n"
+    "---------------------------------------------\n"
+)
+
+CLINCH_LEGEND = "x clinched playoffs · y clinched bye · e eliminated\n"
+
+# Spacer between teams in the standings tables
+STANDINGS_SPACER = "                                       \n"
+
+
+class TextBuffer:
+    """Collects output parts and joins them once"""
+
+    def __init__(self):
+        self.parts: List[str] = []
+
+    def write(self, *parts: str):
+        self.parts.extend(parts)
+
+    def getvalue(self) -> str:
+        return "".join(self.parts)
+
+
+@lru_cache(maxsize=4096)
+def pad(text: str, width: int, align: str = '<') -> str:
+    """Cached fixed-width field, e.g. a team name padded to its column"""
+    return format(text, f'{align}{width}')
+
+def rank_emoji(idx: int) -> str:
+    return "🏆" if idx == 1 else "🏈"
+
+def write_standings_rows(buffer: TextBuffer, standings: List[Dict[str, Any]], team_name_for: Callable[[Dict[str, Any]], str]):
+    """Two-line rank / name and record rows for one standings table"""
+    for idx, team in enumerate(standings, start=1):
+        # Combine team name and owner nickname into one string
+        combined_name = f" {team_name_for(team)} ({team['nickname']})"
+        if team.get('clinch'):
+            combined_name = f" {team['clinch']}-{combined_name[1:]}"
+
+        # Combine W-L and Pts For/Against into one string
+        combined_info = f" {team['wins']}-{team['losses']} | PF {team['points_for']:.2f} | PA {team['points_against']:.2f}"
+
+        # Add the formatted team rank, combined name, and combined info
+        buffer.write(
+            rank_emoji(idx), pad(str(idx), 3), " ", pad(combined_name, 30), "\n",
+            "      ", pad(combined_info, 32), "\n",
+            STANDINGS_SPACER
+        )
+
+def write_standings_table(buffer: TextBuffer, standings: List[Dict[str, Any]],
+                          team_name_for: Callable[[Dict[str, Any]], str], title: str = None):
+    """One standings table as a code block, optionally under a `title` label"""
+    if title:
+        buffer.write(f"`{title}` \n")
+    buffer.write("```")
+    write_standings_rows(buffer, standings, team_name_for)
+    if any(team.get('clinch') for team in standings):
+        buffer.write(CLINCH_LEGEND)
+    buffer.write("```\n")
+
+def matchup_row(team1: Dict[str, Any], team2: Dict[str, Any], snapshot) -> str:
+    """One line of the matchups table, or an empty string if a roster ID is missing"""
+    # Get roster IDs (team 1 and team 2)
+    team1_id = team1.get('roster_id', None)
+    team2_id = team2.get('roster_id', None)
+
+    if not team1_id or not team2_id:
+        return ""  # Skip if roster IDs are missing
+
+    # Get points for both teams (float values)
+    team1_points = team1.get('points', 0.0)
+    team2_points = team2.get('points', 0.0)
+
+    # Roster team names, falling back to the owners' nicknames
+    team1_name = pad(snapshot.team_names(team1_id)['roster_team_name'], 11)
+    team2_name = pad(snapshot.team_names(team2_id)['roster_team_name'], 10)
+
+    # Determine the winner emoji
+    winner_emoji_team1 = "🏆" if team1_points > team2_points else "❌"
+    winner_emoji_team2 = "🏆" if team2_points > team1_points else "❌"
+
+    # Formatted matchup with improved alignment
+    return f"{winner_emoji_team1}{team1_name}{team1_points:<8.2f}vs   {team2_points:<8.2f}{winner_emoji_team2}{team2_name}\n"
+
+def write_matchups_table(buffer: TextBuffer, pairs: Iterable, snapshot):
+    """The matchups table for (matchup_id, [team1, team2]) pairs"""
+    buffer.write("```", MATCHUPS_TABLE_HEADER)
+    for matchup_id, (team1, team2) in pairs:
+        buffer.write(matchup_row(team1, team2, snapshot))
+    buffer.write("```")
+
+def bracket_emojis(t1: str, t2: str, s1, s2):
+    """Winner/loser/undecided emoji for both sides of a bracket match; byes get a wave"""
+    t1_emoji = "🏆" if s1 != 'TBD' and (s2 == 'TBD' or s1 > s2) else "❌" if s2 != 'TBD' else "❓"
+    t2_emoji = "🏆" if s2 != 'TBD' and (s1 == 'TBD' or s2 > s1) else "❌" if s1 != 'TBD' else "❓"
+    t1_emoji = "🙌" if t1 == 'BYE' else t1_emoji
+    t2_emoji = "🙌" if t2 == 'BYE' else t2_emoji
+    return t1_emoji, t2_emoji
+
+def format_score(score, score_format: str = '') -> str:
+    # 'TBD', or '' for a decided match shown without scores
+    return score if isinstance(score, str) else format(score, score_format)
+
+def bracket_entry(t1: str, s1, t2: str, s2, emojis=None, score_format: str = '') -> str:
+    """Both teams of a bracket match with their scores, one per line"""
+    t1_emoji, t2_emoji = emojis or bracket_emojis(t1, t2, s1, s2)
+    s1, s2 = format_score(s1, score_format), format_score(s2, score_format)
+    return f"{t1_emoji} {pad(t1, 10)} {s1:>6}\n{t2_emoji} {pad(t2, 10)} {s2:>6}\n"
+
+def bracket_matchup(match: Dict[str, Any], nicknames: Dict[str, str]) -> str:
+    """A bracket match from its display names and scores"""
+    t1 = nicknames.get(match.get('t1_display_name', 'TBD'), 'TBD')
+    t2 = nicknames.get(match.get('t2_display_name', 'TBD'), 'TBD')
+    return bracket_entry(t1, match.get('t1_score', 'TBD'), t2, match.get('t2_score', 'TBD'))
+
+def join_columns(columns: List[str], width: int = 35) -> str:
+    """Lay out one block per round side by side, every column but the last padded to the column width"""
+    rows = zip_longest(*(column.rstrip("\n").split("\n") for column in columns), fillvalue='')
+    return "\n".join(
+        ("".join(cell.ljust(width) for cell in row[:-1]) + row[-1]).rstrip()
+        for row in rows
+    )
+
+def bracket_columns(matches: List[Dict[str, Any]], nicknames: Dict[str, str], rounds: int, width: int = 35) -> str:
+    """A bracket as one code block with a column per round"""
+    by_round = {round_num: [] for round_num in range(1, rounds + 1)}
+    for match in matches:
+        round_num = match.get('r', 1)
+        if round_num in by_round:
+            by_round[round_num].append(match)
+
+    columns = ["\n".join(bracket_matchup(m, nicknames) for m in round_matches) for round_matches in by_round.values()]
+    return f"```\n{join_columns(columns, width)}\n```"
+
+def format_odds_table(odds: List[Dict[str, Any]], name_for: Callable[[int], str]) -> str:
+    """Playoff, bye and title odds per team, most likely playoff teams first"""
+    buffer = TextBuffer()
+    buffer.write("```", f"{'Team':<12}{'Playoffs':>9}{'Bye':>7}{'Title':>7}\n")
+    for team in sorted(odds, key=lambda t: (-t['playoffs'], -t['champion'])):
+        buffer.write(pad(name_for(team['roster_id'])[:12], 12),
+                     f"{team['playoffs']:>9.1%}{team['bye']:>7.1%}{team['champion']:>7.1%}\n")
+    buffer.write("```")
+    return buffer.getvalue()
+
+def code_block(text: str) -> str:
+    return f"```\n{text}\n```"
@@ -1,200 +1,102 @@
-import discord
-import requests
 import os
-from discord.ext import commands
+import asyncio
+import logging
 import datetime
 import pytz
+from sleeper import SleeperAPI
+from snapshot import LeagueSnapshot
+from leagues import load_leagues, process_leagues, group_by_channel
+from delivery import deliver_embeds
+from webhook import Webhooks, get_channel, needs_gateway
+from season import SeasonStore, remaining_season, finalize_weeks
+from render import TextBuffer, write_standings_table, write_matchups_table, format_odds_table
+from odds import POST_ODDS, league_odds
+from clinch import CLINCH_TAGS, clinch_flags
+from players import TOP_PLAYERS, load_player_index
+from standings import StandingsTable, DEFAULT_TIEBREAKERS
+from changes import ChangeStore, normalize_matchups, normalize_standings
+import metrics
+from compute import compute_pool
+from nfl import resolve_week, week_is_final
+from logconfig import setup_logging
 
 # Import environment variables
 DISCORD_BOT_TOKEN = os.getenv('DISCORD_BOT_TOKEN')
-LEAGUE_1_ID = os.getenv('LEAGUE_1_ID')
-LEAGUE_2_ID = os.getenv('LEAGUE_2_ID')
-CHANNEL_ID = int(os.getenv('CHANNEL_ID'))
-
-LEAGUE_1_NAME = "C and O league 1"
-LEAGUE_2_NAME = "C&O Best League"
-
-# Nicknames for teams in League 1 and League 2
-nicknames_league_1 = {
-    'calummurray14': 'Calum',
-    'Kroftszn': 'Scot Adam',
-    'GjermundH': 'Gjermund',
-    'AshG82': 'Ash',
-    'Lottiebirch92': 'Lottie',
-    'sackmasterkatie': 'Katie',
-    'aligunn': 'Ally',
-    'Adamski11': 'Irish Adam',
-    'Fergus75': 'Fergus',
-    'CamTitans95': 'Cal'
-}
-
-nicknames_league_2 = {
-    'shelbyxmas': 'Shelby',
-    'RagingTurtle28': 'Ben',
-    'lulltula': 'Dan',
-    'vorkem': 'Mike',
-    'ThomasCullen': 'Thomas C',
-    'Doppler221': 'Doppler',
-    'MartyG93': 'Marty',
-    'Doonhamer': 'Doonhamer',
-    'Tygre': 'Tygre',
-    'brianp671': 'Brian'
-}
-
-def get_nfl_week():
-    # Define the starting week dates for each NFL week
-    week_mapping = {
-        3: datetime.date(2024, 9, 26),
-        4: datetime.date(2024, 10, 1),
-        5: datetime.date(2024, 10, 8),
-        6: datetime.date(2024, 10, 15),
-        7: datetime.date(2024, 10, 22),
-        8: datetime.date(2024, 10, 29),
-        9: datetime.date(2024, 11, 5),
-        10: datetime.date(2024, 11, 12),
-        11: datetime.date(2024, 11, 19),
-        12: datetime.date(2024, 11, 26),
-        13: datetime.date(2024, 12, 3),
-        14: datetime.date(2024, 12, 10),
-        15: datetime.date(2024, 12, 17),
-        16: datetime.date(2024, 12, 24),
-        17: datetime.date(2024, 12, 31)
-    }
-
-    today = datetime.date.today()
-
-    # Initialize current_week to None in case no week matches
-    current_week = None
-
-    # Compare today's date with the week start dates
-    for week, start_date in sorted(week_mapping.items()):
-        if today >= start_date:
-            current_week = week
-
-    return current_week
-
-# Function to get league information
-def get_league_info(league_id):
-    url = f'https://api.sleeper.app/v1/league/{league_id}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    return None
-
-# Function to get rosters and their owner IDs
-def get_rosters(league_id):
-    url = f'https://api.sleeper.app/v1/league/{league_id}/rosters'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    return []
-
-# Function to get users (team names)
-def get_users(league_id):
-    url = f'https://api.sleeper.app/v1/league/{league_id}/users'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    return []
-
-# Function to get matchups for the week
-def get_matchups(league_id, week):
-    url = f'https://api.sleeper.app/v1/league/{league_id}/matchups/{week}'
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    return []
 
 # Function to get league standings and include division info (if applicable)
-def get_league_standings(league_id, users, rosters, nicknames, has_divisions=False):
-    standings = []
-    for roster in rosters:
-        user_id = roster['owner_id']
-        user_info = next((u for u in users if u['user_id'] == user_id), {})
-
-        # Get the user's Sleeper username (display_name)
-        username = user_info.get('display_name', 'Unknown User')
-
-        # Fallback to username if no team name is found
-        team_name = user_info.get('metadata', {}).get('team_name', username)
-
-        # Get wins, losses, points for, points against
-        wins = roster['settings']['wins']
-        losses = roster['settings']['losses']
-        points_for = float(f"{roster['settings']['fpts']}.{roster['settings']['fpts_decimal']:02d}")
-        points_against = float(f"{roster['settings']['fpts_against']}.{roster['settings']['fpts_against_decimal']:02d}")
+def get_league_standings(snapshot, has_divisions=False, tiebreakers=DEFAULT_TIEBREAKERS, history=None):
+    """Rank the league's teams with the columnar standings engine
+
+    tiebreakers are applied in order (see standings.TIEBREAKERS); history is
+    the season's weekly matchup lists, only needed for head_to_head.
+    """
+    table = _standings_table(snapshot, tiebreakers, history)
+    return _standings_rows(table, table.rank(tiebreakers).tolist(), snapshot, has_divisions)
+
+def get_division_standings(snapshot, tiebreakers=DEFAULT_TIEBREAKERS, history=None):
+    """Division number -> that division's standings, ranked and grouped in one pass"""
+    table = _standings_table(snapshot, tiebreakers, history)
+    groups = table.split_divisions(table.rank(tiebreakers, by_division=True))
+    return {division: _standings_rows(table, rows.tolist(), snapshot, True) for (_, division), rows in groups.items()}
+
+def _standings_table(snapshot, tiebreakers, history):
+    table = StandingsTable([snapshot.rosters])
+    if 'head_to_head' in tiebreakers:
+        table.add_head_to_head([history])
+    return table
+
+def _standings_rows(table, order, snapshot, has_divisions):
+    """One standings entry per row index in order"""
+    # Pull every column out once rather than indexing NumPy per team
+    wins, losses = table.wins.tolist(), table.losses.tolist()
+    points_for, points_against = table.points_for.tolist(), table.points_against.tolist()
+    divisions = table.division.tolist()
 
-        # Get the nickname (if exists) or fallback to username
-        nickname = nicknames.get(username, username)
+    standings = []
+    for row in order:
+        roster = table.rows[row]
 
-        # Get division if it's a league with divisions
-        division = roster['settings'].get('division') if has_divisions else None
+        # Username, nickname and team name are resolved once in the snapshot
+        names = snapshot.team_names(roster['roster_id'])
 
         standings.append({
-            'team_name': team_name,
-            'nickname': nickname,
-            'wins': wins,
-            'losses': losses,
-            'points_for': points_for,
-            'points_against': points_against,
-            'owner_id': user_id,
-            'division': division  # Division will be None if it's a league without divisions
+            'roster_id': roster['roster_id'],
+            'team_name': names['team_name'],
+            'nickname': names['nickname'],
+            'wins': wins[row],
+            'losses': losses[row],
+            'points_for': points_for[row],
+            'points_against': points_against[row],
+            'owner_id': roster['owner_id'],
+            'division': divisions[row] if has_divisions else None  # None if it's a league without divisions
         })
 
-    # Sort standings by wins (descending), points_for (descending), and points_against (ascending)
-    standings.sort(key=lambda x: (-x['wins'], -x['points_for'], x['points_against']))
-    
     return standings
 
-# Function to split standings by division for League 1
-def split_standings_by_division(standings):
-    division_1 = []
-    division_2 = []
-    
-    for team in standings:
-        if team['division'] == 1:  # Division 1 teams
-            division_1.append(team)
-        elif team['division'] == 2:  # Division 2 teams
-            division_2.append(team)
-
-    # Since we are sorting in get_league_standings(), there's no need to sort here again
-    return division_1, division_2
-
 # Utility function to get team name or username if no team name is available
-def get_team_name_or_username(team, users):
+def get_team_name_or_username(team, snapshot):
     owner_id = team.get('owner_id')
     team_name = team.get('team_name', 'Unknown Team')
     
     # Special case to replace "Forgot my funny team name" with the username
     if team_name == "blahblah":
-        username = next((u['display_name'] for u in users if u.get('user_id') == owner_id), "Unknown User")
-        return username  # Use username instead of the long team name
+        return snapshot.display_name(owner_id)  # Use username instead of the long team name
     
     # If team name is unknown, use the username
-    return team_name if team_name != "Unknown Team" else next((u['display_name'] for u in users if u.get('user_id') == owner_id), "Unknown User")
+    return team_name if team_name != "Unknown Team" else snapshot.display_name(owner_id)
 
-def get_lowest_scorers(matchups, users, rosters, nicknames):
+def get_lowest_scorers(snapshot):
     lowest_scorers = []
 
     # Iterate through each matchup and find the lowest scorer
-    for matchup in matchups:
+    for matchup in snapshot.matchups:
         # Get the roster ID
         roster_id = matchup.get('roster_id', None)
         if not roster_id:
             continue
         
-        # Get the roster information
-        roster_info = next((r for r in rosters if r['roster_id'] == roster_id), {})
-        
-        # Get user details using owner_id (username)
-        user_info = next((u for u in users if u['user_id'] == roster_info.get('owner_id')), {})
-        username = user_info.get('display_name', 'Unknown User')
-
-        # Use nickname or fallback to username
-        nickname = nicknames.get(username, username)
-        
-        # Get team name or use nickname if team name is not available
-        team_name = roster_info.get('metadata', {}).get('team_name', nickname).strip()
+        # Roster team name, falling back to the owner's nickname
+        team_name = snapshot.team_names(roster_id)['roster_team_name']
 
         # Get the points scored by the team
         points = matchup.get('points', 0.0)
@@ -208,253 +110,325 @@ def get_lowest_scorers(matchups, users, rosters, nicknames):
     # Return the team with the lowest points
     return lowest_scorers[:1]  # You can adjust this to get more than 1 player if needed
 
-def format_league_one_with_divisions(league_name, standings_div1, standings_div2, users, nicknames):
-    description = f"      🏅 **{LEAGUE_1_NAME} Standings:**\n\n"
+def get_top_players(snapshot, limit=TOP_PLAYERS):
+    """The week's highest-scoring starters as (player_id, points, team name)"""
+    top_players = []
 
-    # Division 1
-    description += "`Division 1` \n```"
-    for idx, team in enumerate(standings_div1, start=1):
-        emoji = "🏆" if idx == 1 else "🏈"
-        
-        # Combine team name and owner nickname into one string
-        team_name = get_team_name_or_username(team, users)
-        owner_nickname = nicknames.get(team['nickname'], team['nickname'])
-        combined_name = f" {team_name} ({owner_nickname})"
-        
-        # Combine W-L and Pts For/Against into one string
-        combined_info = f" {team['wins']}-{team['losses']} | PF {team['points_for']:.2f} | PA {team['points_against']:.2f}"
-
-        # Add the formatted team rank, combined name, and combined info
-        description += f"{emoji:<1}{idx:<3} {combined_name:<30}\n"
-        description += f"      {combined_info:<32}\n"
-        description += "                                       \n"
-    description += "```\n"
-
-    # Division 2
-    description += "`Division 2` \n```"
-    for idx, team in enumerate(standings_div2, start=1):
-        emoji = "🏆" if idx == 1 else "🏈"
-        
-        # Combine team name and owner nickname into one string
-        team_name = get_team_name_or_username(team, users)
-        owner_nickname = nicknames.get(team['nickname'], team['nickname'])
-        combined_name = f" {team_name} ({owner_nickname})"
+    for matchup in snapshot.matchups:
+        roster_id = matchup.get('roster_id', None)
+        if not roster_id:
+            continue
+        team_name = snapshot.team_names(roster_id)['roster_team_name']
+
+        # starters_points lines up with starters; fall back to players_points by ID
+        starters_points = matchup.get('starters_points') or []
+        players_points = matchup.get('players_points') or {}
+        for index, player_id in enumerate(matchup.get('starters') or []):
+            # Sleeper fills empty starting slots with '0'
+            if not player_id or player_id == '0':
+                continue
+            points = starters_points[index] if index < len(starters_points) else players_points.get(player_id)
+            if points is not None:
+                top_players.append((player_id, float(points), team_name))
+
+    top_players.sort(key=lambda x: x[1], reverse=True)
+    return top_players[:limit]
 
-        # Combine W-L and Pts For/Against into one string
-        combined_info = f" {team['wins']}-{team['losses']} | PF {team['points_for']:.2f} | PA {team['points_against']:.2f}"
+def format_league_one_with_divisions(league_name, standings_div1, standings_div2, snapshot):
+    buffer = TextBuffer()
+    buffer.write(f"      🏅 **{league_name} Standings:**\n\n")
 
-        # Add the formatted team rank, combined name, and combined info
-        description += f"{emoji:<1}{idx:<3} {combined_name:<30}\n"
-        description += f"      {combined_info:<32}\n"
-        description += "                                       \n"
-    description += "```\n"
+    def team_name_for(team):
+        return get_team_name_or_username(team, snapshot)
 
-    return description
+    # One table per division
+    write_standings_table(buffer, standings_div1, team_name_for, title="Division 1")
+    write_standings_table(buffer, standings_div2, team_name_for, title="Division 2")
+
+    return buffer.getvalue()
 
 def format_donkeys_of_the_week(lowest_scorers):
-    description = "```"
-    
+    buffer = TextBuffer()
+    buffer.write("```")
+
     # Add the lowest scorer to the description
     for team_name, points in lowest_scorers:
-        description += f"{team_name:<10} {points:<8.2f}\n"
-    
-    description += "```"
-    
-    return description
+        buffer.write(f"{team_name:<10} {points:<8.2f}\n")
 
-def format_league_two(league_name, standings_league_2, users, nicknames):
-    description = f"      🏅 **{LEAGUE_2_NAME} Standings:**\n"
+    buffer.write("```")
+    return buffer.getvalue()
 
-    # League 2 Standings
-    description += "```"
-    for idx, team in enumerate(standings_league_2, start=1):
-        emoji = "🏆" if idx == 1 else "🏈"
-        
-        # Combine team name and owner nickname into one string
-        team_name = get_team_name_or_username(team, users)
-        owner_nickname = nicknames.get(team['nickname'], team['nickname'])
-        combined_name = f" {team_name} ({owner_nickname})"
-        
-        # Combine W-L and Pts For/Against into one string
-        combined_info = f" {team['wins']}-{team['losses']} | PF {team['points_for']:.2f} | PA {team['points_against']:.2f}"
+def format_top_players(top_players, player_index=None):
+    """Top scorers with names from the player index, or their IDs without one"""
+    buffer = TextBuffer()
+    buffer.write("```")
+
+    for player_id, points, team_name in top_players:
+        player = player_index.get(player_id) if player_index is not None else None
+        name = player['name'] if player and player['name'] else player_id
+        position = player['position'] if player else ''
+        buffer.write(f"{position:<3} {name:<20} {points:<6.2f} {team_name}\n")
+
+    buffer.write("```")
+    return buffer.getvalue()
+
+def format_league_two(league_name, standings_league_2, snapshot):
+    buffer = TextBuffer()
+    buffer.write(f"      🏅 **{league_name} Standings:**\n")
 
-        # Add the formatted team rank, combined name, and combined info
-        description += f"{emoji:<1}{idx:<3} {combined_name:<30}\n"
-        description += f"      {combined_info:<32}\n"
-        description += "                                       \n"
-    description += "```\n"
+    # Standings for a league without divisions
+    write_standings_table(buffer, standings_league_2, lambda team: get_team_name_or_username(team, snapshot))
 
-    return description
+    return buffer.getvalue()
 
-def get_team_name_or_username_in_matchups(team, users):
+def get_team_name_or_username_in_matchups(team, snapshot):
     owner_id = team.get('owner_id')
-    team_name = team.get('metadata', {}).get('team_name', None)
+    team_name = (team.get('metadata') or {}).get('team_name', None)
 
     # If the team has no name, fall back to the username
     if not team_name or team_name == "Unknown Team":
-        username = next((u['display_name'] for u in users if u.get('user_id') == owner_id), "Unknown User")
-        return username
+        return snapshot.display_name(owner_id)
     return team_name
 
-def format_matchups_table(matchups, users, rosters, nicknames):
-    description = "```"
-    description += "Team 1       T1 Pts  ⚔️   T2 Pts   Team 2  \n"
-    description += "---------------------------------------------\n"
-
- # Organize matchups by matchup ID
-    matchups_by_id = {}
-    for matchup in matchups:
-        matchup_id = matchup.get('matchup_id', None)
-        if matchup_id:
-            if matchup_id not in matchups_by_id:
-                matchups_by_id[matchup_id] = []
-            matchups_by_id[matchup_id].append(matchup)
-
-    # Iterate over each matchup (where there are two teams)
-    for matchup_id, matchup_pair in matchups_by_id.items():
-        if len(matchup_pair) == 2:
-            team1 = matchup_pair[0]
-            team2 = matchup_pair[1]
-
-            # Get roster IDs (team 1 and team 2)
-            team1_id = team1.get('roster_id', None)
-            team2_id = team2.get('roster_id', None)
-
-            if not team1_id or not team2_id:
-                continue  # Skip if roster IDs are missing
-
-            # Get points for both teams (float values)
-            team1_points = team1.get('points', 0.0)
-            team2_points = team2.get('points', 0.0)
-
-            # Get roster information for both teams
-            team1_info = next((r for r in rosters if r['roster_id'] == team1_id), {})
-            team2_info = next((r for r in rosters if r['roster_id'] == team2_id), {})
-
-            # Get user details using owner_id (username)
-            team1_user = next((u for u in users if u['user_id'] == team1_info.get('owner_id')), {})
-            team2_user = next((u for u in users if u['user_id'] == team2_info.get('owner_id')), {})
-
-            # Get usernames
-            team1_username = team1_user.get('display_name', 'Unknown User')
-            team2_username = team2_user.get('display_name', 'Unknown User')
-
-            # Use nickname or fallback to username
-            team1_nickname = nicknames.get(team1_username, team1_username)
-            team2_nickname = nicknames.get(team2_username, team2_username)
-
-            # Get team names, fallback to usernames if team names are not available
-            team1_name = team1_info.get('metadata', {}).get('team_name', team1_nickname)
-            team2_name = team2_info.get('metadata', {}).get('team_name', team2_nickname)
-
-            # Strip any leading/trailing spaces in team names
-            team1_name = team1_name.strip()
-            team2_name = team2_name.strip()
-
-            # Determine the winner emoji
-            winner_emoji_team1 = "🏆" if team1_points > team2_points else "❌"
-            winner_emoji_team2 = "🏆" if team2_points > team1_points else "❌"
-            versusstring = "vs"
-
-            # Add formatted matchup to the table with improved alignment
-            description += (
-                f"{winner_emoji_team1:<1}{team1_name:<11}{team1_points:<8.2f}{versusstring:<5}{team2_points:<8.2f}{winner_emoji_team2:<1}{team2_name:<10}\n"
-            )
-
-    # Close the table
-    description += "```"
+def format_matchups_table(snapshot):
+    buffer = TextBuffer()
 
-    return description
+    # Every matchup (where there are two teams), already paired by matchup ID
+    write_matchups_table(buffer, snapshot.matchup_pairs(), snapshot)
 
-# Get the current timestamp (UTC)
-dublin_tz = pytz.timezone('Europe/Dublin')
-current_time = datetime.datetime.now(dublin_tz)
+    return buffer.getvalue()
 
-# Discord bot setup
-intents = discord.Intents.default()
-client = discord.Client(intents=intents)
+async def build_league_results(sleeper, league, week, store=None):
+    """Fetch one league's data and render its standings, matchups and lowest scorer
 
-@client.event
-async def on_ready():
-    print(f'Logged in as {client.user}')
+    With a SeasonStore, the league settings, rosters and matchups are
+    ingested so later history queries don't need Sleeper. The week is only
+    stored as final once it has rolled over; earlier weeks stored before
+    then are re-fetched and finalized here.
+    """
+    # Fetch league settings, rosters, users and matchups in one concurrent burst
+    info, rosters, users, matchups = await asyncio.gather(
+        sleeper.get_league(league.league_id),
+        sleeper.get_rosters(league.league_id),
+        sleeper.get_users(league.league_id),
+        sleeper.get_matchups(league.league_id, week)
+    )
 
-    # Get the current NFL week dynamically
-    current_week = get_nfl_week()
+    if rosters is None and matchups is None:
+        raise RuntimeError(f"No data available for {league.name}")
+    for name, value in (('rosters', rosters), ('users', users), ('matchups', matchups)):
+        if value is None:
+            logging.warning(f"{league.name} {name} unavailable, rendering without them")
+
+    history = None
+    if store is not None:
+        # playoff_week_start keeps playoff weeks out of the stored standings
+        store.ingest_league(league.league_id, info)
+        store.ingest_teams(league.league_id, rosters, users)
+        season_year = (info or {}).get('season')
+        final = week_is_final(season_year, week)
+        store.ingest_week(league.league_id, week, matchups, final=final)
+        await finalize_weeks(store, sleeper, league, season_year)
+        if 'head_to_head' in league.tiebreakers:
+            history = store.season_matchups(league.league_id)
+            # Sleeper's records already count this week, so its games count for head-to-head too
+            if not final and matchups:
+                history.append(matchups)
+
+    # The rest of the regular season, for clinch flags and playoff odds
+    # Division winners' auto-bids aren't modelled, so division leagues get neither
+    remaining = None
+    post_odds = POST_ODDS and store is not None and not league.divisions
+    if rosters and not league.divisions and (CLINCH_TAGS or post_odds):
+        remaining = await remaining_season(sleeper, league, week)
+    samples = store.score_samples(league.league_id) if post_odds and remaining else None
+
+    # Ranking, clinch checks, odds and layout run in the compute pool
+    result = await compute_pool.run(compute_league_results, league, rosters, users, matchups, history, remaining, samples)
+    # The week is part of the state, so a new week with the same numbers still posts
+    result['state'] = {'week': week, 'standings': normalize_standings(rosters), 'matchups': normalize_matchups(matchups)}
+    return result
+
+def compute_league_results(league, rosters, users, matchups, history=None, remaining=None, samples=None):
+    """Clinch flags, rendered tables and (with samples) playoff odds for one league
+
+    Runs in a compute pool worker, so it takes only picklable data: remaining
+    is season.remaining_season's result and samples the store's score samples.
+    """
+    clinch = None
+    # Division winners' auto-bids aren't modelled, so don't tag division leagues
+    if CLINCH_TAGS and remaining and not league.divisions:
+        with metrics.timer('compute', step='clinch', league=league.league_id):
+            clinch = clinch_flags(rosters, remaining['weeks'], remaining['playoff_teams'])
+    result = render_league_results(league, rosters, users, matchups, history, clinch)
+
+    # Simulated playoff odds, fitted to the season store's scores
+    if samples is not None and remaining:
+        # The pool already spreads leagues over cores, so simulate in this worker
+        with metrics.timer('compute', step='odds', league=league.league_id):
+            odds = league_odds(samples, rosters, remaining, workers=1)
+        snapshot = LeagueSnapshot(rosters, users, league.nicknames)
+        result['odds'] = format_odds_table(odds, lambda roster_id: snapshot.team_names(roster_id)['nickname'])
+    return result
+
+def render_league_results(league, rosters, users, matchups, history=None, clinch=None):
+    """Render one league's standings, matchups and lowest scorer from fetched data
+
+    clinch maps roster IDs to their clinched/eliminated tag from clinch_flags.
+    """
+    # Index the league once; a failed endpoint renders as an empty table
+    with metrics.timer('compute', step='standings', league=league.league_id):
+        snapshot = LeagueSnapshot(rosters, users, league.nicknames, matchups)
+        if league.divisions:
+            # Ranked within each division using the actual division info
+            divisions = get_division_standings(snapshot, tiebreakers=league.tiebreakers, history=history)
+            standings = [team for teams in divisions.values() for team in teams]
+        else:
+            standings = get_league_standings(snapshot, tiebreakers=league.tiebreakers, history=history)
+    for team in standings:
+        team['clinch'] = (clinch or {}).get(team['roster_id'])
+
+    with metrics.timer('render', step='results', league=league.league_id):
+        if league.divisions:
+            formatted_standings = format_league_one_with_divisions(league.name, divisions.get(1, []), divisions.get(2, []), snapshot)
+        else:
+            formatted_standings = format_league_two(league.name, standings, snapshot)
+
+        return {
+            'league': league,
+            'standings': formatted_standings,
+            'matchups': format_matchups_table(snapshot),
+            'lowest_scorers': get_lowest_scorers(snapshot),
+            'top_players': get_top_players(snapshot) if TOP_PLAYERS else []
+        }
+
+def build_results_embeds(league_results, week, current_time, player_index=None):
+    """One embed per league, with the combined top players and Donkeys of the Week on the last one"""
+    # discord.py is slow to import, so only load it when actually posting
+    import discord
+
+    embeds = []
+    for result in league_results:
+        embed = discord.Embed(description=result['standings'], color=0x587ac7)
+        embed.add_field(name=f"{result['league'].name} - Matchup Results:", value=result['matchups'], inline=False)
+        if result.get('odds'):
+            embed.add_field(name=f"{result['league'].name} - Playoff Odds:", value=result['odds'], inline=False)
+        embeds.append(embed)
+
+    embeds[0].set_author(
+        name=f"Fantasy Results – Week {week}:",
+        icon_url="https://play-lh.googleusercontent.com/L5sDy5zFKKLLMndpR7wJfD3aum4w0FVL_rRK6W1t9T5-d4BYc-4A7LTXa2nGeP62TCo"
+    )
 
-    if current_week is None:
-        print("Error: Could not determine the NFL week.")
-        await client.close()
-        return
+    # The best starters across every league, named from the player index
+    top_players = sorted((player for result in league_results for player in result.get('top_players', [])),
+                         key=lambda x: x[1], reverse=True)[:TOP_PLAYERS]
+    if top_players:
+        embeds[-1].add_field(name="🔥 Top Players of the Week 🔥", value=format_top_players(top_players, player_index), inline=False)
 
-    print(f"Fetching data for Week {current_week}")
+    # Combine every league's donkeys into a single formatted string
+    combined_donkeys = format_donkeys_of_the_week(
+        [scorer for result in league_results for scorer in result['lowest_scorers']]
+    )
+    embeds[-1].add_field(name=f"🫏🫏🫏 Donkeys of the Week HEE-HAW! 🫏🫏🫏", value=combined_donkeys, inline=False)
 
-    # Fetch data for League 1
-    rosters_league_1 = get_rosters(LEAGUE_1_ID)
-    users_league_1 = get_users(LEAGUE_1_ID)
-    standings_league_1 = get_league_standings(LEAGUE_1_ID, users_league_1, rosters_league_1, nicknames_league_1, has_divisions=True)
-    matchups_league_1 = get_matchups(LEAGUE_1_ID, week=current_week)
+    # Add the provided thumbnail and icon URLs
+    embeds[-1].set_footer(text="Sleeper Bot", icon_url="https://play-lh.googleusercontent.com/L5sDy5zFKKLLMndpR7wJfD3aum4w0FVL_rRK6W1t9T5-d4BYc-4A7LTXa2nGeP62TCo")
+    embeds[-1].timestamp = current_time
 
-    # Fetch data for League 2
-    rosters_league_2 = get_rosters(LEAGUE_2_ID)
-    users_league_2 = get_users(LEAGUE_2_ID)
-    standings_league_2 = get_league_standings(LEAGUE_2_ID, users_league_2, rosters_league_2, nicknames_league_2, has_divisions=False)
-    matchups_league_2 = get_matchups(LEAGUE_2_ID, week=current_week)
+    return embeds
 
-#    Split League 1 standings into two divisions using the actual division info
-    standings_div1, standings_div2 = split_standings_by_division(standings_league_1)
+dublin_tz = pytz.timezone('Europe/Dublin')
 
-    # Format the standings using the new functions
-    formatted_standings_league_1 = format_league_one_with_divisions("League 1", standings_div1, standings_div2, users_league_1, nicknames_league_1)
-    formatted_standings_league_2 = format_league_two("League 2", standings_league_2, users_league_2, nicknames_league_2)
+@metrics.job_run('results')
+async def post_results(client, leagues=None, week=None):
+    """Fetch, render and post this week's results for every league
 
+    client is the logged-in bot, or None when every league posts through a webhook.
+    """
+    # Get the current NFL week from Sleeper's state
+    current_week = await resolve_week() if week is None else week
 
-    # Format the matchups using the new table format for both leagues
-    formatted_matchups_league_1 = format_matchups_table(matchups_league_1, users_league_1, rosters_league_1, nicknames_league_1)
-    formatted_matchups_league_2 = format_matchups_table(matchups_league_2, users_league_2, rosters_league_2, nicknames_league_2)
+    if current_week is None:
+        logging.error("Could not determine the NFL week")
+        return
 
-    # Get the lowest scoring players for both leagues
-    lowest_scorers_league_1 = get_lowest_scorers(matchups_league_1, users_league_1, rosters_league_1, nicknames_league_1)
-    lowest_scorers_league_2 = get_lowest_scorers(matchups_league_2, users_league_2, rosters_league_2, nicknames_league_2)
+    logging.info(f"Fetching data for Week {current_week}")
 
-    # Get the lowest scoring players for both leagues
-    lowest_scorers_league_1 = get_lowest_scorers(matchups_league_1, users_league_1, rosters_league_1, nicknames_league_1)
-    lowest_scorers_league_2 = get_lowest_scorers(matchups_league_2, users_league_2, rosters_league_2, nicknames_league_2)
+    # Get the current timestamp
+    current_time = datetime.datetime.now(dublin_tz)
 
-    # Combine both leagues' donkeys into a single formatted string
-    combined_donkeys = format_donkeys_of_the_week(lowest_scorers_league_1 + lowest_scorers_league_2)
-    
-    # Create the embed
-    embed = discord.Embed(
-        description=f"{formatted_standings_league_1}\n{formatted_standings_league_2}",
-        color=0x587ac7
-    )
-    embed.set_author(
-        name=f"Fantasy Results – Week {current_week}:",
-        icon_url="https://play-lh.googleusercontent.com/L5sDy5zFKKLLMndpR7wJfD3aum4w0FVL_rRK6W1t9T5-d4BYc-4A7LTXa2nGeP62TCo"
-    )
+    # Process every configured league concurrently, bounded by the configured limit
+    leagues = load_leagues() if leagues is None else leagues
+    with SeasonStore() as store:
+        async with SleeperAPI() as sleeper:
+            league_results = await process_leagues(
+                leagues,
+                lambda league: build_league_results(sleeper, league, current_week, store)
+            )
 
-    # Add fields for both leagues' matchups
-    embed.add_field(name=f"{LEAGUE_1_NAME} - Matchup Results:", value=formatted_matchups_league_1, inline=False)
-    embed.add_field(name=f"{LEAGUE_2_NAME} - Matchup Results:", value=formatted_matchups_league_2, inline=False)
-        # Add combined Donkeys of the Week as a single field
-    embed.add_field(name=f"🫏🫏🫏 Donkeys of the Week HEE-HAW! 🫏🫏🫏", value=combined_donkeys, inline=False)
+            # Names for the top players; the index refreshes itself at most daily
+            player_index = None
+            if any(result and result['top_players'] for result in league_results):
+                player_index = await load_player_index(sleeper)
+
+    league_results = [result for result in league_results if result]
+
+    # Leave out leagues whose standings and scores match what was last posted
+    change_store = ChangeStore()
+    changed_results = []
+    for result in league_results:
+        if change_store.has_changed('results', result['league'].league_id, result['state']):
+            changed_results.append(result)
+        else:
+            logging.info(f"No changes for {result['league'].name} since the last post, skipping")
+    league_results = changed_results
+
+    # Each channel (or webhook) gets the results for the leagues posted there
+    async with Webhooks() as webhooks:
+        for destination, channel_results in group_by_channel(league_results, lambda result: result['league']).items():
+            # Get the webhook, or the channel by ID
+            channel = get_channel(client, webhooks, destination)
+
+            # Check if the channel exists and the bot has access to it
+            if channel is None:
+                logging.error(f"Channel with ID {destination} not found")
+                continue
+
+            embeds = build_results_embeds(channel_results, current_week, current_time, player_index)
+            outcomes = await deliver_embeds(channel, embeds, content="Hey cunts! It's fantasy league results time!")
+            if all(outcome.ok for outcome in outcomes):
+                for result in channel_results:
+                    change_store.record('results', result['league'].league_id, result['state'])
+
+    if player_index is not None:
+        player_index.close()
+    change_store.save()
+
+def main(week=None):
+    setup_logging()
+
+    # With a webhook for every league there's nothing to log in for
+    if not needs_gateway(load_leagues()):
+        asyncio.run(post_results(None, week=week))
+        return
 
-    # Add the provided thumbnail and icon URLs
-    embed.set_footer(text="Sleeper Bot", icon_url="https://play-lh.googleusercontent.com/L5sDy5zFKKLLMndpR7wJfD3aum4w0FVL_rRK6W1t9T5-d4BYc-4A7LTXa2nGeP62TCo")
-    embed.timestamp = current_time
+    import discord
 
-    # Get the channel by ID
-    channel = client.get_channel(CHANNEL_ID)
+    # Discord bot setup
+    intents = discord.Intents.default()
+    client = discord.Client(intents=intents)
 
-    # Check if the channel exists and the bot has access to it
-    if channel is None:
-        print(f"Error: Channel with ID {CHANNEL_ID} not found.")
-        await client.close()  # Close the bot if the channel isn't found
-        return
-    
-    await channel.send(content="Hey cunts! It's fantasy league results time!", embed=embed)
+    @client.event
+    async def on_ready():
+        logging.info(f'Logged in as {client.user}')
+        try:
+            await post_results(client, week=week)
+        finally:
+            await client.close()
 
-    await client.close()
+    # Start the bot
+    client.run(DISCORD_BOT_TOKEN, log_handler=None)
 
-# Start the bot
-client.run(DISCORD_BOT_TOKEN)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import os
+import json
+import asyncio
+import datetime
+import logging
+from typing import Callable, Awaitable, Dict, Set
+
+SCHEDULER_STATE = os.getenv('SCHEDULER_STATE', 'scheduler_state.json')
+
+# How late a missed run may still be caught up after the process was down
+DEFAULT_CATCH_UP = datetime.timedelta(hours=6)
+
+FIELD_RANGES = [
+    (0, 59),  # minute
+    (0, 23),  # hour
+    (1, 31),  # day of month
+    (1, 12),  # month
+    (0, 7),   # day of week, 0 and 7 = Sunday
+]
+
+
+def _parse_field(field: str, low: int, high: int) -> Set[int]:
+    values = set()
+    for part in field.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start_text, end_text = part.split('-', 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = end = int(part)
+            if step != 1:
+                end = high
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpression:
+    """Standard five-field cron expression: minute hour day-of-month month day-of-week"""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+
+        self.expression = expression
+        parsed = [_parse_field(f, low, high) for f, (low, high) in zip(fields, FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {d % 7 for d in weekdays}
+        # Cron semantics: if both day fields are restricted, either may match.
+        # Like cron, a field starting with '*' (including '*/2') counts as unrestricted.
+        self.days_restricted = not fields[2].startswith('*')
+        self.weekdays_restricted = not fields[4].startswith('*')
+
+    def __repr__(self):
+        return f"CronExpression({self.expression!r})"
+
+    def _day_matches(self, dt: datetime.datetime) -> bool:
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, dt: datetime.datetime) -> datetime.datetime:
+        """Return the first matching minute strictly after dt"""
+        dt = dt.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        # Skip whole months/days/hours that can't match instead of stepping minute by minute
+        for _ in range(366 * 24 * 60):
+            if dt.month not in self.months:
+                year, month = (dt.year + 1, 1) if dt.month == 12 else (dt.year, dt.month + 1)
+                dt = dt.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+                continue
+            if dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            if dt.minute not in self.minutes:
+                dt += datetime.timedelta(minutes=1)
+                continue
+            return dt
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+class Job:
+    def __init__(self, name: str, schedule: str, func: Callable[[], Awaitable[None]],
+                 catch_up: datetime.timedelta = DEFAULT_CATCH_UP):
+        self.name = name
+        self.cron = CronExpression(schedule)
+        self.func = func
+        self.catch_up = catch_up
+        self.running = False
+
+
+class Scheduler:
+    """Runs coroutine jobs on cron schedules inside the bot's event loop
+
+    Last-run times are persisted so runs missed while the process was down
+    are caught up once on start, if still within the job's catch-up window.
+    """
+
+    def __init__(self, state_path: str = SCHEDULER_STATE):
+        self.state_path = state_path
+        self.jobs: Dict[str, Job] = {}
+        self.last_runs: Dict[str, datetime.datetime] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._load_state()
+
+    def add_job(self, name: str, schedule: str, func: Callable[[], Awaitable[None]],
+                catch_up: datetime.timedelta = DEFAULT_CATCH_UP):
+        self.jobs[name] = Job(name, schedule, func, catch_up)
+        logging.info(f"Scheduled job {name} at '{schedule}' (UTC)")
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.error(f"Ignoring unreadable scheduler state {self.state_path}: {str(e)}")
+            return
+        self.last_runs = {
+            name: datetime.datetime.fromisoformat(value)
+            for name, value in state.get('last_runs', {}).items()
+        }
+
+    def _save_state(self):
+        state = {'last_runs': {name: dt.isoformat() for name, dt in self.last_runs.items()}}
+        try:
+            tmp_path = f'{self.state_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logging.error(f"Error writing scheduler state {self.state_path}: {str(e)}")
+
+    def _next_run(self, job: Job, now: datetime.datetime) -> datetime.datetime:
+        last_run = self.last_runs.get(job.name)
+        if last_run is not None:
+            missed = job.cron.next_after(last_run)
+            if missed <= now and now - missed <= job.catch_up:
+                # Missed while we were down; it's overdue so it runs straight away
+                return missed
+        return job.cron.next_after(now)
+
+    def _start(self, job: Job, scheduled_for: datetime.datetime):
+        if job.running:
+            logging.warning(f"Skipping {job.name}: previous run still in progress")
+            return
+
+        async def run():
+            job.running = True
+            started = datetime.datetime.now(datetime.timezone.utc)
+            logging.info(f"Running job {job.name} (scheduled for {scheduled_for.isoformat()})")
+            try:
+                await job.func()
+            except Exception as e:
+                logging.error(f"Job {job.name} failed: {str(e)}")
+            finally:
+                job.running = False
+                elapsed = (datetime.datetime.now(datetime.timezone.utc) - started).total_seconds()
+                logging.info(f"Job {job.name} finished in {elapsed:.2f}s")
+
+        # Record the slot as taken before running so a crash mid-job isn't retried forever
+        self.last_runs[job.name] = scheduled_for
+        self._save_state()
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def run_forever(self):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        next_runs = {name: self._next_run(job, now) for name, job in self.jobs.items()}
+
+        while next_runs:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            name, when = min(next_runs.items(), key=lambda item: item[1])
+            delay = (when - now).total_seconds()
+            if delay > 0:
+                # Wake up at most every minute so clock jumps don't strand a job
+                await asyncio.sleep(min(delay, 60))
+                continue
+
+            job = self.jobs[name]
+            self._start(job, when.replace(second=0, microsecond=0))
+            next_runs[name] = job.cron.next_after(max(when, now))
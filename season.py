@@ -0,0 +1,449 @@
+"""Local SQLite store of every week a league has played
+
+    python season.py backfill                 # fetch any weeks not stored yet
+    python season.py standings                # standings from stored weeks
+    python season.py history --league ID --roster 3
+
+Each week's matchups, rosters and brackets are ingested once with upserts
+keyed by league/week/roster, so re-running a job is a no-op. Standings,
+points for/against and streaks are updated incrementally as final weeks
+arrive instead of being rebuilt from Sleeper every run.
+"""
+import os
+import sys
+import json
+import sqlite3
+import asyncio
+import hashlib
+import argparse
+import logging
+from typing import Dict, Any, List, Optional
+
+from sleeper import SleeperAPI
+from leagues import load_leagues
+from ratelimit import PRIORITY_BACKFILL
+from nfl import resolve_week, week_is_final
+from logconfig import setup_logging
+
+# Sleeper's defaults when a league's settings don't say
+REGULAR_SEASON_WEEKS = 14
+DEFAULT_PLAYOFF_TEAMS = 6
+
+SEASON_DB = os.getenv('SEASON_DB', 'season.sqlite3')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS leagues (
+    league_id TEXT PRIMARY KEY,
+    name TEXT,
+    season TEXT,
+    playoff_week_start INTEGER
+);
+CREATE TABLE IF NOT EXISTS users (
+    league_id TEXT,
+    user_id TEXT,
+    display_name TEXT,
+    team_name TEXT,
+    PRIMARY KEY (league_id, user_id)
+);
+CREATE TABLE IF NOT EXISTS rosters (
+    league_id TEXT,
+    roster_id INTEGER,
+    owner_id TEXT,
+    division INTEGER,
+    team_name TEXT,
+    PRIMARY KEY (league_id, roster_id)
+);
+CREATE TABLE IF NOT EXISTS matchups (
+    league_id TEXT,
+    week INTEGER,
+    roster_id INTEGER,
+    matchup_id INTEGER,
+    points REAL,
+    PRIMARY KEY (league_id, week, roster_id)
+);
+CREATE TABLE IF NOT EXISTS brackets (
+    league_id TEXT,
+    bracket TEXT,
+    match_id INTEGER,
+    round INTEGER,
+    t1 INTEGER,
+    t2 INTEGER,
+    winner INTEGER,
+    loser INTEGER,
+    PRIMARY KEY (league_id, bracket, match_id)
+);
+-- One row per team per final week: the result and points for/against
+CREATE TABLE IF NOT EXISTS team_weeks (
+    league_id TEXT,
+    week INTEGER,
+    roster_id INTEGER,
+    result TEXT,
+    points_for REAL,
+    points_against REAL,
+    PRIMARY KEY (league_id, week, roster_id)
+);
+-- Running totals over team_weeks, updated as each final week arrives
+CREATE TABLE IF NOT EXISTS standings (
+    league_id TEXT,
+    roster_id INTEGER,
+    wins INTEGER DEFAULT 0,
+    losses INTEGER DEFAULT 0,
+    ties INTEGER DEFAULT 0,
+    points_for REAL DEFAULT 0,
+    points_against REAL DEFAULT 0,
+    streak_type TEXT,
+    streak_length INTEGER DEFAULT 0,
+    last_week INTEGER DEFAULT 0,
+    PRIMARY KEY (league_id, roster_id)
+);
+-- Content hash of each ingested week so unchanged re-ingests are skipped
+CREATE TABLE IF NOT EXISTS ingested (
+    league_id TEXT,
+    week INTEGER,
+    final INTEGER,
+    data_hash TEXT,
+    PRIMARY KEY (league_id, week)
+);
+'''
+
+def data_hash(data: Any) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+def week_results(matchups: List[Dict[str, Any]]) -> Dict[int, tuple]:
+    """roster_id -> (result, points_for, points_against) for every complete matchup"""
+    pairs = {}
+    for matchup in matchups:
+        if matchup.get('matchup_id') and matchup.get('roster_id'):
+            pairs.setdefault(matchup['matchup_id'], []).append(matchup)
+
+    results = {}
+    for pair in pairs.values():
+        if len(pair) != 2:
+            continue
+        for team, opponent in ((pair[0], pair[1]), (pair[1], pair[0])):
+            points = round(float(team.get('points') or 0), 2)
+            against = round(float(opponent.get('points') or 0), 2)
+            result = 'W' if points > against else 'L' if points < against else 'T'
+            results[team['roster_id']] = (result, points, against)
+    return results
+
+
+class SeasonStore:
+    """SQLite-backed history of matchups, rosters, brackets and standings"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or SEASON_DB
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def ingest_league(self, league_id: str, info: Optional[Dict[str, Any]]):
+        if not info:
+            return
+        with self.db:
+            self.db.execute(
+                'INSERT INTO leagues VALUES (?, ?, ?, ?) ON CONFLICT(league_id) DO UPDATE SET '
+                'name=excluded.name, season=excluded.season, playoff_week_start=excluded.playoff_week_start',
+                (league_id, info.get('name'), info.get('season'), (info.get('settings') or {}).get('playoff_week_start'))
+            )
+
+    def ingest_teams(self, league_id: str, rosters: Optional[List[Dict[str, Any]]], users: Optional[List[Dict[str, Any]]]):
+        with self.db:
+            for user in users or []:
+                self.db.execute(
+                    'INSERT INTO users VALUES (?, ?, ?, ?) ON CONFLICT(league_id, user_id) DO UPDATE SET '
+                    'display_name=excluded.display_name, team_name=excluded.team_name',
+                    (league_id, user['user_id'], user.get('display_name'), (user.get('metadata') or {}).get('team_name'))
+                )
+            for roster in rosters or []:
+                self.db.execute(
+                    'INSERT INTO rosters VALUES (?, ?, ?, ?, ?) ON CONFLICT(league_id, roster_id) DO UPDATE SET '
+                    'owner_id=excluded.owner_id, division=excluded.division, team_name=excluded.team_name',
+                    (league_id, roster['roster_id'], roster.get('owner_id'), (roster.get('settings') or {}).get('division'),
+                     (roster.get('metadata') or {}).get('team_name'))
+                )
+
+    def ingest_brackets(self, league_id: str, winners: Optional[List[Dict[str, Any]]], losers: Optional[List[Dict[str, Any]]]):
+        with self.db:
+            for bracket, matches in (('winners', winners), ('losers', losers)):
+                for match in matches or []:
+                    self.db.execute(
+                        'INSERT INTO brackets VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(league_id, bracket, match_id) DO UPDATE SET '
+                        'round=excluded.round, t1=excluded.t1, t2=excluded.t2, winner=excluded.winner, loser=excluded.loser',
+                        (league_id, bracket, match.get('m'), match.get('r'), match.get('t1'), match.get('t2'),
+                         match.get('w'), match.get('l'))
+                    )
+
+    def ingest_week(self, league_id: str, week: int, matchups: Optional[List[Dict[str, Any]]], *, final: bool) -> bool:
+        """Store one week's matchups; final weeks also update standings
+
+        final should only be set once the week has rolled over (nfl.week_is_final);
+        a week stored before then is re-fetched by finalize_weeks.
+
+        Returns False when the week was already ingested with the same data.
+        """
+        if matchups is None:
+            return False
+
+        digest = data_hash([matchups, final])
+        row = self.db.execute('SELECT data_hash FROM ingested WHERE league_id=? AND week=?', (league_id, week)).fetchone()
+        if row and row['data_hash'] == digest:
+            return False
+
+        with self.db:
+            for matchup in matchups:
+                if not matchup.get('roster_id'):
+                    continue
+                self.db.execute(
+                    'INSERT INTO matchups VALUES (?, ?, ?, ?, ?) ON CONFLICT(league_id, week, roster_id) DO UPDATE SET '
+                    'matchup_id=excluded.matchup_id, points=excluded.points',
+                    (league_id, week, matchup['roster_id'], matchup.get('matchup_id'), float(matchup.get('points') or 0))
+                )
+            self.db.execute(
+                'INSERT INTO ingested VALUES (?, ?, ?, ?) ON CONFLICT(league_id, week) DO UPDATE SET '
+                'final=excluded.final, data_hash=excluded.data_hash',
+                (league_id, week, int(final), digest)
+            )
+
+            if final:
+                self._record_results(league_id, week, week_results(matchups))
+        return True
+
+    def _last_regular_week(self, league_id: str) -> int:
+        """Weeks after this are playoffs and don't count toward standings"""
+        row = self.db.execute('SELECT playoff_week_start FROM leagues WHERE league_id=?', (league_id,)).fetchone()
+        return (row['playoff_week_start'] - 1) if row and row['playoff_week_start'] else 10 ** 6
+
+    def _record_results(self, league_id: str, week: int, results: Dict[int, tuple]):
+        replaced = self.db.execute('SELECT 1 FROM team_weeks WHERE league_id=? AND week=? LIMIT 1', (league_id, week)).fetchone()
+        self.db.execute('DELETE FROM team_weeks WHERE league_id=? AND week=?', (league_id, week))
+        self.db.executemany(
+            'INSERT INTO team_weeks VALUES (?, ?, ?, ?, ?, ?)',
+            [(league_id, week, roster_id, result, points, against) for roster_id, (result, points, against) in results.items()]
+        )
+
+        if week > self._last_regular_week(league_id):
+            return
+
+        latest = self.db.execute('SELECT MAX(last_week) AS week FROM standings WHERE league_id=?', (league_id,)).fetchone()['week'] or 0
+        if replaced or week <= latest:
+            # A corrected or out-of-order week; recompute this league from its stored weeks
+            self._rebuild_standings(league_id)
+            return
+
+        # The common case: the next week in order, applied as a delta
+        for roster_id, (result, points, against) in results.items():
+            self.db.execute(
+                'INSERT INTO standings (league_id, roster_id) VALUES (?, ?) ON CONFLICT DO NOTHING',
+                (league_id, roster_id)
+            )
+            self.db.execute(
+                'UPDATE standings SET wins=wins+?, losses=losses+?, ties=ties+?, '
+                'points_for=points_for+?, points_against=points_against+?, '
+                'streak_length=CASE WHEN streak_type=? THEN streak_length+1 ELSE 1 END, '
+                'streak_type=?, last_week=? WHERE league_id=? AND roster_id=?',
+                (int(result == 'W'), int(result == 'L'), int(result == 'T'), points, against,
+                 result, result, week, league_id, roster_id)
+            )
+
+    def _rebuild_standings(self, league_id: str):
+        last_regular_week = self._last_regular_week(league_id)
+
+        self.db.execute('DELETE FROM standings WHERE league_id=?', (league_id,))
+        streaks = {}
+        for team_week in self.db.execute(
+            'SELECT roster_id, result FROM team_weeks WHERE league_id=? AND week<=? ORDER BY week',
+            (league_id, last_regular_week)
+        ):
+            streak_type, length = streaks.get(team_week['roster_id'], (None, 0))
+            streaks[team_week['roster_id']] = (team_week['result'], length + 1 if team_week['result'] == streak_type else 1)
+
+        for total in self.db.execute(
+            "SELECT roster_id, SUM(result='W') AS wins, SUM(result='L') AS losses, SUM(result='T') AS ties, "
+            'SUM(points_for) AS points_for, SUM(points_against) AS points_against, MAX(week) AS last_week '
+            'FROM team_weeks WHERE league_id=? AND week<=? GROUP BY roster_id',
+            (league_id, last_regular_week)
+        ).fetchall():
+            streak_type, length = streaks[total['roster_id']]
+            self.db.execute(
+                'INSERT INTO standings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (league_id, total['roster_id'], total['wins'], total['losses'], total['ties'],
+                 total['points_for'], total['points_against'], streak_type, length, total['last_week'])
+            )
+
+    def stored_weeks(self, league_id: str, final_only: bool = True) -> List[int]:
+        query = 'SELECT week FROM ingested WHERE league_id=?' + (' AND final=1' if final_only else '') + ' ORDER BY week'
+        return [row['week'] for row in self.db.execute(query, (league_id,))]
+
+    def standings(self, league_id: str, nicknames: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """Standings in the same shape and order as results.get_league_standings"""
+        nicknames = nicknames or {}
+        rows = self.db.execute(
+            'SELECT s.*, r.owner_id, r.division, u.display_name, u.team_name AS user_team_name '
+            'FROM standings s LEFT JOIN rosters r ON r.league_id=s.league_id AND r.roster_id=s.roster_id '
+            'LEFT JOIN users u ON u.league_id=s.league_id AND u.user_id=r.owner_id '
+            'WHERE s.league_id=?',
+            (league_id,)
+        ).fetchall()
+
+        standings = []
+        for row in rows:
+            username = row['display_name'] or 'Unknown User'
+            standings.append({
+                'roster_id': row['roster_id'],
+                'team_name': row['user_team_name'] or username,
+                'nickname': nicknames.get(username, username),
+                'wins': row['wins'],
+                'losses': row['losses'],
+                'ties': row['ties'],
+                'points_for': round(row['points_for'], 2),
+                'points_against': round(row['points_against'], 2),
+                'streak': f"{row['streak_type']}{row['streak_length']}" if row['streak_type'] else '',
+                'owner_id': row['owner_id'],
+                'division': row['division']
+            })
+
+        standings.sort(key=lambda x: (-x['wins'], -x['points_for'], x['points_against']))
+        return standings
+
+    def season_matchups(self, league_id: str) -> List[List[Dict[str, Any]]]:
+        """Every final regular-season week's matchups, oldest first, for head-to-head tiebreaks"""
+        last_regular_week = self._last_regular_week(league_id)
+
+        weeks = {}
+        for matchup in self.db.execute(
+            'SELECT m.week, m.roster_id, m.matchup_id, m.points FROM matchups m '
+            'JOIN ingested i ON i.league_id=m.league_id AND i.week=m.week AND i.final=1 '
+            'WHERE m.league_id=? AND m.week<=? ORDER BY m.week',
+            (league_id, last_regular_week)
+        ):
+            weeks.setdefault(matchup['week'], []).append(dict(matchup))
+        return list(weeks.values())
+
+    def score_samples(self, league_id: str) -> Dict[int, List[float]]:
+        """roster_id -> every final regular-season score, for fitting score distributions"""
+        samples = {}
+        for row in self.db.execute(
+            'SELECT roster_id, points_for FROM team_weeks WHERE league_id=? AND week<=? ORDER BY week',
+            (league_id, self._last_regular_week(league_id))
+        ):
+            samples.setdefault(row['roster_id'], []).append(row['points_for'])
+        return samples
+
+    def history(self, league_id: str, roster_id: int) -> List[Dict[str, Any]]:
+        """Every stored final week for one team, oldest first"""
+        return [dict(row) for row in self.db.execute(
+            'SELECT week, result, points_for, points_against FROM team_weeks '
+            'WHERE league_id=? AND roster_id=? ORDER BY week',
+            (league_id, roster_id)
+        )]
+
+async def remaining_season(sleeper, league, week: int) -> Optional[Dict[str, Any]]:
+    """Playoff size and the matchups of every regular-season week after `week`
+
+    Returns None once the playoffs have started.
+    """
+    info = await sleeper.get_league(league.league_id)
+    settings = (info or {}).get('settings') or {}
+    playoff_week_start = settings.get('playoff_week_start') or REGULAR_SEASON_WEEKS + 1
+    if week >= playoff_week_start:
+        return None
+
+    weeks = await asyncio.gather(*(
+        sleeper.get_matchups(league.league_id, w) for w in range(week + 1, playoff_week_start)
+    ))
+    return {'playoff_teams': settings.get('playoff_teams') or DEFAULT_PLAYOFF_TEAMS, 'weeks': list(weeks)}
+
+async def finalize_weeks(store: SeasonStore, sleeper, league, season) -> List[int]:
+    """Re-fetch weeks stored before they rolled over and store them as final once they have"""
+    final = set(store.stored_weeks(league.league_id))
+    pending = [week for week in store.stored_weeks(league.league_id, final_only=False)
+               if week not in final and week_is_final(season, week)]
+    if not pending:
+        return []
+
+    weeks = await asyncio.gather(*(
+        sleeper.get_matchups(league.league_id, week, PRIORITY_BACKFILL) for week in pending
+    ))
+    for week, matchups in zip(pending, weeks):
+        store.ingest_week(league.league_id, week, matchups, final=True)
+    return pending
+
+async def backfill(store: SeasonStore, sleeper, league, through_week: int) -> List[int]:
+    """Fetch and ingest the weeks up to through_week that aren't stored as final yet
+
+    through_week comes from the command line, so weeks that haven't rolled
+    over are stored as not final and finalized by a later run.
+    """
+    stored = set(store.stored_weeks(league.league_id))
+    missing = [week for week in range(1, through_week + 1) if week not in stored]
+    if not missing:
+        return []
+
+    info, rosters, users = await asyncio.gather(
+        sleeper.get_league(league.league_id),
+        sleeper.get_rosters(league.league_id),
+        sleeper.get_users(league.league_id)
+    )
+    store.ingest_league(league.league_id, info)
+    store.ingest_teams(league.league_id, rosters, users)
+
+    weeks = await asyncio.gather(*(
+        sleeper.get_matchups(league.league_id, week, PRIORITY_BACKFILL) for week in missing
+    ))
+    season = (info or {}).get('season')
+    for week, matchups in zip(missing, weeks):
+        store.ingest_week(league.league_id, week, matchups, final=week_is_final(season, week))
+    return missing
+
+async def backfill_all(leagues, through_week: int):
+    with SeasonStore() as store:
+        async with SleeperAPI() as sleeper:
+            for league in leagues:
+                fetched = await backfill(store, sleeper, league, through_week)
+                print(f"{league.name}: ingested weeks {fetched or 'none (up to date)'}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    backfill_parser = sub.add_parser('backfill', help='Fetch and store any final weeks not stored yet')
+    backfill_parser.add_argument('--through-week', type=int, help='Last final week (default: the week before the current one)')
+
+    sub.add_parser('standings', help='Print standings computed from stored weeks')
+
+    history_parser = sub.add_parser('history', help="Print one team's week-by-week results")
+    history_parser.add_argument('--league', required=True)
+    history_parser.add_argument('--roster', type=int, required=True)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    setup_logging(logging.WARNING, log_file=None)
+    args = parse_args(argv)
+
+    if args.command == 'backfill':
+        through_week = args.through_week or (asyncio.run(resolve_week()) or 1) - 1
+        asyncio.run(backfill_all(load_leagues(), through_week))
+    elif args.command == 'standings':
+        with SeasonStore() as store:
+            for league in load_leagues():
+                print(f"\n{league.name}")
+                for idx, team in enumerate(store.standings(league.league_id, league.nicknames), start=1):
+                    print(f"{idx:>3} {team['nickname']:<20} {team['wins']}-{team['losses']}-{team['ties']} "
+                          f"PF {team['points_for']:.2f} PA {team['points_against']:.2f} {team['streak']}")
+    else:
+        with SeasonStore() as store:
+            for week in store.history(args.league, args.roster):
+                print(f"Week {week['week']:>2}: {week['result']} {week['points_for']:.2f} - {week['points_against']:.2f}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+import metrics
+from cache import ResponseCache, endpoint_name, league_id_from_url
+from cassette import Cassette
+from ratelimit import TokenBucket, sleeper_limiter, PRIORITY_NORMAL
+from resilience import CircuitBreakers, sleeper_breakers, backoff_delay, is_retryable_status, MAX_ATTEMPTS
+
+if TYPE_CHECKING:
+    import aiohttp
+
+BASE_URL = os.getenv('SLEEPER_BASE_URL', 'https://api.sleeper.app/v1')
+
+# Keep a small pool of keep-alive connections to the Sleeper API so every
+# request in a run reuses the same TCP/TLS connections
+CONNECTION_LIMIT = 10
+KEEPALIVE_TIMEOUT = 60
+REQUEST_TIMEOUT = 15
+# /players/nfl is several megabytes, so give it longer than other requests
+STREAM_TIMEOUT = 120
+
+# One line per request adds up; logconfig samples this logger's routine records
+fetch_log = logging.getLogger('sleeper.fetch')
+
+
+class SleeperAPI:
+    """Async Sleeper client sharing one pooled aiohttp session"""
+
+    def __init__(self, session: Optional['aiohttp.ClientSession'] = None,
+                 cache: Optional[ResponseCache] = None,
+                 limiter: Optional[TokenBucket] = None,
+                 breakers: Optional[CircuitBreakers] = None,
+                 recorder: Optional[Cassette] = None):
+        self.session = session
+        self._owns_session = session is None
+        self.cache = cache if cache is not None else ResponseCache()
+        # Every request in the process shares one limiter unless told otherwise
+        self.limiter = limiter if limiter is not None else sleeper_limiter
+        self.breakers = breakers if breakers is not None else sleeper_breakers
+        # Records every response received when SLEEPER_RECORD is set
+        self.recorder = recorder if recorder is not None else Cassette.from_env()
+
+    async def __aenter__(self):
+        if self.session is None:
+            # aiohttp is slow to import; tools that never fetch don't pay for it
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                keepalive_timeout=KEEPALIVE_TIMEOUT
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+            )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        self.cache.flush()
+        if self.recorder is not None:
+            self.recorder.save()
+        if self.limiter.queued:
+            self.limiter.log_metrics('Sleeper rate limiter')
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def fetch_data(self, url: str, priority: int = PRIORITY_NORMAL) -> Optional[Any]:
+        """Fetch data from Sleeper API asynchronously, served from cache while fresh
+
+        Timeouts, 429s and 5xx responses are retried with jittered backoff. If
+        they persist, or the endpoint's circuit is open, the last cached copy
+        is returned (or None if we never had one).
+        """
+        import aiohttp
+
+        labels = {'endpoint': endpoint_name(url), 'league': league_id_from_url(url)}
+        start = time.perf_counter()
+
+        def record(outcome: str):
+            metrics.inc('sleeper_requests_total', outcome=outcome, **labels)
+            metrics.observe('stage_seconds', time.perf_counter() - start, stage='fetch', **labels)
+
+        entry = self.cache.get(url)
+        if entry and self.cache.is_fresh(entry):
+            # A cassette has to replay every URL the run used, cached or not
+            if self.recorder is not None:
+                self.recorder.record(url, 200, entry['data'])
+            record('cache_hit')
+            return entry['data']
+
+        stale = entry['data'] if entry else None
+        breaker = self.breakers.get(endpoint_name(url))
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            if not breaker.allow_request():
+                logging.warning(f"Circuit open for {breaker.name}, not fetching {url}")
+                record('circuit_open')
+                return stale
+
+            # Only requests that actually reach Sleeper count against the rate limit
+            await self.limiter.acquire(priority)
+
+            retry_after = None
+            try:
+                fetch_log.info(f"Fetching data from: {url}")
+                headers = self.cache.revalidation_headers(entry)
+                async with self.session.get(url, headers=headers) as response:
+                    if response.status == 304 and entry:
+                        breaker.record_success()
+                        self.cache.touch(url)
+                        if self.recorder is not None:
+                            self.recorder.record(url, 200, entry['data'])
+                        record('revalidated')
+                        return entry['data']
+                    elif response.status == 200:
+                        body = await response.read()
+                        data = json.loads(body)
+                        breaker.record_success()
+                        if self.recorder is not None:
+                            self.recorder.record(url, response.status, data)
+                        self.cache.put(
+                            url,
+                            data,
+                            etag=response.headers.get('ETag'),
+                            last_modified=response.headers.get('Last-Modified')
+                        )
+                        metrics.inc('sleeper_bytes_total', len(body), **labels)
+                        record('fetched')
+                        return data
+                    elif not is_retryable_status(response.status):
+                        # Sleeper answered; the request itself is bad, so retrying won't help
+                        breaker.record_success()
+                        logging.error(f"Error fetching {url}: Status {response.status}")
+                        record('error')
+                        return None
+
+                    logging.warning(f"Error fetching {url}: Status {response.status} (attempt {attempt}/{MAX_ATTEMPTS})")
+                    try:
+                        retry_after = float(response.headers.get('Retry-After', ''))
+                    except ValueError:
+                        retry_after = None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.warning(f"Error fetching {url}: {str(e) or type(e).__name__} (attempt {attempt}/{MAX_ATTEMPTS})")
+            except Exception as e:
+                breaker.record_failure()
+                logging.error(f"Error fetching {url}: {str(e)}")
+                record('stale' if stale is not None else 'error')
+                return stale
+
+            breaker.record_failure()
+            if attempt < MAX_ATTEMPTS:
+                metrics.inc('sleeper_retries_total', **labels)
+                await asyncio.sleep(retry_after if retry_after is not None else backoff_delay(attempt))
+
+        logging.error(f"Giving up on {url} after {MAX_ATTEMPTS} attempts")
+        if stale is not None:
+            logging.warning(f"Serving stale cached copy of {url}")
+        record('stale' if stale is not None else 'error')
+        return stale
+
+    async def stream(self, url: str, endpoint: Optional[str] = None, chunk_size: int = 64 * 1024,
+                     priority: int = PRIORITY_NORMAL):
+        """Yield a response body in chunks, bypassing the cache
+
+        For dumps like /players/nfl that are too big to cache or parse in one
+        go. Raises on any failure; there's no stale copy to fall back to.
+        """
+        import aiohttp
+
+        labels = {'endpoint': endpoint or endpoint_name(url)}
+        breaker = self.breakers.get(labels['endpoint'])
+        if not breaker.allow_request():
+            raise RuntimeError(f"Circuit open for {breaker.name}, not fetching {url}")
+
+        await self.limiter.acquire(priority)
+        start = time.perf_counter()
+        received = 0
+        fetch_log.info(f"Streaming data from: {url}")
+        try:
+            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=STREAM_TIMEOUT)) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"Error fetching {url}: Status {response.status}")
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    received += len(chunk)
+                    yield chunk
+        except Exception:
+            breaker.record_failure()
+            metrics.inc('sleeper_requests_total', outcome='error', **labels)
+            raise
+
+        breaker.record_success()
+        metrics.inc('sleeper_requests_total', outcome='fetched', **labels)
+        metrics.inc('sleeper_bytes_total', received, **labels)
+        metrics.observe('stage_seconds', time.perf_counter() - start, stage='fetch', **labels)
+
+    async def get_nfl_state(self) -> Optional[Dict[str, Any]]:
+        """Current season, week and season type; cached until the week rolls over"""
+        return await self.fetch_data(f'{BASE_URL}/state/nfl')
+
+    def stream_players(self):
+        """Sleeper's full NFL player dump as raw chunks; fetch it at most daily"""
+        return self.stream(f'{BASE_URL}/players/nfl', endpoint='players')
+
+    async def get_league(self, league_id: str) -> Optional[Dict[str, Any]]:
+        return await self.fetch_data(f'{BASE_URL}/league/{league_id}')
+
+    async def get_rosters(self, league_id: str) -> Optional[List[Dict[str, Any]]]:
+        return await self.fetch_data(f'{BASE_URL}/league/{league_id}/rosters')
+
+    async def get_users(self, league_id: str) -> Optional[List[Dict[str, Any]]]:
+        return await self.fetch_data(f'{BASE_URL}/league/{league_id}/users')
+
+    async def get_matchups(self, league_id: str, week: int,
+                           priority: int = PRIORITY_NORMAL) -> Optional[List[Dict[str, Any]]]:
+        return await self.fetch_data(f'{BASE_URL}/league/{league_id}/matchups/{week}', priority)
+
+    async def get_bracket(self, league_id: str, bracket_type: str) -> Optional[List[Dict[str, Any]]]:
+        """bracket_type is either 'winners' or 'losers'"""
+        return await self.fetch_data(f'{BASE_URL}/league/{league_id}/{bracket_type}_bracket')
+
+    async def get_league_data(self, league_id: str, week: int,
+                              priority: int = PRIORITY_NORMAL) -> Dict[str, Any]:
+        """Fetch all league data concurrently including weekly matchups
+
+        Returns a partial result: any endpoint that failed maps to None (an
+        empty list is a valid answer, e.g. no matchups yet) so callers can
+        render whatever data they have.
+        """
+        fetch_log.info(f"Fetching data for league {league_id}")
+
+        tasks = {
+            'rosters': self.get_rosters(league_id),
+            'users': self.get_users(league_id),
+            'winners_bracket': self.get_bracket(league_id, 'winners'),
+            'losers_bracket': self.get_bracket(league_id, 'losers'),
+            'matchups': self.get_matchups(league_id, week, priority)
+        }
+
+        values = await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        results = {}
+        for name, value in zip(tasks, values):
+            if isinstance(value, Exception):
+                logging.error(f"Error fetching {name}: {str(value)}")
+                value = None
+            results[name] = value
+
+        missing = missing_endpoints(results)
+        if missing:
+            logging.warning(f"League {league_id} is missing {', '.join(missing)}")
+        return results
+
+
+def missing_endpoints(league_data: Optional[Dict[str, Any]]) -> List[str]:
+    """Names of the endpoints that failed in a get_league_data() result"""
+    if league_data is None:
+        return ['league']
+    return [name for name, value in league_data.items() if value is None]
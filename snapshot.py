@@ -0,0 +1,71 @@
+from typing import Dict, Any, List, Optional
+
+
+class LeagueSnapshot:
+    """One league's rosters, users and matchups, indexed once per run
+
+    Every lookup the formatters need (roster, owner, resolved names, a
+    team's matchup and each matchup pair) is a dict access, so rendering
+    a league is linear in the number of teams.
+    """
+
+    def __init__(self, rosters: Optional[List[Dict[str, Any]]], users: Optional[List[Dict[str, Any]]],
+                 nicknames: Dict[str, str], matchups: Optional[List[Dict[str, Any]]] = None):
+        self.rosters = rosters or []
+        self.users = users or []
+        self.matchups = matchups or []
+        self.nicknames = nicknames
+
+        self.rosters_by_id = {r['roster_id']: r for r in self.rosters}
+        self.users_by_id = {u['user_id']: u for u in self.users}
+
+        # roster_id -> resolved names for the team's owner
+        self.names = {}
+        for roster in self.rosters:
+            user = self.users_by_id.get(roster.get('owner_id'), {})
+            username = user.get('display_name', 'Unknown User')
+            nickname = nicknames.get(username, username)
+            self.names[roster['roster_id']] = {
+                'username': username,
+                'nickname': nickname,
+                # Team name set on the user profile, falling back to the username
+                'team_name': (user.get('metadata') or {}).get('team_name', username),
+                # Team name set on the roster, falling back to the nickname
+                'roster_team_name': (roster.get('metadata') or {}).get('team_name', nickname).strip()
+            }
+
+        # roster_id -> that team's matchup entry, matchup_id -> both entries
+        self.matchups_by_roster = {}
+        self.matchups_by_id = {}
+        for matchup in self.matchups:
+            roster_id = matchup.get('roster_id')
+            if roster_id:
+                self.matchups_by_roster[roster_id] = matchup
+            matchup_id = matchup.get('matchup_id')
+            if matchup_id:
+                self.matchups_by_id.setdefault(matchup_id, []).append(matchup)
+
+    def owner(self, roster_id) -> Optional[Dict[str, Any]]:
+        """Return the user who owns a roster, or None"""
+        roster = self.rosters_by_id.get(roster_id)
+        if roster is None:
+            return None
+        return self.users_by_id.get(roster.get('owner_id'))
+
+    def display_name(self, user_id, default: str = 'Unknown User') -> str:
+        return self.users_by_id.get(user_id, {}).get('display_name', default)
+
+    def team_names(self, roster_id) -> Dict[str, str]:
+        """Resolved username/nickname/team names for a roster"""
+        return self.names.get(roster_id, {
+            'username': 'Unknown User',
+            'nickname': 'Unknown User',
+            'team_name': 'Unknown User',
+            'roster_team_name': 'Unknown User'
+        })
+
+    def matchup_pairs(self):
+        """Yield (matchup_id, [team1, team2]) for every complete matchup"""
+        for matchup_id, pair in self.matchups_by_id.items():
+            if len(pair) == 2:
+                yield matchup_id, pair
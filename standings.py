@@ -0,0 +1,108 @@
+import numpy as np
+from typing import Dict, Any, List, Optional, Sequence
+
+# Ranking keys in priority order; every key ranks higher-is-better except these
+DEFAULT_TIEBREAKERS = ('wins', 'points_for', 'points_against')
+LOWER_IS_BETTER = {'losses', 'points_against'}
+TIEBREAKERS = ('wins', 'losses', 'ties', 'points_for', 'points_against', 'head_to_head')
+
+
+class StandingsTable:
+    """Columnar standings for one or many leagues, built from Sleeper rosters
+
+    Every team is one row across NumPy columns, with `league` holding the
+    index of the league it came from, so a whole batch of leagues (or
+    seasons) is ranked with a single lexsort.
+    """
+
+    def __init__(self, rosters_by_league: Sequence[Optional[List[Dict[str, Any]]]]):
+        rosters_by_league = [rosters or [] for rosters in rosters_by_league]
+        counts = [len(rosters) for rosters in rosters_by_league]
+        self.rows = [roster for rosters in rosters_by_league for roster in rosters]
+        self.size = len(self.rows)
+        self.offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self.league = np.repeat(np.arange(len(counts)), counts)
+
+        settings = [roster.get('settings') or {} for roster in self.rows]
+
+        def column(key):
+            return np.fromiter((s.get(key) or 0 for s in settings), dtype=np.int64, count=self.size)
+
+        self.roster_id = np.fromiter((roster['roster_id'] for roster in self.rows), dtype=np.int64, count=self.size)
+        self.wins = column('wins')
+        self.losses = column('losses')
+        self.ties = column('ties')
+        self.division = column('division')
+
+        # Sleeper splits points into whole and hundredths fields
+        self.points_for = np.round(column('fpts') + column('fpts_decimal') / 100, 2)
+        self.points_against = np.round(column('fpts_against') + column('fpts_against_decimal') / 100, 2)
+        self.head_to_head = np.zeros(self.size, dtype=np.int64)
+
+    def add_head_to_head(self, history_by_league: Sequence[Optional[List[List[Dict[str, Any]]]]]):
+        """Count each team's wins against teams with the same number of wins
+
+        history_by_league holds, for every league in the table, its list of
+        weekly matchup lists.
+        """
+        self.head_to_head[:] = 0
+        for league_index, weeks in enumerate(history_by_league):
+            start = self.offsets[league_index]
+            rows = {int(roster_id): start + i for i, roster_id in
+                    enumerate(self.roster_id[start:self.offsets[league_index + 1]])}
+
+            for matchups in weeks or []:
+                pairs = {}
+                for matchup in matchups:
+                    if matchup.get('matchup_id') and matchup.get('roster_id') in rows:
+                        pairs.setdefault(matchup['matchup_id'], []).append(matchup)
+
+                for pair in pairs.values():
+                    if len(pair) != 2:
+                        continue
+                    a, b = rows[pair[0]['roster_id']], rows[pair[1]['roster_id']]
+                    if self.wins[a] != self.wins[b]:
+                        continue
+                    points_a, points_b = pair[0].get('points') or 0, pair[1].get('points') or 0
+                    if points_a > points_b:
+                        self.head_to_head[a] += 1
+                    elif points_b > points_a:
+                        self.head_to_head[b] += 1
+
+    def rank(self, tiebreakers: Sequence[str] = DEFAULT_TIEBREAKERS, by_division: bool = False) -> np.ndarray:
+        """Row indices ordered by league (and division), then by each tiebreaker
+
+        The sort is stable, so teams tied on every key keep roster order.
+        """
+        keys = [self.league]
+        if by_division:
+            keys.append(self.division)
+        for name in tiebreakers:
+            if name not in TIEBREAKERS:
+                raise ValueError(f"Unknown tiebreaker {name!r}, expected one of {', '.join(TIEBREAKERS)}")
+            values = getattr(self, name)
+            keys.append(values if name in LOWER_IS_BETTER else -values)
+
+        # lexsort treats its last key as the primary one
+        return np.lexsort(keys[::-1])
+
+    def split_leagues(self, order: np.ndarray) -> List[np.ndarray]:
+        """Split an order from rank() into one array of rows per league"""
+        return np.split(order, self.offsets[1:-1])
+
+    def split_divisions(self, order: np.ndarray) -> Dict[tuple, np.ndarray]:
+        """Split an order from rank(by_division=True) into (league, division) groups"""
+        league, division = self.league[order], self.division[order]
+        boundaries = np.flatnonzero((np.diff(league) != 0) | (np.diff(division) != 0)) + 1
+        return {
+            (int(league[group[0]]), int(division[group[0]])): order[group]
+            for group in np.split(np.arange(len(order)), boundaries) if len(group)
+        }
+
+def rank_leagues(rosters_by_league, tiebreakers: Sequence[str] = DEFAULT_TIEBREAKERS,
+                 history_by_league=None) -> List[List[Dict[str, Any]]]:
+    """Rank many leagues at once and return each league's rosters in standings order"""
+    table = StandingsTable(rosters_by_league)
+    if 'head_to_head' in tiebreakers:
+        table.add_head_to_head(history_by_league or [None] * (len(table.offsets) - 1))
+    return [[table.rows[row] for row in rows] for rows in table.split_leagues(table.rank(tiebreakers))]
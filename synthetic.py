@@ -0,0 +1,175 @@
+import random
+from typing import Dict, Any, List
+
+# Synthetic Sleeper payloads shaped like the real API responses, for
+# benchmarks and offline load tests
+
+REGULAR_SEASON_WEEKS = 14
+
+def make_users(num_teams: int, league_index: int = 0) -> List[Dict[str, Any]]:
+    return [
+        {
+            'user_id': f'{league_index}{i:05d}',
+            'display_name': f'user{league_index}_{i}',
+            'metadata': {'team_name': f'Team {league_index}-{i}'} if i % 3 else {}
+        }
+        for i in range(1, num_teams + 1)
+    ]
+
+def make_nicknames(users: List[Dict[str, Any]]) -> Dict[str, str]:
+    # Roughly half the owners have a nickname configured
+    return {u['display_name']: f"Nick{u['user_id'][-4:]}" for u in users[::2]}
+
+def make_players(seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """A /players/nfl dump covering every player ID make_matchups starts, plus team defenses"""
+    rng = random.Random(seed)
+    teams = ['ARI', 'ATL', 'BAL', 'BUF', 'CAR', 'CHI', 'CIN', 'CLE', 'DAL', 'DEN', 'DET', 'GB', 'HOU', 'IND', 'JAX', 'KC',
+             'LAC', 'LAR', 'LV', 'MIA', 'MIN', 'NE', 'NO', 'NYG', 'NYJ', 'PHI', 'PIT', 'SEA', 'SF', 'TB', 'TEN', 'WAS']
+    players = {}
+    for player_id in range(1000, 10000):
+        first, last = f'First{player_id}', f'Last{player_id}'
+        players[str(player_id)] = {
+            'player_id': str(player_id),
+            'first_name': first,
+            'last_name': last,
+            'full_name': f'{first} {last}',
+            'position': rng.choice(['QB', 'RB', 'WR', 'TE', 'K']),
+            'team': rng.choice(teams + [None]),
+            'status': 'Active',
+            'age': rng.randint(21, 38),
+            'fantasy_positions': None,
+        }
+    for team in teams:
+        players[team] = {'player_id': team, 'first_name': team, 'last_name': 'Defense',
+                         'position': 'DEF', 'team': team, 'fantasy_positions': ['DEF']}
+    return players
+
+def make_matchups(rng: random.Random, num_teams: int) -> List[Dict[str, Any]]:
+    roster_ids = list(range(1, num_teams + 1))
+    rng.shuffle(roster_ids)
+    matchups = []
+    for index, roster_id in enumerate(roster_ids):
+        points = round(rng.gauss(115, 20), 2)
+        starters = [str(rng.randint(1000, 9999)) for _ in range(9)]
+        matchups.append({
+            'roster_id': roster_id,
+            'matchup_id': index // 2 + 1,
+            'points': points,
+            'starters': starters,
+            'starters_points': [round(rng.uniform(0, 30), 2) for _ in starters],
+            'players_points': {p: round(rng.uniform(0, 30), 2) for p in starters},
+        })
+    return matchups
+
+def make_rosters(rng: random.Random, users: List[Dict[str, Any]], season: Dict[int, List[Dict[str, Any]]],
+                 divisions: int = 0) -> List[Dict[str, Any]]:
+    """Rosters whose settings (W/L, PF/PA) are consistent with the season's matchups"""
+    num_teams = len(users)
+    totals = {rid: {'wins': 0, 'losses': 0, 'ties': 0, 'pf': 0.0, 'pa': 0.0} for rid in range(1, num_teams + 1)}
+    for matchups in season.values():
+        pairs = {}
+        for m in matchups:
+            pairs.setdefault(m['matchup_id'], []).append(m)
+        for pair in pairs.values():
+            if len(pair) != 2:
+                continue
+            a, b = pair
+            totals[a['roster_id']]['pf'] += a['points']
+            totals[a['roster_id']]['pa'] += b['points']
+            totals[b['roster_id']]['pf'] += b['points']
+            totals[b['roster_id']]['pa'] += a['points']
+            if a['points'] > b['points']:
+                totals[a['roster_id']]['wins'] += 1
+                totals[b['roster_id']]['losses'] += 1
+            elif b['points'] > a['points']:
+                totals[b['roster_id']]['wins'] += 1
+                totals[a['roster_id']]['losses'] += 1
+            else:
+                totals[a['roster_id']]['ties'] += 1
+                totals[b['roster_id']]['ties'] += 1
+
+    rosters = []
+    for index, user in enumerate(users):
+        roster_id = index + 1
+        t = totals[roster_id]
+        pf_cents = int(round(t['pf'] * 100))
+        pa_cents = int(round(t['pa'] * 100))
+        settings = {
+            'wins': t['wins'],
+            'losses': t['losses'],
+            'ties': t['ties'],
+            'fpts': pf_cents // 100,
+            'fpts_decimal': pf_cents % 100,
+            'fpts_against': pa_cents // 100,
+            'fpts_against_decimal': pa_cents % 100,
+        }
+        if divisions:
+            settings['division'] = index % divisions + 1
+        rosters.append({
+            'roster_id': roster_id,
+            'owner_id': user['user_id'],
+            'settings': settings,
+            'metadata': {'team_name': f'Roster {roster_id}'} if rng.random() < 0.3 else {},
+        })
+    return rosters
+
+def make_winners_bracket(seeds: List[int], users_by_roster: Dict[int, str]) -> List[Dict[str, Any]]:
+    """Six-team, three-round bracket: seeds 1-2 get byes into round 2"""
+    s = (seeds + [None] * 6)[:6]
+    bracket = [
+        {'r': 1, 'm': 1, 't1': s[2], 't2': s[5], 'w': s[2], 'l': s[5]},
+        {'r': 1, 'm': 2, 't1': s[3], 't2': s[4], 'w': s[3], 'l': s[4]},
+        {'r': 2, 'm': 3, 't1': s[0], 't2_from': {'w': 1}, 't2': s[2], 'w': None, 'l': None},
+        {'r': 2, 'm': 4, 't1': s[1], 't2_from': {'w': 2}, 't2': s[3], 'w': None, 'l': None},
+        {'r': 2, 'm': 5, 't1_from': {'l': 1}, 't2_from': {'l': 2}, 't1': s[5], 't2': s[4], 'w': None, 'l': None, 'p': 5},
+        {'r': 3, 'm': 6, 't1_from': {'w': 3}, 't2_from': {'w': 4}, 'w': None, 'l': None, 'p': 1},
+        {'r': 3, 'm': 7, 't1_from': {'l': 3}, 't2_from': {'l': 4}, 'w': None, 'l': None, 'p': 3},
+    ]
+    for match in bracket:
+        for side in ('t1', 't2'):
+            roster_id = match.get(side)
+            match[f'{side}_display_name'] = users_by_roster.get(roster_id, 'TBD')
+    return bracket
+
+def make_losers_bracket(seeds: List[int], users_by_roster: Dict[int, str]) -> List[Dict[str, Any]]:
+    """Two-round consolation bracket for the bottom four seeds"""
+    s = (seeds[-4:] + [None] * 4)[:4]
+    bracket = [
+        {'r': 1, 'm': 1, 't1': s[0], 't2': s[3], 'w': s[3], 'l': s[0]},
+        {'r': 1, 'm': 2, 't1': s[1], 't2': s[2], 'w': s[2], 'l': s[1]},
+        {'r': 2, 'm': 3, 't1_from': {'w': 1}, 't2_from': {'w': 2}, 'w': None, 'l': None, 'p': 1},
+        {'r': 2, 'm': 4, 't1_from': {'l': 1}, 't2_from': {'l': 2}, 'w': None, 'l': None, 'p': 3},
+    ]
+    for match in bracket:
+        for side in ('t1', 't2'):
+            roster_id = match.get(side)
+            match[f'{side}_display_name'] = users_by_roster.get(roster_id, 'TBD')
+    return bracket
+
+def make_league(num_teams: int = 10, weeks: int = REGULAR_SEASON_WEEKS, divisions: int = 0,
+                seed: int = 0, league_index: int = 0) -> Dict[str, Any]:
+    """A full synthetic league: users, rosters, every week's matchups and both brackets"""
+    rng = random.Random(seed * 100003 + league_index)
+    users = make_users(num_teams, league_index)
+    season = {week: make_matchups(rng, num_teams) for week in range(1, weeks + 1)}
+    rosters = make_rosters(rng, users, season, divisions)
+
+    ranked = sorted(rosters, key=lambda r: (-r['settings']['wins'], -r['settings']['fpts']))
+    seeds = [r['roster_id'] for r in ranked]
+    users_by_roster = {r['roster_id']: u['display_name'] for r, u in zip(rosters, users)}
+
+    return {
+        'league_id': f'9{league_index:08d}',
+        'name': f'Synthetic League {league_index}',
+        'divisions': divisions,
+        'users': users,
+        'rosters': rosters,
+        'nicknames': make_nicknames(users),
+        'matchups': season,
+        'winners_bracket': make_winners_bracket(seeds, users_by_roster),
+        'losers_bracket': make_losers_bracket(seeds, users_by_roster),
+    }
+
+def make_leagues(count: int, num_teams: int = 10, weeks: int = REGULAR_SEASON_WEEKS, seed: int = 0) -> List[Dict[str, Any]]:
+    # Alternate between leagues with and without divisions, like our real ones
+    return [make_league(num_teams, weeks, 2 if i % 2 == 0 else 0, seed, i) for i in range(count)]
@@ -0,0 +1,52 @@
+from bracket import BracketGraph, render_bracket, round_title
+from render import join_columns
+
+# A four-team bracket: two semifinals feeding the final and the third place match
+BRACKET = [
+    {'r': 2, 'm': 3, 't1_from': {'w': 1}, 't2_from': {'w': 2}, 'p': 1},
+    {'r': 1, 'm': 1, 't1': 1, 't2': 4, 'w': 1, 'l': 4},
+    {'r': 2, 'm': 4, 't1_from': {'l': 1}, 't2_from': {'l': 2}, 'p': 3},
+    {'r': 1, 'm': 2, 't1': 2, 't2': 3},
+]
+NAMES = {1: 'Alpha', 2: 'Bravo', 3: 'Charlie', 4: 'Delta'}
+
+
+def test_feeder_links():
+    graph = BracketGraph(BRACKET)
+    final, third = graph.matches_by_id[3], graph.matches_by_id[4]
+    assert [match['m'] for match in graph.rounds[1]] == [1, 2]
+    assert graph.team(final, 't1') == 1
+    assert graph.team(third, 't1') == 4
+    # Match 2 hasn't been decided yet
+    assert graph.team(final, 't2') is None
+    assert graph.feeder_label(final, 't2') == 'W M2'
+    assert graph.feeder_label(third, 't2') == 'L M2'
+    assert round_title(graph, 1) == 'Semifinals'
+    assert round_title(graph, 2) == 'Finals'
+
+def test_render_lays_rounds_side_by_side():
+    scores = {1: 130.5, 2: 101.25, 3: 99.0, 4: 88.0}
+    text = render_bracket(BracketGraph(BRACKET), NAMES.get, scores.get, width=30)
+    lines = text.split("\n")
+    assert lines[0].startswith('Semifinals') and lines[0][30:] == 'Finals'
+    assert lines[1][30:] == 'M3 · Final'
+
+    # The decided semifinal shows its recorded winner, not this week's points
+    assert lines[2][:30].split() == ['🏆', 'Alpha']
+    assert lines[3][:30].split() == ['❌', 'Delta']
+    # The open one leads with whoever is ahead this week
+    assert lines[6][:30].split() == ['🏆', 'Bravo', '101.25']
+    assert lines[7][:30].split() == ['❌', 'Charlie', '99.00']
+    # The final has its first finalist and waits on match 2 for the other
+    assert lines[2][30:].split() == ['🏆', 'Alpha', '130.50']
+    assert lines[3][30:].split() == ['❌', 'W', 'M2', 'TBD']
+    assert lines[7][30:].split() == ['❌', 'L', 'M2', 'TBD']
+
+def test_empty_bracket():
+    assert render_bracket(BracketGraph(None), NAMES.get, lambda roster_id: 0) == "No matches available"
+
+def test_join_columns():
+    assert join_columns(["a\nbb\n", "1\n2\n3", "x"], width=4) == "a   1   x\nbb  2\n    3"
+    # A cell wider than the column isn't cut
+    assert join_columns(["abcdef", "1"], width=4) == "abcdef1"
+    assert join_columns(["only\n"], width=10) == "only"
@@ -0,0 +1,89 @@
+import asyncio
+import datetime
+
+from aiohttp import web
+
+from cache import ResponseCache, ttl_for, HOUR, MINUTE, DAY
+from ratelimit import TokenBucket
+from resilience import CircuitBreakers
+from sleeper import SleeperAPI
+
+MATCHUPS = 'https://api.sleeper.app/v1/league/123/matchups/3'
+
+# 2024-09-10 12:00 US/Eastern, a Tuesday with no games
+TUESDAY = datetime.datetime(2024, 9, 10, 16, tzinfo=datetime.timezone.utc).timestamp()
+# 2024-09-08 13:00 US/Eastern, Sunday early games
+SUNDAY = datetime.datetime(2024, 9, 8, 17, tzinfo=datetime.timezone.utc).timestamp()
+
+
+def test_ttl_by_endpoint_and_game_window():
+    assert ttl_for(MATCHUPS, TUESDAY) == HOUR
+    assert ttl_for(MATCHUPS, SUNDAY) == MINUTE
+    assert ttl_for('https://api.sleeper.app/v1/league/123', SUNDAY) == DAY
+    assert ttl_for('https://api.sleeper.app/v1/league/123/rosters', SUNDAY) == 5 * MINUTE
+
+def test_nfl_state_fresh_until_rollover():
+    url = 'https://api.sleeper.app/v1/state/nfl'
+    # Wednesday 2024-09-11 at noon Eastern starts the next week
+    rollover = datetime.datetime(2024, 9, 11, 16, tzinfo=datetime.timezone.utc).timestamp()
+    assert ttl_for(url, rollover - 1) == 7 * DAY - 1
+    assert ttl_for(url, rollover + 30) == 30
+
+def test_stale_entry_is_kept_for_revalidation(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put(MATCHUPS, [{'roster_id': 1}], etag='"v1"', last_modified='Tue, 10 Sep 2024 15:00:00 GMT')
+    entry = cache.get(MATCHUPS)
+    assert entry['data'] == [{'roster_id': 1}]
+    # Stored on a Tuesday, so it gets the hour-long off-game-day TTL
+    entry['stored_at'] = TUESDAY
+    assert cache.is_fresh(entry, TUESDAY + HOUR - 1)
+    assert not cache.is_fresh(entry, TUESDAY + HOUR + 1)
+    assert cache.revalidation_headers(entry) == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Tue, 10 Sep 2024 15:00:00 GMT',
+    }
+    assert cache.revalidation_headers(None) == {}
+
+def test_index_survives_reopen(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put(MATCHUPS, {'week': 3}, etag='"v1"')
+    cache.flush()
+    entry = ResponseCache(str(tmp_path)).get(MATCHUPS)
+    assert entry['data'] == {'week': 3}
+    assert entry['etag'] == '"v1"'
+
+def test_not_modified_serves_and_refreshes_cached_copy(tmp_path):
+    requests = []
+
+    async def handle(request):
+        requests.append(request.headers.get('If-None-Match'))
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304)
+        return web.json_response({'week': 3}, headers={'ETag': '"v1"'})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/v1/league/123/matchups/3', handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        url = f'http://127.0.0.1:{port}/v1/league/123/matchups/3'
+
+        cache = ResponseCache(str(tmp_path))
+        try:
+            async with SleeperAPI(cache=cache, limiter=TokenBucket(1000, 1000), breakers=CircuitBreakers()) as sleeper:
+                first = await sleeper.fetch_data(url)
+                # Age the entry past its TTL so the next fetch has to revalidate
+                cache.index[cache._key(url)]['stored_at'] -= 2 * HOUR
+                second = await sleeper.fetch_data(url)
+                # The 304 made it fresh again, so this one never reaches the server
+                third = await sleeper.fetch_data(url)
+        finally:
+            await runner.cleanup()
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first == second == third == {'week': 3}
+    assert requests == [None, '"v1"']
@@ -0,0 +1,60 @@
+from changes import ChangeStore, normalize_matchups, normalize_bracket, describe_changes
+
+
+def test_null_matchup_ids_sort():
+    # Playoff weeks list teams without a game with matchup_id None
+    matchups = [
+        {'matchup_id': 2, 'roster_id': 3, 'points': 101.456},
+        {'matchup_id': None, 'roster_id': 5, 'points': 0},
+        {'matchup_id': 1, 'roster_id': 2, 'points': 88},
+        {'matchup_id': None, 'roster_id': 4, 'points': None},
+        {'matchup_id': 1, 'roster_id': 1, 'points': 90.1},
+    ]
+    assert normalize_matchups(matchups) == [
+        [None, 4, 0.0],
+        [None, 5, 0.0],
+        [1, 1, 90.1],
+        [1, 2, 88.0],
+        [2, 3, 101.46],
+    ]
+    assert normalize_matchups(list(reversed(matchups))) == normalize_matchups(matchups)
+    assert normalize_matchups(None) is None
+
+def test_bracket_order_and_keys():
+    bracket = [{'r': 2, 'm': 3, 't1': 1, 't2': None}, {'r': 1, 'm': 1, 't1': 1, 't2': 4, 'w': 1, 'extra': 'x'}]
+    assert normalize_bracket(bracket) == [{'r': 1, 'm': 1, 't1': 1, 't2': 4, 'w': 1}, {'r': 2, 'm': 3, 't1': 1}]
+
+def test_describe_changes():
+    old = {'matchups': [[1, 1, 80.0], [1, 2, 70.0]], 'winners_bracket': [{'r': 1, 'm': 1, 't1': 1, 't2': 2}]}
+    new = {'matchups': [[1, 1, 95.5], [1, 2, 70.0]], 'winners_bracket': [{'r': 1, 'm': 1, 't1': 1, 't2': 2, 'w': 1}]}
+    assert describe_changes(old, new, lambda roster_id: f'Team {roster_id}') == [
+        'Championship R1 M1: Team 1 advances',
+        'Team 1: 80.00 → 95.50',
+    ]
+
+def test_unchanged_state_is_skipped(tmp_path):
+    path = str(tmp_path / 'post_state.json')
+    state = {'week': 3, 'matchups': [[1, 1, 80.0]]}
+
+    store = ChangeStore(path)
+    assert store.has_changed('results', '123', state)
+    store.record('results', '123', state)
+    store.save()
+
+    store = ChangeStore(path)
+    assert not store.has_changed('results', '123', {'week': 3, 'matchups': [[1, 1, 80.0]]})
+    assert store.has_changed('results', '123', {'week': 3, 'matchups': [[1, 1, 81.0]]})
+    assert store.has_changed('playoffs', '123', state)
+    assert store.previous('results', '123') == state
+
+def test_overlapping_stores_keep_each_others_records(tmp_path):
+    path = str(tmp_path / 'post_state.json')
+    first, second = ChangeStore(path), ChangeStore(path)
+    first.record('results', '1', {'week': 1})
+    second.record('playoffs', '2', {'week': 1})
+    first.save()
+    second.save()
+
+    store = ChangeStore(path)
+    assert not store.has_changed('results', '1', {'week': 1})
+    assert not store.has_changed('playoffs', '2', {'week': 1})
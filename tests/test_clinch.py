@@ -0,0 +1,70 @@
+import random
+import itertools
+
+from clinch import ClinchCalculator, clinch_flags, bye_count, CLINCHED_BYE, CLINCHED_PLAYOFFS, ELIMINATED
+
+
+def make_rosters(wins):
+    return [{'roster_id': i + 1, 'settings': {'wins': w, 'losses': 0, 'fpts': 100 + i}} for i, w in enumerate(wins)]
+
+def make_week(pairs):
+    matchups = []
+    for matchup_id, (home, away) in enumerate(pairs, start=1):
+        matchups.append({'roster_id': home, 'matchup_id': matchup_id})
+        matchups.append({'roster_id': away, 'matchup_id': matchup_id})
+    return matchups
+
+def brute_force(wins, schedule, team, places):
+    """(always in the top `places`, never in the top `places`) over every outcome"""
+    games = [game for week in schedule for game in week]
+    always, never = True, True
+    for outcome in itertools.product((0, 1), repeat=len(games)):
+        final = list(wins)
+        for (home, away), home_wins in zip(games, outcome):
+            final[home if home_wins else away] += 1
+        others = [final[i] for i in range(len(final)) if i != team]
+        # Everyone plays every week, so no tie on wins is decided in advance
+        if sum(w >= final[team] for w in others) >= places:
+            always = False
+        if sum(w > final[team] for w in others) < places:
+            never = False
+    return always, never
+
+
+def test_decided_teams_are_tagged():
+    rosters = make_rosters([5, 5, 1, 0])
+    flags = clinch_flags(rosters, [make_week([(1, 3), (2, 4)])], playoff_teams=2)
+    assert flags == {1: CLINCHED_PLAYOFFS, 2: CLINCHED_PLAYOFFS, 3: ELIMINATED, 4: ELIMINATED}
+
+def test_open_race_has_no_tags():
+    rosters = make_rosters([3, 3, 2, 2])
+    weeks = [make_week([(1, 3), (2, 4)]), make_week([(1, 4), (2, 3)])]
+    assert clinch_flags(rosters, weeks, playoff_teams=2) == {}
+
+def test_missing_week_gives_no_tags():
+    rosters = make_rosters([5, 5, 1, 0])
+    assert clinch_flags(rosters, [make_week([(1, 3), (2, 4)]), None], playoff_teams=2) == {}
+
+def test_incomplete_matchup_gives_no_tags():
+    rosters = make_rosters([5, 5, 1, 0])
+    week = make_week([(1, 3), (2, 4)])[:-1]
+    assert clinch_flags(rosters, [week], playoff_teams=2) == {}
+
+def test_matches_brute_force():
+    rng = random.Random(0)
+    teams, playoff_teams = 6, 3
+    byes = bye_count(playoff_teams)
+    for _ in range(40):
+        wins = [rng.randint(0, 6) for _ in range(teams)]
+        schedule = []
+        for _ in range(2):
+            order = list(range(teams))
+            rng.shuffle(order)
+            schedule.append([(order[i], order[i + 1]) for i in range(0, teams, 2)])
+        calculator = ClinchCalculator(wins, [100.0 + i for i in range(teams)], schedule, playoff_teams, byes)
+
+        for team in range(teams):
+            bye, _ = brute_force(wins, schedule, team, byes)
+            playoffs, out = brute_force(wins, schedule, team, playoff_teams)
+            expected = CLINCHED_BYE if bye else CLINCHED_PLAYOFFS if playoffs else ELIMINATED if out else None
+            assert calculator.status(team) == expected, (wins, schedule, team)
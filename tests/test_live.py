@@ -0,0 +1,47 @@
+import asyncio
+
+from fakeserver import FakeDiscordClient
+from leagues import League
+from live import LiveScoreboard
+from synthetic import make_league
+
+
+class FakeSleeper:
+    def __init__(self, data):
+        self.data = data
+
+    async def get_matchups(self, league_id, week, priority=None):
+        return self.data['matchups'][week]
+
+    async def get_rosters(self, league_id):
+        return self.data['rosters']
+
+    async def get_users(self, league_id):
+        return self.data['users']
+
+
+def test_webhook_only_leagues_are_left_out(tmp_path):
+    data = make_league(8, weeks=3)
+    leagues = [
+        League('1', 'Bot League', channel_id=100),
+        League('2', 'Webhook League', webhook_url='https://discord.com/api/webhooks/1/token'),
+    ]
+    client = FakeDiscordClient()
+    scoreboard = LiveScoreboard(client, leagues, week=3, state_path=str(tmp_path / 'live_state.json'))
+    assert [league.league_id for league in scoreboard.leagues] == ['1']
+
+    sleeper = FakeSleeper(data)
+    assert asyncio.run(scoreboard.poll_once(sleeper)) == 1
+    assert list(client.channels) == [100]
+    message = client.channels[100].messages[0]
+    assert message.pinned
+
+    # Unchanged scores don't edit the message
+    assert asyncio.run(scoreboard.poll_once(sleeper)) == 0
+    assert client.channels[100].edits == 0
+
+    # A score change edits the same message
+    data['matchups'][3][0]['points'] += 10
+    assert asyncio.run(scoreboard.poll_once(sleeper)) == 1
+    assert len(client.channels[100].messages) == 1
+    assert client.channels[100].edits == 1
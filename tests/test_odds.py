@@ -0,0 +1,35 @@
+import pytest
+
+from odds import SeasonModel, simulate, parse_args, bracket_order
+
+
+def make_model(wins, schedule, playoff_teams=2):
+    teams = len(wins)
+    return SeasonModel(list(range(1, teams + 1)), wins, [1000.0] * teams, [100.0] * teams, [10.0] * teams,
+                       schedule, playoff_teams)
+
+def test_no_simulations():
+    with pytest.raises(ValueError):
+        simulate(make_model([1, 1, 1, 1], []), sims=0)
+    with pytest.raises(SystemExit):
+        parse_args(['--sims', '0'])
+
+def test_odds_add_up():
+    model = make_model([3, 3, 2, 2], [([0, 1], [2, 3]), ([0, 2], [3, 1])])
+    odds = simulate(model, sims=2000, seed=1)
+    assert sum(team['playoffs'] for team in odds) == pytest.approx(2)
+    assert sum(team['champion'] for team in odds) == pytest.approx(1)
+    assert sum(team['bye'] for team in odds) == pytest.approx(0)
+
+def test_decided_season():
+    # With no games left, the two teams ahead are in and the others out
+    odds = simulate(make_model([5, 4, 1, 0], []), sims=500, seed=2)
+    assert [team['playoffs'] for team in odds] == [1, 1, 0, 0]
+    assert [team['mean_wins'] for team in odds] == [5, 4, 1, 0]
+
+def test_seeded_runs_repeat():
+    model = make_model([3, 3, 2, 2], [([0, 1], [2, 3])])
+    assert simulate(model, sims=3000, seed=7) == simulate(model, sims=3000, seed=7)
+
+def test_bracket_order():
+    assert bracket_order(8) == [1, 8, 4, 5, 2, 7, 3, 6]
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from players import PlayerStream, PlayerIndex, pack_player, write_index, NAME_BYTES
+
+PLAYERS = {
+    '4046': {'full_name': 'Patrick Mahomes', 'position': 'QB', 'team': 'KC'},
+    '6794': {'full_name': 'Justin Jefferson', 'position': 'WR', 'team': 'MIN'},
+    'KC': {'first_name': 'Kansas City', 'last_name': 'Chiefs', 'position': 'DEF', 'team': 'KC'},
+    '9999': {'full_name': 'Zoë Ünïcode {"quoted"}, with: punctuation', 'position': None, 'team': None},
+    '1': None,
+}
+
+
+def stream_chunks(data: bytes, size: int):
+    stream = PlayerStream()
+    players = []
+    for i in range(0, len(data), size):
+        players.extend(stream.feed(data[i:i + size]))
+    stream.close()
+    return players
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 100000])
+def test_chunk_boundaries(size):
+    # Pretty-printed so whitespace, separators and multi-byte characters land on every boundary
+    data = json.dumps(PLAYERS, indent=2, ensure_ascii=False).encode('utf-8')
+    expected = [(k, v) for k, v in PLAYERS.items() if isinstance(v, dict)]
+    assert stream_chunks(data, size) == expected
+
+def test_compact_and_empty():
+    data = json.dumps(PLAYERS, separators=(',', ':')).encode('utf-8')
+    assert len(stream_chunks(data, 5)) == 4
+    assert stream_chunks(b' {} ', 1) == []
+
+def test_truncated_dump():
+    data = json.dumps(PLAYERS).encode('utf-8')
+    stream = PlayerStream()
+    stream.feed(data[:-1])
+    with pytest.raises(ValueError):
+        stream.close()
+
+def test_not_an_object():
+    with pytest.raises(ValueError):
+        PlayerStream().feed(b'[1, 2]')
+
+def test_index_round_trip(tmp_path):
+    path = str(tmp_path / 'players.idx')
+    records = [pack_player(k, v) for k, v in PLAYERS.items() if isinstance(v, dict)]
+    write_index(records, path)
+
+    with PlayerIndex(path) as index:
+        assert len(index) == 4
+        assert index.get('4046') == {'player_id': '4046', 'name': 'Patrick Mahomes', 'position': 'QB', 'team': 'KC'}
+        assert index.name('KC') == 'Kansas City Chiefs'
+        assert len(index.name('9999').encode('utf-8')) <= NAME_BYTES
+        assert index.get('404') is None
+        assert index.name('0', 'Unknown') == 'Unknown'
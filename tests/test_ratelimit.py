@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+from ratelimit import TokenBucket, PRIORITY_LIVE, PRIORITY_NORMAL, PRIORITY_BACKFILL
+
+
+def test_burst_is_not_queued():
+    async def run():
+        bucket = TokenBucket(rate=1, burst=5)
+        for _ in range(5):
+            await bucket.acquire()
+        return bucket
+
+    bucket = asyncio.run(run())
+    assert bucket.acquired == 5
+    assert bucket.queued == 0
+
+def test_waiters_are_served_by_priority_then_arrival():
+    order = []
+
+    async def worker(bucket, name, priority):
+        await bucket.acquire(priority)
+        order.append(name)
+
+    async def run():
+        bucket = TokenBucket(rate=200, burst=1)
+        await bucket.acquire()
+        # All queue up before the first token refills
+        await asyncio.gather(
+            worker(bucket, 'backfill', PRIORITY_BACKFILL),
+            worker(bucket, 'normal 1', PRIORITY_NORMAL),
+            worker(bucket, 'live', PRIORITY_LIVE),
+            worker(bucket, 'normal 2', PRIORITY_NORMAL),
+        )
+        return bucket
+
+    bucket = asyncio.run(run())
+    assert order == ['live', 'normal 1', 'normal 2', 'backfill']
+    assert bucket.queued == 4
+    assert bucket.max_queue_depth == 4
+    assert bucket.queue_depth == 0
+
+def test_rate_is_respected():
+    async def run():
+        bucket = TokenBucket(rate=100, burst=1)
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(11)))
+        return time.monotonic() - start
+
+    # One token up front, then ten refills at 100 per second
+    assert asyncio.run(run()) >= 0.09
+
+def test_cancelled_waiter_gives_up_its_turn():
+    async def run():
+        bucket = TokenBucket(rate=50, burst=1)
+        await bucket.acquire()
+        cancelled = asyncio.create_task(bucket.acquire(PRIORITY_LIVE))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await bucket.acquire(PRIORITY_BACKFILL)
+        return bucket
+
+    bucket = asyncio.run(run())
+    assert bucket.acquired == 2
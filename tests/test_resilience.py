@@ -0,0 +1,58 @@
+import time
+
+from resilience import CircuitBreaker, CircuitBreakers, backoff_delay, is_retryable_status
+
+
+def test_retryable_statuses():
+    assert is_retryable_status(429)
+    assert is_retryable_status(502)
+    assert not is_retryable_status(404)
+    assert not is_retryable_status(400)
+
+def test_backoff_is_jittered_and_capped():
+    for attempt in range(1, 10):
+        delay = backoff_delay(attempt, base=0.5, cap=4.0)
+        assert 0 <= delay <= min(4.0, 0.5 * 2 ** (attempt - 1))
+
+def test_opens_after_threshold():
+    breaker = CircuitBreaker('matchups', failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+def test_success_resets_the_count():
+    breaker = CircuitBreaker('rosters', failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker('users', failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    time.sleep(0.02)
+
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one request while the trial is in flight
+    assert not breaker.allow_request()
+
+    # A failed trial opens the circuit again straight away
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.02)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request() and breaker.allow_request()
+
+def test_breakers_per_endpoint():
+    breakers = CircuitBreakers()
+    assert breakers.get('matchups') is breakers.get('matchups')
+    assert breakers.get('matchups') is not breakers.get('rosters')
@@ -0,0 +1,47 @@
+import datetime
+
+import pytest
+
+from scheduler import CronExpression
+
+
+def at(*args):
+    return datetime.datetime(*args, tzinfo=datetime.timezone.utc)
+
+
+def test_weekly_job():
+    # Tuesdays at 12:00; 2024-09-10 is a Tuesday
+    cron = CronExpression('0 12 * * 2')
+    assert cron.next_after(at(2024, 9, 9, 8, 30)) == at(2024, 9, 10, 12, 0)
+    assert cron.next_after(at(2024, 9, 10, 12, 0)) == at(2024, 9, 17, 12, 0)
+
+def test_lists_ranges_and_steps():
+    cron = CronExpression('*/15 9-10 * * *')
+    assert cron.minutes == {0, 15, 30, 45}
+    assert cron.hours == {9, 10}
+    assert cron.next_after(at(2024, 9, 9, 10, 50)) == at(2024, 9, 10, 9, 0)
+    assert CronExpression('0 0 1,15 * *').days == {1, 15}
+    assert CronExpression('5/20 * * * *').minutes == {5, 25, 45}
+
+def test_sunday_is_zero_or_seven():
+    assert CronExpression('0 0 * * 7').weekdays == {0}
+    assert CronExpression('0 0 * * 0').weekdays == {0}
+
+def test_both_day_fields_restricted_match_either():
+    # The 13th of the month or any Friday; 2024-09-06 is a Friday
+    cron = CronExpression('0 0 13 * 5')
+    assert cron.next_after(at(2024, 9, 1)) == at(2024, 9, 6)
+    assert cron.next_after(at(2024, 9, 12)) == at(2024, 9, 13)
+
+def test_starred_step_day_field_is_unrestricted():
+    # '*/2' starts with '*', so cron ANDs it with the weekday: odd days that are Mondays
+    cron = CronExpression('0 0 */2 * 1')
+    assert not cron.days_restricted
+    assert cron.weekdays_restricted
+    # 2024-09-02 (even) and 2024-09-16 (even) are skipped; 2024-09-09 is the first odd Monday
+    assert cron.next_after(at(2024, 9, 1)) == at(2024, 9, 9)
+    assert cron.next_after(at(2024, 9, 9)) == at(2024, 9, 23)
+
+def test_wrong_field_count():
+    with pytest.raises(ValueError):
+        CronExpression('0 12 * *')
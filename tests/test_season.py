@@ -0,0 +1,135 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+from season import SeasonStore, backfill, finalize_weeks
+
+LEAGUE = '123'
+LEAGUE_CONFIG = SimpleNamespace(league_id=LEAGUE)
+
+
+def make_week(rng, teams=6):
+    rosters = list(range(1, teams + 1))
+    rng.shuffle(rosters)
+    return [{'roster_id': roster_id, 'matchup_id': i // 2 + 1, 'points': round(rng.uniform(60, 160), 2)}
+            for i, roster_id in enumerate(rosters)]
+
+def make_store(tmp_path, playoff_week_start=15):
+    store = SeasonStore(str(tmp_path / 'season.sqlite3'))
+    store.ingest_league(LEAGUE, {'name': 'Test', 'season': '2024', 'settings': {'playoff_week_start': playoff_week_start}})
+    return store
+
+def table(store):
+    return [(t['roster_id'], t['wins'], t['losses'], t['ties'], t['points_for'], t['points_against'], t['streak'])
+            for t in store.standings(LEAGUE)]
+
+
+class FakeSleeper:
+    def __init__(self, season, weeks):
+        self.season = season
+        self.weeks = weeks
+        self.fetched = []
+
+    async def get_league(self, league_id):
+        return {'season': self.season, 'settings': {'playoff_week_start': 15}}
+
+    async def get_rosters(self, league_id):
+        return [{'roster_id': r, 'owner_id': str(r)} for r in range(1, 7)]
+
+    async def get_users(self, league_id):
+        return [{'user_id': str(r), 'display_name': f'user{r}'} for r in range(1, 7)]
+
+    async def get_matchups(self, league_id, week, priority=None):
+        self.fetched.append(week)
+        return self.weeks[week]
+
+
+def test_incremental_standings(tmp_path):
+    with make_store(tmp_path) as store:
+        store.ingest_week(LEAGUE, 1, [
+            {'roster_id': 1, 'matchup_id': 1, 'points': 100}, {'roster_id': 2, 'matchup_id': 1, 'points': 90},
+            {'roster_id': 3, 'matchup_id': 2, 'points': 80}, {'roster_id': 4, 'matchup_id': 2, 'points': 80},
+        ], final=True)
+        store.ingest_week(LEAGUE, 2, [
+            {'roster_id': 1, 'matchup_id': 1, 'points': 110}, {'roster_id': 3, 'matchup_id': 1, 'points': 70},
+            {'roster_id': 2, 'matchup_id': 2, 'points': 95}, {'roster_id': 4, 'matchup_id': 2, 'points': 60},
+        ], final=True)
+        assert table(store) == [
+            (1, 2, 0, 0, 210.0, 160.0, 'W2'),
+            (2, 1, 1, 0, 185.0, 160.0, 'W1'),
+            (3, 0, 1, 1, 150.0, 190.0, 'L1'),
+            (4, 0, 1, 1, 140.0, 175.0, 'L1'),
+        ]
+
+def test_incremental_matches_rebuild(tmp_path):
+    rng = random.Random(7)
+    weeks = {week: make_week(rng) for week in range(1, 9)}
+    with make_store(tmp_path) as store:
+        for week, matchups in weeks.items():
+            store.ingest_week(LEAGUE, week, matchups, final=True)
+        incremental = table(store)
+        store._rebuild_standings(LEAGUE)
+        assert table(store) == incremental
+        # Re-ingesting the same week is a no-op
+        assert not store.ingest_week(LEAGUE, 3, weeks[3], final=True)
+
+def test_corrected_week_recomputes(tmp_path):
+    rng = random.Random(3)
+    weeks = {week: make_week(rng) for week in range(1, 5)}
+    corrected = [dict(m, points=m['points'] + 50 * (m['roster_id'] == 1)) for m in weeks[2]]
+    with make_store(tmp_path) as store:
+        for week, matchups in weeks.items():
+            store.ingest_week(LEAGUE, week, matchups, final=True)
+        # A stat correction to an earlier week after later weeks are in
+        store.ingest_week(LEAGUE, 2, corrected, final=True)
+        corrected_table = table(store)
+
+    (tmp_path / 'season.sqlite3').unlink()
+    with make_store(tmp_path) as store:
+        for week, matchups in weeks.items():
+            store.ingest_week(LEAGUE, week, corrected if week == 2 else matchups, final=True)
+        assert table(store) == corrected_table
+
+def test_playoff_weeks_do_not_count(tmp_path):
+    rng = random.Random(1)
+    with make_store(tmp_path, playoff_week_start=3) as store:
+        store.ingest_week(LEAGUE, 1, make_week(rng), final=True)
+        store.ingest_week(LEAGUE, 2, make_week(rng), final=True)
+        before = table(store)
+        store.ingest_week(LEAGUE, 3, make_week(rng), final=True)
+        assert table(store) == before
+        assert len(store.season_matchups(LEAGUE)) == 2
+
+def test_unfinished_week_is_finalized_later(tmp_path):
+    rng = random.Random(5)
+    live = make_week(rng)
+    settled = [dict(m, points=round(m['points'] + 1, 2)) for m in live]
+    with make_store(tmp_path) as store:
+        store.ingest_week(LEAGUE, 1, live, final=False)
+        assert store.stored_weeks(LEAGUE) == []
+        assert store.stored_weeks(LEAGUE, final_only=False) == [1]
+        assert table(store) == []
+        assert store.season_matchups(LEAGUE) == []
+
+        # Once the week has rolled over (any 2020 week has), the settled scores are stored as final
+        sleeper = FakeSleeper('2020', {1: settled})
+        assert asyncio.run(finalize_weeks(store, sleeper, LEAGUE_CONFIG, '2020')) == [1]
+        assert sleeper.fetched == [1]
+        assert store.stored_weeks(LEAGUE) == [1]
+        assert {t['roster_id']: t['points_for'] for t in store.standings(LEAGUE)} == {m['roster_id']: m['points'] for m in settled}
+        # Nothing left to finalize
+        assert asyncio.run(finalize_weeks(store, sleeper, LEAGUE_CONFIG, '2020')) == []
+
+def test_backfill_only_finalizes_rolled_over_weeks(tmp_path):
+    rng = random.Random(9)
+    weeks = {week: make_week(rng) for week in range(1, 4)}
+    with make_store(tmp_path) as store:
+        # A season that hasn't started yet: every week is stored, none as final
+        assert asyncio.run(backfill(store, FakeSleeper('2999', weeks), LEAGUE_CONFIG, 3)) == [1, 2, 3]
+        assert store.stored_weeks(LEAGUE) == []
+        assert table(store) == []
+
+        sleeper = FakeSleeper('2020', weeks)
+        assert asyncio.run(backfill(store, sleeper, LEAGUE_CONFIG, 3)) == [1, 2, 3]
+        assert store.stored_weeks(LEAGUE) == [1, 2, 3]
+        assert len(table(store)) == 6
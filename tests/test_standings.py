@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from standings import StandingsTable, rank_leagues
+from snapshot import LeagueSnapshot
+from results import get_league_standings, get_division_standings
+
+
+def make_rosters(rng, teams=10, divisions=2):
+    rosters = []
+    for roster_id in range(1, teams + 1):
+        # Few distinct records and points so ties on the leading keys are common
+        rosters.append({'roster_id': roster_id, 'owner_id': str(roster_id), 'settings': {
+            'wins': rng.randint(3, 5), 'losses': rng.randint(3, 5), 'ties': 0,
+            'fpts': rng.choice([1200, 1250]), 'fpts_decimal': rng.choice([0, 5, 50]),
+            'fpts_against': rng.choice([1100, 1300]), 'fpts_against_decimal': rng.choice([0, 7]),
+            'division': roster_id % divisions + 1,
+        }})
+    return rosters
+
+def legacy_order(rosters):
+    """The original string-built points and lambda sort"""
+    def key(roster):
+        s = roster['settings']
+        points_for = float(f"{s['fpts']}.{s['fpts_decimal']:02d}")
+        points_against = float(f"{s['fpts_against']}.{s['fpts_against_decimal']:02d}")
+        return (-s['wins'], -points_for, points_against)
+    return [roster['roster_id'] for roster in sorted(rosters, key=key)]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_legacy_sort(seed):
+    rosters = make_rosters(random.Random(seed))
+    snapshot = LeagueSnapshot(rosters, [], {})
+    assert [team['roster_id'] for team in get_league_standings(snapshot)] == legacy_order(rosters)
+
+@pytest.mark.parametrize('seed', range(10))
+def test_divisions_match_legacy_split(seed):
+    rosters = make_rosters(random.Random(seed))
+    divisions = get_division_standings(LeagueSnapshot(rosters, [], {}))
+    assert sorted(divisions) == [1, 2]
+    for division, teams in divisions.items():
+        expected = [roster_id for roster_id in legacy_order(rosters)
+                    if rosters[roster_id - 1]['settings']['division'] == division]
+        assert [team['roster_id'] for team in teams] == expected
+        assert all(team['division'] == division for team in teams)
+
+def test_points_are_arithmetic():
+    table = StandingsTable([[{'roster_id': 1, 'settings': {'fpts': 1234, 'fpts_decimal': 5, 'fpts_against': 999, 'fpts_against_decimal': 99}}]])
+    assert table.points_for.tolist() == [1234.05]
+    assert table.points_against.tolist() == [999.99]
+
+def test_configured_tiebreakers():
+    rosters = [
+        {'roster_id': 1, 'settings': {'wins': 5, 'losses': 3, 'ties': 0, 'fpts': 1000}},
+        {'roster_id': 2, 'settings': {'wins': 5, 'losses': 2, 'ties': 1, 'fpts': 900}},
+        {'roster_id': 3, 'settings': {'wins': 6, 'losses': 2, 'ties': 0, 'fpts': 800}},
+    ]
+    table = StandingsTable([rosters])
+    assert table.roster_id[table.rank()].tolist() == [3, 1, 2]
+    assert table.roster_id[table.rank(('wins', 'losses', 'points_for'))].tolist() == [3, 2, 1]
+    with pytest.raises(ValueError):
+        table.rank(('wins', 'coin_flip'))
+
+def test_head_to_head_breaks_ties_between_equal_records():
+    rosters = [{'roster_id': r, 'settings': {'wins': 1, 'fpts': 1000 + r}} for r in (1, 2, 3)]
+    # Team 1 beat team 3, whose points would otherwise rank it first
+    history = [[{'roster_id': 1, 'matchup_id': 1, 'points': 110}, {'roster_id': 3, 'matchup_id': 1, 'points': 100},
+                {'roster_id': 2, 'matchup_id': None, 'points': 90}]]
+    ranked = rank_leagues([rosters], ('wins', 'head_to_head', 'points_for'), [history])
+    assert [roster['roster_id'] for roster in ranked[0]] == [1, 3, 2]
+
+def test_batch_matches_one_league_at_a_time():
+    rng = random.Random(4)
+    leagues = [make_rosters(rng, teams) for teams in (8, 10, 12)]
+    batch = rank_leagues(leagues)
+    assert [[r['roster_id'] for r in league] for league in batch] == [legacy_order(rosters) for rosters in leagues]
+
+    table = StandingsTable(leagues)
+    groups = table.split_divisions(table.rank(by_division=True))
+    assert sorted(groups) == [(league, division) for league in range(3) for division in (1, 2)]
+    assert sum(len(rows) for rows in groups.values()) == 30
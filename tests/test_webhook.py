@@ -0,0 +1,111 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import web
+
+from delivery import DeliveryResult, send_with_retry
+from fakeserver import FakeWebhookServer
+from webhook import Webhooks, WebhookError, get_channel, needs_gateway
+
+
+async def serve(responses):
+    """A webhook endpoint that answers with each (status, body, headers) in turn"""
+    requests = []
+
+    async def handle(request):
+        requests.append(await request.json())
+        status, body, headers = responses[min(len(requests), len(responses)) - 1]
+        return web.Response(status=status, text=body, headers=headers, content_type=headers.pop('Content-Type', 'application/json'))
+
+    runner = web.AppRunner(web.Application())
+    runner.app.router.add_post('/api/webhooks/{webhook_id}/{token}', handle)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner, f'http://127.0.0.1:{runner.addresses[0][1]}/api/webhooks/42/token', requests
+
+
+def test_non_json_429_uses_retry_after_header():
+    async def run():
+        runner, url, _ = await serve([
+            (429, '<html>Too Many Requests</html>', {'Content-Type': 'text/html', 'Retry-After': '0.25'}),
+        ])
+        try:
+            async with Webhooks() as webhooks:
+                with pytest.raises(WebhookError) as error:
+                    await webhooks.channel(url).send(content='hello')
+        finally:
+            await runner.cleanup()
+        return error.value
+
+    error = asyncio.run(run())
+    assert error.status == 429
+    assert error.retry_after == 0.25
+
+def test_global_429_blocks_every_webhook():
+    async def run():
+        runner, url, _ = await serve([
+            (429, '{"message": "You are being rate limited.", "retry_after": 0.5, "global": true}', {}),
+        ])
+        try:
+            async with Webhooks() as webhooks:
+                with pytest.raises(WebhookError) as error:
+                    await webhooks.channel(url).send(content='hello')
+                blocked_for = webhooks.global_blocked_until - asyncio.get_running_loop().time()
+        finally:
+            await runner.cleanup()
+        return error.value, blocked_for
+
+    error, blocked_for = asyncio.run(run())
+    assert error.retry_after == 0.5
+    assert 0 < blocked_for <= 0.5
+
+def test_delivery_retries_after_429():
+    async def run():
+        runner, url, requests = await serve([
+            (429, 'rate limited', {'Content-Type': 'text/plain', 'Retry-After': '0.05'}),
+            (200, '{"id": "7"}', {}),
+        ])
+        try:
+            async with Webhooks() as webhooks:
+                result = await send_with_retry(webhooks.channel(url), DeliveryResult(), content='hello')
+        finally:
+            await runner.cleanup()
+        return result, requests
+
+    result, requests = asyncio.run(run())
+    assert result.ok
+    assert result.message.id == 7
+    assert requests == [{'content': 'hello'}, {'content': 'hello'}]
+
+def test_bucket_headers_pace_posts():
+    async def run():
+        server = FakeWebhookServer(bucket=2, reset_ms=100)
+        prefix = await server.start()
+        try:
+            async with Webhooks() as webhooks:
+                channel = webhooks.channel(f'{prefix}/1/token')
+                for i in range(5):
+                    await channel.send(content=str(i))
+        finally:
+            await server.stop()
+        return server
+
+    server = asyncio.run(run())
+    # The exhausted bucket is waited out before posting, so Discord never has to refuse
+    assert server.sent_messages() == 5
+    assert server.rate_limited == 0
+
+def test_destinations():
+    webhooks = Webhooks()
+    client = SimpleNamespace(get_channel=lambda channel_id: f'channel {channel_id}')
+    url = 'https://discord.com/api/webhooks/123/secret'
+    channel = get_channel(client, webhooks, url)
+    assert channel is webhooks.channel(url)
+    assert channel.id == 123
+    assert get_channel(client, webhooks, 55) == 'channel 55'
+    assert get_channel(None, webhooks, 55) is None
+
+    assert not needs_gateway([SimpleNamespace(webhook_url=url)])
+    assert needs_gateway([SimpleNamespace(webhook_url=url), SimpleNamespace(webhook_url=None)])
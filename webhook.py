@@ -0,0 +1,176 @@
+"""Post through Discord channel webhooks instead of a logged-in bot
+
+A league with a webhook_url in leagues.json (or webhook_url_env naming an
+environment variable) is posted with a plain HTTPS request to that webhook.
+One-shot jobs whose leagues all have webhooks never open a gateway
+connection, so there's no handshake or on_ready wait before the first post.
+
+WebhookChannel has the same send() as a discord.py channel, so the delivery
+helpers (packing, retries, metrics) work on either. Every webhook in a job
+shares one pooled HTTP session. Discord's per-webhook rate limit headers
+are honoured before each request; a 429 is raised as WebhookError with the
+retry_after Discord sent, which delivery's retry loop waits out.
+"""
+import os
+import re
+import json
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import aiohttp
+
+WEBHOOK_TIMEOUT = int(os.getenv('WEBHOOK_TIMEOUT', 15))
+CONNECTION_LIMIT = 10
+
+# .../webhooks/<id>/<token>; the id is safe to log, the token is not
+WEBHOOK_PATH = re.compile(r'/webhooks/(\d+)/[^/?]+')
+
+
+class WebhookError(Exception):
+    """A webhook request Discord refused
+
+    Carries status and retry_after like discord.HTTPException, so the
+    delivery retry loop treats both the same way.
+    """
+
+    def __init__(self, status: Optional[int], text: str, retry_after: Optional[float] = None):
+        super().__init__(f"{status} {text}" if status else text)
+        self.status = status
+        self.text = text
+        self.retry_after = retry_after
+
+
+class WebhookMessage:
+    """The message Discord created, as returned with ?wait=true"""
+
+    def __init__(self, channel: 'WebhookChannel', data: Dict[str, Any]):
+        self.channel = channel
+        self.id = int(data['id']) if data.get('id') else None
+        self.data = data
+
+
+class WebhookChannel:
+    """One channel webhook, posted to like a discord.py channel"""
+
+    def __init__(self, webhooks: 'Webhooks', url: str):
+        self.webhooks = webhooks
+        self.url = url.split('?')[0].rstrip('/')
+        match = WEBHOOK_PATH.search(self.url)
+        self.id = int(match.group(1)) if match else None
+        # Requests to one webhook go one at a time so its rate limit bucket stays accurate
+        self.lock = asyncio.Lock()
+        self.blocked_until = 0.0
+
+    def __repr__(self):
+        return f"WebhookChannel({self.id})"
+
+    async def send(self, content: Optional[str] = None, embed=None, embeds: Optional[List[Any]] = None, **kwargs) -> WebhookMessage:
+        """Post one message and return it once Discord has created it"""
+        payload: Dict[str, Any] = {}
+        if content:
+            payload['content'] = content
+        if embed is not None:
+            embeds = [embed]
+        if embeds:
+            payload['embeds'] = [e if isinstance(e, dict) else e.to_dict() for e in embeds]
+
+        async with self.lock:
+            await self.webhooks.wait_for_bucket(self)
+            data = await self.webhooks.post(self, payload)
+        return WebhookMessage(self, data)
+
+
+class Webhooks:
+    """Pooled HTTP session shared by every webhook a job posts to
+
+    The session is only opened on the first post, so jobs whose leagues all
+    use the bot's channels don't pay for it.
+    """
+
+    def __init__(self, session: Optional['aiohttp.ClientSession'] = None):
+        self.session = session
+        self.owns_session = session is None
+        self.channels: Dict[str, WebhookChannel] = {}
+        # Set when Discord reports a global rate limit; applies to every webhook
+        self.global_blocked_until = 0.0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self.session is not None and self.owns_session:
+            await self.session.close()
+            self.session = None
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        if self.session is None:
+            import aiohttp
+
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=CONNECTION_LIMIT),
+                timeout=aiohttp.ClientTimeout(total=WEBHOOK_TIMEOUT)
+            )
+        return self.session
+
+    def channel(self, url: str) -> WebhookChannel:
+        """The channel for a webhook URL, reused for every post to it"""
+        if url not in self.channels:
+            self.channels[url] = WebhookChannel(self, url)
+        return self.channels[url]
+
+    async def wait_for_bucket(self, channel: WebhookChannel):
+        """Sleep until this webhook (and Discord globally) has requests left"""
+        loop = asyncio.get_running_loop()
+        delay = max(channel.blocked_until, self.global_blocked_until) - loop.time()
+        if delay > 0:
+            logging.info(f"Webhook {channel.id} rate limit exhausted, waiting {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def post(self, channel: WebhookChannel, payload: Dict[str, Any]) -> Dict[str, Any]:
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._get_session().post(channel.url, params={'wait': 'true'}, json=payload) as response:
+                body = await response.text()
+                headers = response.headers
+
+                # Don't start the next request until the bucket refills
+                if headers.get('X-RateLimit-Remaining') == '0' and headers.get('X-RateLimit-Reset-After'):
+                    channel.blocked_until = loop.time() + float(headers['X-RateLimit-Reset-After'])
+
+                if response.status == 429:
+                    # A proxy or Cloudflare 429 may not be JSON; Retry-After still applies
+                    try:
+                        data = json.loads(body) if body else {}
+                    except ValueError:
+                        data = {}
+                    if not isinstance(data, dict):
+                        data = {}
+                    retry_after = float(data.get('retry_after') or headers.get('Retry-After') or 1)
+                    if data.get('global') or headers.get('X-RateLimit-Global'):
+                        self.global_blocked_until = loop.time() + retry_after
+                    raise WebhookError(429, data.get('message', 'rate limited'), retry_after)
+                if response.status >= 400:
+                    raise WebhookError(response.status, body[:200])
+                return json.loads(body) if body else {}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise WebhookError(None, f"Webhook {channel.id} request failed: {str(e) or type(e).__name__}")
+
+
+def get_channel(client, webhooks: Webhooks, destination):
+    """Where a league posts: its webhook for URL destinations, else the bot's channel"""
+    if isinstance(destination, str):
+        return webhooks.channel(destination)
+    if client is None or destination is None:
+        return None
+    return client.get_channel(destination)
+
+def needs_gateway(leagues) -> bool:
+    """Whether any league still posts through the logged-in bot"""
+    return any(not league.webhook_url for league in leagues)